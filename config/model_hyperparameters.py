@@ -1,13 +1,20 @@
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.linear_model import LogisticRegression
+from src.binned_tree import BinnedDecisionTreeClassifier
 from .settings import ExperimentConfig
 
+# Decision-tree trainer (ExperimentConfig.TREE_TRAINER): every decision-tree fit
+# (RFE, tuning, curves, final model) uses the histogram trainer when 'binned', on
+# the bin codes of the block group (FeatureBinner, see main.bin_block_data)
+_BINNED_TREES = getattr(ExperimentConfig, 'TREE_TRAINER', 'exact') == 'binned'
+
 # Base model configurations
 BASE_MODELS = {
     'decision_tree': {
-        'estimator': DecisionTreeClassifier,
+        'estimator': BinnedDecisionTreeClassifier if _BINNED_TREES else DecisionTreeClassifier,
         'params': {
-            'random_state': ExperimentConfig.RANDOM_STATE
+            'random_state': ExperimentConfig.RANDOM_STATE,
+            **({'max_bins': getattr(ExperimentConfig, 'MAX_BINS', 256), 'prebinned': True} if _BINNED_TREES else {})
         }
     },
     'logistic_regression': {
@@ -21,15 +28,13 @@ BASE_MODELS = {
 
 # Hyperparameter search spaces (Random Search)
 SEARCH_SPACES = {
-'''
-    'decision_tree': {
-        'criterion': ['gini', 'entropy', 'log_loss'],
-        'min_samples_split': list(range(100, 400, 10)),
-        'min_samples_leaf': list(range(20, 100, 5)),
-        'max_leaf_nodes': list(range(50, 300, 10)),
-        'max_depth': list(range(5, 20)),
-    },
-'''
+    # 'decision_tree': {
+    #     'criterion': ['gini', 'entropy', 'log_loss'],
+    #     'min_samples_split': list(range(100, 400, 10)),
+    #     'min_samples_leaf': list(range(20, 100, 5)),
+    #     'max_leaf_nodes': list(range(50, 300, 10)),
+    #     'max_depth': list(range(5, 20)),
+    # },
     'decision_tree': {
         'criterion': ['gini', 'entropy', 'log_loss'],
         'min_samples_split': list(range(50, 400, 10)),
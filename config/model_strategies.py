@@ -1,93 +1,23 @@
-from config.settings import DataConfig
-
-def _process_model_A(df):
-    """
-    Model A:
-    - No filtering.
-    - Labels: (0 or 1) -> 10, others -> 20.
-    """
-    df_out = df.copy()
-    df_out[DataConfig.TARGET_COLUMN] = df_out[DataConfig.TARGET_COLUMN].apply(
-        lambda x: 10 if x in [0, 1] else 20
-    )
-    return df_out
-
-def _process_model_B(df):
-    """
-    Model B:
-    - Remove rows where Target is 0 or 1.
-    - Labels: (2) -> 10, others -> 20.
-    """
-    df_out = df[~df[DataConfig.TARGET_COLUMN].isin([0, 1])].copy()
-    df_out[DataConfig.TARGET_COLUMN] = df_out[DataConfig.TARGET_COLUMN].apply(
-        lambda x: 10 if x == 2 else 20
-    )
-    return df_out
-
-def _process_raw(df):
-    """No processing, return raw dataframe."""
-    return df.copy()
-
-def _process_dst7_dst7(df):
-    """
-    Model dst7_dst7
-    - Label 10 if target == 2
-    - Otherwise, 20
-    """
-    df_out = df.copy()
-    df_out[DataConfig.TARGET_COLUMN] = df_out[DataConfig.TARGET_COLUMN].apply(
-        lambda x: 10 if x == 2 else 20
-    )
-    return df_out
-
-def _process_dct8_dst7(df):
-    """
-    Model dct8_dst7
-    - Label 10 if target == 3
-    - Otherwise, 20
-    """
-    df_out = df.copy()
-    df_out[DataConfig.TARGET_COLUMN] = df_out[DataConfig.TARGET_COLUMN].apply(
-        lambda x: 10 if x == 3 else 20
-    )
-    return df_out
-
-def _process_dst7_dct8(df):
-    """
-    Model dst7_dct8
-    - Label 10 if target == 4
-    - Otherwise, 20
-    """
-    df_out = df.copy()
-    df_out[DataConfig.TARGET_COLUMN] = df_out[DataConfig.TARGET_COLUMN].apply(
-        lambda x: 10 if x == 4 else 20
-    )
-    return df_out
-
-def _process_dct8_dct8(df):
-    """
-    Model dct8_dct8
-    - Label 10 if target == 5
-    - Otherwise, 20
-    """
-    df_out = df.copy()
-    df_out[DataConfig.TARGET_COLUMN] = df_out[DataConfig.TARGET_COLUMN].apply(
-        lambda x: 10 if x == 5 else 20
-    )
-    return df_out
-
-
+# Each strategy defines its training data with either:
+# - "label_spec": declarative row filter + label map on DataConfig.TARGET_COLUMN, executed
+#   vectorized on the shared grouped frame (no copy of the feature columns):
+#     "keep" / "drop": target values whose rows are kept / removed
+#     "map": {target value: new label}
+#     "default": label of the values missing from "map" (omitted: value kept as is)
+#   An empty spec ({}) trains on the raw data.
+# - "process_function": custom function (grouped frame -> new frame), for anything a
+#   label spec cannot express. It returns a full frame, so it usually copies it.
 
 # Scenario Definitions including dynamic classifier type
 MODEL_STRATEGIES = {
     "logistic_regression": {
         "description": "Logistic Regression",
-        "process_function": _process_raw,
+        "label_spec": {},
         "classifier_type": "logistic_regression"
     },
     "decision_tree": {
         "description": "Decision Tree",
-        "process_function": _process_raw,
+        "label_spec": {},
         "classifier_type": "decision_tree"
     }
 }
@@ -95,13 +25,15 @@ MODEL_STRATEGIES = {
 """
 MODEL_STRATEGIES = {
     "A": {
+        # No filtering. Labels: (0 or 1) -> 10, others -> 20.
         "description": "Model A (Filter after DCT2)",
-        "process_function": _process_model_A,
+        "label_spec": {"map": {0: 10, 1: 10}, "default": 20},
         "classifier_type": "decision_tree"
     },
     "B": {
+        # Remove rows where Target is 0 or 1. Labels: (2) -> 10, others -> 20.
         "description": "Model B (DST7 vs Others)",
-        "process_function": _process_model_B,
+        "label_spec": {"drop": [0, 1], "map": {2: 10}, "default": 20},
         "classifier_type": "decision_tree"
     }
 }
@@ -112,23 +44,23 @@ MODEL_STRATEGIES = {
 MODEL_STRATEGIES = {
     "dst7_dst7": {
         "description": "Modelo DST7 (target=2 -> 10)",
-        "process_function": _process_dst7_dst7,
+        "label_spec": {"map": {2: 10}, "default": 20},
         "classifier_type": "decision_tree"
     },
     "dct8_dst7": {
         "description": "Modelo DCT8_DST7 (target=3 -> 10)",
-        "process_function": _process_dct8_dst7,
+        "label_spec": {"map": {3: 10}, "default": 20},
         "classifier_type": "decision_tree"
     },
     "dst7_dct8": {
         "description": "Modelo DST7_DCT8 (target=4 -> 10)",
-        "process_function": _process_dst7_dct8,
+        "label_spec": {"map": {4: 10}, "default": 20},
         "classifier_type": "decision_tree"
     },
     "dct8_dct8": {
         "description": "Modelo DCT8_DCT8 (target=5 -> 10)",
-        "process_function": _process_dct8_dct8,
+        "label_spec": {"map": {5: 10}, "default": 20},
         "classifier_type": "decision_tree"
     }
 }
-"""
\ No newline at end of file
+"""
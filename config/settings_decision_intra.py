@@ -6,6 +6,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 RESULTS_DIR = BASE_DIR / "results"
 EXPORTS_DIR = BASE_DIR / "cpp_exports"
+CACHE_DIR = BASE_DIR / "cache"
 LOG_FILE = BASE_DIR / "execution.log"
 
 # --- Data Configuration ---
@@ -62,6 +63,23 @@ class DataConfig:
         ]
     }
     
+    # Streaming Ingestion
+    # --> None: read the whole CSV at once (float64/int64/object columns)
+    # --> int: read in chunks of N rows, filter/clip per chunk and downcast (float32, int8/int16...)
+    CSV_CHUNK_SIZE = None
+
+    # Categorical Encoding
+    # --> Dictionaries are saved as JSON (+ C++ header with the same codes) next to the exports
+    # --> REUSE_CATEGORY_MAPPINGS: keep existing codes and only append new values
+    CATEGORY_MAPPINGS_FILE = EXPORTS_DIR / "category_mappings.json"
+    REUSE_CATEGORY_MAPPINGS = True
+
+    # Cleaned Dataset Cache
+    # --> Reruns with the same source file and cleaning config load the cached Parquet
+    # --> DATA_CACHE_FULL_HASH: hash the whole file instead of size/mtime + head/tail bytes
+    USE_DATA_CACHE = True
+    DATA_CACHE_FULL_HASH = False
+
     # Columns used for balancing logic
     BALANCE_COLUMNS = ['IsIntra', 'TargetQP', 'FrameWidth', 'FrameHeight']
 
@@ -72,6 +90,12 @@ class ExperimentConfig:
     TEST_SIZE = 0.25
     MAX_SAMPLES_PER_CLASS = 200000
     NORMALIZE_DATA = True
+
+    # Preprocessing of each block group (split/sample -> impute -> normalize)
+    # --> 'frames': pandas DataFrames, each step returns new copies (float64)
+    # --> 'matrix': one float32 matrix [sample | rest of train | test], imputed and scaled
+    #     in place once; the tuning sample is a view of the train rows (lower peak memory)
+    PREPROCESSING_MODE = 'frames'
     
     # Handling Missing Values
     # --> True: Impute missing values
@@ -81,12 +105,43 @@ class ExperimentConfig:
     # Cross Validation
     CV_FOLDS = 5
     SCORING = 'accuracy'
+    # --> True: folds computed once per block group and the tuning sample stored once as a
+    #     read-only float32 memory-mapped matrix (CACHE_DIR/folds), shared by RFE, tuning
+    #     and validation/learning curves and by their worker processes without copies
+    # --> False: every stage splits and ships its own copy of the sample
+    SHARED_FOLD_PLAN = True
     
     # Feature Selection (RFCV)
     RFE_ENABLED = True
     RFE_STEP = 1
     RFE_MIN_FEATURES = 5
+    # --> 'rfecv': exact RFECV (recursive refits for every feature count, RFE_STEP at a time)
+    # --> 'fast': features ranked once per CV fold, coarse-to-fine search on the feature count,
+    #     stopping once the CV score plateaus
+    RFE_ENGINE = 'rfecv'
+    RFE_COARSE_FRACTION = 0.1 # coarse step, as a fraction of the feature count
+    RFE_PATIENCE = 2          # coarse steps without improvement before stopping
+    RFE_TOLERANCE = 1e-3      # minimum CV score gain that counts as an improvement
     
+    # Decision-tree trainer
+    # --> 'exact': sklearn DecisionTreeClassifier (sorts the raw values at every node)
+    # --> 'binned': histogram trainer, features quantized into MAX_BINS (<= 256) uint8 bins
+    #     once per block group; same tree_ arrays, thresholds in real units (C++ export
+    #     unchanged). Same trees as 'exact' on the training data only when every feature
+    #     has at most MAX_BINS distinct values
+    #     Pays off on large block groups; on a few thousand rows the exact trainer is faster
+    TREE_TRAINER = 'exact'
+    MAX_BINS = 256
+
+    # Final logistic regression trainer
+    # --> 'lbfgs': LogisticRegression on the full train set in memory
+    # --> 'streaming': SGD with log loss over mini-batches of STREAMING_BATCH_SIZE rows
+    #     (scaling stats from a first pass, STREAMING_EPOCHS passes, same L2 strength as C),
+    #     train rows read from the Parquet data cache (USE_DATA_CACHE) and preprocessed per batch
+    LR_TRAINER = 'lbfgs'
+    STREAMING_BATCH_SIZE = 50000
+    STREAMING_EPOCHS = 5
+
     # Hyperparameter Tuning
     RANDOM_SEARCH_ITER = 2000
     
@@ -96,7 +151,61 @@ class ExperimentConfig:
     RUN_LEARNING_CURVES_AT_END = True
     LEARNING_CURVE_TRAIN_SIZES = [0.1, 0.25, 0.5, 0.75, 1.0]
     EXPORT_CPP = True
+    # C++ decision-tree export style
+    # --> 'if_else': nested if/else on std::vector<double> (feature_vector.at(i))
+    # --> 'table': static const node arrays + iterative traversal over const float*
+    CPP_TREE_STYLE = 'if_else'
+    # Simplify exported trees: collapse subtrees predicting a single class, remove unreachable
+    # branches (checked to give identical test-set predictions, else the original tree is exported)
+    CPP_SIMPLIFY_TREE = True
+    # Profile-guided branch layout of exported trees: visit counts measured on this data
+    # put the hot child first (DT_LIKELY / hot-path table order)
+    # --> None: no profiling, 'train': training set, 'test': held-out set
+    CPP_PROFILE_DATA = None
+    # Also emit <function>_batch(const float * features, int n, out) over a structure-of-arrays
+    # buffer (feature j of sample i at features[j * n + i]) for both trees and LR
+    CPP_BATCH_API = False
+    # After all block groups: one <model>_<grouping>_m<strategy>_bundle.h per grouping/strategy with
+    # every block-group model and an O(1) dispatcher (lookup table over (Width, Height) or FrameLevel),
+    # called on a const double feature array (vector-style models also get a <function>_array entry point)
+    CPP_BUNDLE = False
+    # C++ logistic-regression export
+    # --> 'probability': returns the sigmoid probability (std::exp)
+    # --> 'threshold': returns probability > LR_DECISION_THRESHOLD as score > logit(threshold), no exp
+    LR_EXPORT_MODE = 'probability'
+    LR_DECISION_THRESHOLD = 0.5
+    # Threshold mode only: also emit an integer <function>_fixed variant with weights quantized
+    # to this many fractional bits (None: disabled); its test-set mismatch rate is reported
+    LR_FIXED_POINT_BITS = None
+    LR_FIXED_POINT_INPUT_BITS = 0 # fractional bits of the integer features: round(x * 2^bits)
+    LR_FIXED_POINT_MAX_MISMATCH = 0.01 # above this test-set mismatch rate the _fixed variant is not exported
     
+    # Parallel Block-Group Jobs
+    # --> GROUP_JOBS = 1: block groups run sequentially, estimators use N_JOBS
+    # --> GROUP_JOBS > 1: block groups run in a process pool and each job's estimators
+    #     get CORE_BUDGET // GROUP_JOBS workers (CORE_BUDGET = None: all cores)
+    GROUP_JOBS = 1
+    CORE_BUDGET = None
+
+    # Stage cache (CACHE_DIR/stages): split/sample, RFE, tuning and final model of every
+    # block group, keyed by the group data hash + the config fields each stage depends on.
+    # Changing a downstream setting (e.g. EXPORT_CPP) reuses every upstream stage.
+    # Off by default: the split stage pickles the full train/test matrices of every group.
+    STAGE_CACHE_ENABLED = False
+    STAGE_CACHE_MAX_BYTES = 2 * 1024**3 # least recently used entries are evicted above this size
+
+    # Search engine
+    # --> 'random': RandomizedSearchCV (RANDOM_SEARCH_ITER candidates x CV_FOLDS full fits)
+    # --> 'halving': successive halving over n_samples (RANDOM_SEARCH_ITER candidates,
+    #     each round keeps 1/HALVING_FACTOR of them and gives them HALVING_FACTOR x more data)
+    # --> 'path': model-specific path search, other models fall back to 'random'
+    #     decision_tree: one large tree per CV fold, CCP_ALPHA_CANDIDATES ccp_alpha values by pruning
+    #     logistic_regression: C grid walked in order with warm-started coefficients per CV fold
+    SEARCH_ENGINE = 'random'
+    HALVING_FACTOR = 3
+    HALVING_MIN_RESOURCES = 'exhaust'
+    CCP_ALPHA_CANDIDATES = 200
+
     # Active Grouping Strategies
     # Options: 'area', 'max', 'orientation', 'aspect_ratio', 'all', 'single'
     ACTIVE_GROUPINGS = ['single']
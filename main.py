@@ -6,131 +6,406 @@ from config.settings_decision_intra import DataConfig, ExperimentConfig, RESULTS
 import os
 import sys
 import shutil
-from src.utils import log_message
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+from src.utils import log_message, split_core_budget, use_worker_log_file
 from src.data import load_and_clean_data
-from src.grouping import apply_grouping_strategy
+from src.grouping import apply_grouping_strategy, compute_group_labels, build_group_partition, align_group_partition, mask_group_partition
+from src.labeling import apply_label_spec
 from config.model_strategies import MODEL_STRATEGIES
-from src.preprocessing import balance_group_data, split_and_sample, normalize_data, impute_data
+from src.preprocessing import balance_group_data, split_and_sample, normalize_data, impute_data, split_and_preprocess_matrix
 from src.feature_selection import run_rfe
+from src.folds import build_fold_plan
+from src.cache import hash_values, frame_digest, stage_key, stage_cached, memoize_stage
 from src.training import tune_hyperparameters, train_final_model
 from src.visualization import generate_validation_curves, generate_learning_curve
 from src.evaluation import evaluate_and_save
+from src.tree_utils import node_visit_counts, tree_stats, ArrayTreeClassifier
+from src.binned_tree import FeatureBinner
 
-def export_model_to_cpp(model, feature_names, class_names, function_name, output_dir, model_type):
+def simplify_tree_for_export(model, test_X):
+    """
+    Simplified tree (constant-class subtrees collapsed, unreachable branches removed)
+    if it predicts exactly like `model` on the test set, else `model`.
+    """
+    simplified = ArrayTreeClassifier.simplified(model)
+    before, after = tree_stats(model.tree_), tree_stats(simplified.tree_)
+    if test_X is not None and (model.predict(test_X) != simplified.predict(test_X)).any():
+        log_message("Tree simplification changed test-set predictions; exporting the original tree.", level="ERROR")
+        return model
+
+    checked = f"identical predictions on {len(test_X)} test samples" if test_X is not None else "not verified (no test set)"
+    log_message(f"Tree simplification: {before['nodes']} -> {after['nodes']} nodes, "
+                f"max depth {before['max_depth']} -> {after['max_depth']}, "
+                f"mean leaf depth {before['mean_depth']:.2f} -> {after['mean_depth']:.2f} ({checked})", level="INFO")
+    return simplified
+
+
+def export_model_to_cpp(model, feature_names, class_names, function_name, output_dir, model_type, profile_X=None, preprocessing=None, test_X=None):
+    """
+    Writes the C++ header of a model. Returns how to call it (header path, argument
+    kind 'vector'/'array', return kind 'class'/'double'/'bool'), None on failure.
+    With CPP_BUNDLE, vector-style models also get their _array entry point.
+    """
     try:
         os.makedirs(output_dir, exist_ok=True)
         if model_type == 'decision_tree':
             import src.DecisionTreeToCpp as to_cpp
-            to_cpp.save_code(model, feature_names, class_names, function_name=function_name)
+            if getattr(ExperimentConfig, 'CPP_SIMPLIFY_TREE', False):
+                model = simplify_tree_for_export(model, test_X)
+            visit_counts = None
+            if profile_X is not None and len(profile_X):
+                visit_counts = node_visit_counts(model.tree_, model.apply(profile_X))
+            to_cpp.save_code(model, feature_names, class_names, function_name=function_name,
+                             style=getattr(ExperimentConfig, 'CPP_TREE_STYLE', 'if_else'),
+                             visit_counts=visit_counts,
+                             batch=getattr(ExperimentConfig, 'CPP_BATCH_API', False),
+                             array=getattr(ExperimentConfig, 'CPP_BUNDLE', False))
             src_file = function_name + '.h'
             dst_file = os.path.join(output_dir, src_file)
             shutil.move(src_file, dst_file)
             log_message(f"✓ Tree exported: {dst_file}", level="INFO")
+            if visit_counts is not None:
+                log_message(f"Profile-guided layout ({len(profile_X)} rows): "
+                            f"{to_cpp.average_comparisons(model, visit_counts):.2f} comparisons per prediction on average "
+                            f"(max depth {model.get_depth()})", level="INFO")
+            style = getattr(ExperimentConfig, 'CPP_TREE_STYLE', 'if_else')
+            return {'header': dst_file, 'arg': 'array' if style == 'table' else 'vector', 'returns': 'class'}
         elif model_type == 'logistic_regression':
             import src.LogisticRegToCpp as lr_to_cpp
-            lr_to_cpp.save_code(model, feature_names, class_names, function_name=function_name, output_dir=output_dir)
+            export_mode = getattr(ExperimentConfig, 'LR_EXPORT_MODE', 'probability')
+            if export_mode not in ('probability', 'threshold'):
+                raise ValueError(f"Unknown LR export mode: {export_mode}")
+            threshold = frac_bits = mismatch_rate = None
+            input_bits = 0
+            if export_mode == 'threshold':
+                threshold = getattr(ExperimentConfig, 'LR_DECISION_THRESHOLD', 0.5)
+                frac_bits = getattr(ExperimentConfig, 'LR_FIXED_POINT_BITS', None)
+                input_bits = getattr(ExperimentConfig, 'LR_FIXED_POINT_INPUT_BITS', 0)
+                if frac_bits is not None and test_X is not None:
+                    mismatch_rate = lr_to_cpp.fixed_point_mismatch(model, test_X, feature_names, preprocessing, threshold,
+                                                                   frac_bits, input_bits)
+                    log_message(f"Fixed-point LR ({frac_bits} fractional bits): decision differs from the float model "
+                                f"on {mismatch_rate * 100:.4f}% of {len(test_X)} test samples", level="INFO")
+                    max_mismatch = getattr(ExperimentConfig, 'LR_FIXED_POINT_MAX_MISMATCH', None)
+                    if max_mismatch is not None and mismatch_rate > max_mismatch:
+                        log_message(f"Fixed-point LR mismatch above {max_mismatch * 100:.4f}%: "
+                                    f"{function_name}_fixed is not exported", level="WARNING")
+                        frac_bits = mismatch_rate = None
+            lr_to_cpp.save_code(model, feature_names, class_names, function_name=function_name, output_dir=output_dir,
+                                preprocessing=preprocessing, threshold=threshold, frac_bits=frac_bits,
+                                input_bits=input_bits, mismatch_rate=mismatch_rate,
+                                batch=getattr(ExperimentConfig, 'CPP_BATCH_API', False),
+                                array=getattr(ExperimentConfig, 'CPP_BUNDLE', False))
             log_message(f"✓ LR exported: {output_dir}/{function_name}.h", level="INFO")
+            return {'header': os.path.join(output_dir, function_name + '.h'), 'arg': 'vector',
+                    'returns': 'double' if threshold is None else 'bool'}
         else:
             log_message(f"Unknown model type for C++ export: {model_type}", level="ERROR")
     except ImportError:
         log_message(f"C++ export module not found. Export skipped.", level="ERROR")
     except Exception as e:
         log_message(f"Error exporting to C++: {e}", level="ERROR")
+    return None
 
 
-def main():
-    log_message("=== Starting VVC ML Pipeline ===", level="stage")
+def export_bundles(export_records):
+    """
+    Bundle export stage, after every block group finished: one header per
+    grouping/strategy with all its block-group models and an O(1) dispatcher.
+    """
+    import src.BundleToCpp as bundle_to_cpp
+    bundles = {}
+    for record in export_records:
+        bundles.setdefault((record['grouping_name'], record['model_strategie_id'], record['model_type']), []).append(record)
+
+    for (grouping_name, model_strategie_id, model_type), records in bundles.items():
+        bundle_name = f"{model_type}_{grouping_name}_m{model_strategie_id}_bundle"
+        try:
+            path = bundle_to_cpp.save_bundle(records, grouping_name, bundle_name, f'cpp_exports/{grouping_name}')
+            log_message(f"✓ Bundle exported: {path} ({len(records)} models)", level="INFO")
+        except Exception as e:
+            log_message(f"Error exporting bundle {bundle_name}: {e}", level="ERROR")
+
+
+def prepare_block_data(df_block):
+    """
+    Balance -> split/sample -> impute -> normalize of one block group. The last item
+    holds the applied imputation values / scaler statistics (folded into the C++ export).
+    """
+    preprocessing = {}
+    # B. Balance Data
+    df_balanced = balance_group_data(df_block)
+
+    # C. Matrix mode: split/sample/impute/normalize on one float32 matrix, in place
+    if getattr(ExperimentConfig, 'PREPROCESSING_MODE', 'frames') == 'matrix':
+        return (*split_and_preprocess_matrix(df_balanced, preprocessing), preprocessing)
     
-    # 1. Load Data
+    # C. Split Train/Test and Sample for Tuning
+    X_train, X_test, y_train, y_test, X_train_samp, y_train_samp = split_and_sample(df_balanced)
+    
+    # C.0 Impute missing values if any
+    X_train, X_test, X_train_samp = impute_data(X_train, X_test, X_train_samp, preprocessing)
+                   
+    # C.1 Normalize Data if configured
+    if ExperimentConfig.NORMALIZE_DATA:
+        X_train, X_test, X_train_samp = normalize_data(X_train, X_test, X_train_samp, preprocessing)
+
+    return X_train, X_test, y_train, y_test, X_train_samp, y_train_samp, preprocessing
+
+
+def bin_block_data(block_data, fold_plan):
+    """
+    Binned tree trainer: bins the train matrices of a block group once (thresholds
+    fitted on the train set). Returns (binner, X_train codes, X_train_samp codes,
+    fold plan of the codes or None), shared by the decision-tree branches.
+    """
+    X_train, X_train_samp, y_train_samp = block_data[0], block_data[4], block_data[5]
+    binner = FeatureBinner(getattr(ExperimentConfig, 'MAX_BINS', 256), random_state=ExperimentConfig.RANDOM_STATE).fit(X_train)
+    codes_samp = binner.transform(X_train_samp)
+    codes_plan = build_fold_plan(codes_samp, y_train_samp) if fold_plan is not None else None
+    return binner, binner.transform(X_train), codes_samp, codes_plan
+
+
+def run_classifier_branch(block_data, fold_plan, split_key, grouping_name, model_strategie_id, current_model_type, block_group,
+                          binned=None):
+    """
+    Classifier branch of a block-group job: RFE -> tuning -> final training ->
+    evaluation/export on the shared preprocessed data of the block group.
+    Stages E, F and G are memoized on disk (STAGE_CACHE_ENABLED). Decision trees
+    fit on the bin codes of `binned` (bin_block_data) when given; the final tree
+    gets its thresholds back in feature units before evaluation
+    (the end-of-run learning curve still fits on the codes).
+    Returns (report, export record) of evaluate_and_save, or None.
+    """
+    X_train, X_test, y_train, y_test, X_train_samp, y_train_samp, preprocessing = block_data
+    fit_train, fit_samp, restore = X_train, X_train_samp, lambda model: model
+    if binned is not None and current_model_type == 'decision_tree':
+        binner, fit_train, fit_samp, fold_plan = binned
+        restore = binner.restore_thresholds
+    group_id_clean = str(block_group).replace(":", "-").replace("×", "x")
+
+    log_message(f"\n>>> Processing Group: {block_group} | Strategy: {grouping_name} | Model Type: {current_model_type} ({model_strategie_id})", level="INFO")
+
+    # D. (Optional) Validation / Learning Curves
+    if ExperimentConfig.RUN_VALIDATION_CURVES or ExperimentConfig.RUN_LEARNING_CURVES:
+        subdir = f"{grouping_name}_{model_strategie_id}_{group_id_clean}"
+        if ExperimentConfig.RUN_VALIDATION_CURVES:
+            generate_validation_curves(fit_samp, y_train_samp, subdir, model_type=current_model_type, fold_plan=fold_plan)
+        if ExperimentConfig.RUN_LEARNING_CURVES:
+            generate_learning_curve(fit_samp, y_train_samp, subdir, model_type=current_model_type, train_sizes=ExperimentConfig.LEARNING_CURVE_TRAIN_SIZES, fold_plan=fold_plan)
+        return None
+
+    rfe_key = stage_key('rfe', split_key, current_model_type)
+    tune_key = stage_key('tune', rfe_key, current_model_type)
+    train_key = stage_key('train', tune_key, current_model_type)
+
+    # E. Feature Selection (RFE) using dynamic model type
+    log_message(f"--- Feature Selection (RFE) ---", level="stage")
+    selected_cols = memoize_stage(
+        'rfe', rfe_key, lambda: run_rfe(fit_samp, y_train_samp, current_model_type, fold_plan=fold_plan))
+
+    # F. Hyperparameter Tuning (Random Search)
+    log_message(f"--- Hyperparameter Tuning ---", level="stage")
+    best_params = memoize_stage(
+        'tune', tune_key, lambda: tune_hyperparameters(fit_samp[selected_cols], y_train_samp, current_model_type, fold_plan=fold_plan))
+    
+    # G. Final Training (Full Train set, Selected Features)
+    log_message(f"--- Final Training ---", level="stage")
+    final_model = memoize_stage(
+        'train', train_key,
+        lambda: restore(train_final_model(fit_train[selected_cols], y_train, current_model_type, best_params, preprocessing)))
+    
+    # H. Evaluation (delegated to src.evaluation.evaluate_and_save)
     try:
-        df_raw = load_and_clean_data(DataConfig.FILE_PATH)
-        #df_raw = df_raw.sample(n=5000, random_state=42) # TODO: remover depois
+        return evaluate_and_save(
+            final_model=final_model,
+            X_test=X_test,
+            y_test=y_test,
+            X_train=X_train,
+            y_train=y_train,
+            selected_cols=selected_cols,
+            grouping_name=grouping_name,
+            model_strategie_id=model_strategie_id,
+            block_group=block_group,
+            current_model_type=current_model_type,
+            best_params=best_params,
+            export_model_callback=export_model_to_cpp,
+            preprocessing=preprocessing,
+            fit_X_train=fit_train,
+        )
     except Exception as e:
-        log_message(f"Critical Error loading data: {e}", level="CRITICAL")
-        sys.exit(1)
+        log_message(f"Error during evaluation step: {e}", level="ERROR")
+        return None
+
+
+def _branch_needs_fold_plan(split_key, model_type):
+    if ExperimentConfig.RUN_VALIDATION_CURVES or ExperimentConfig.RUN_LEARNING_CURVES:
+        return True
+    rfe_key = stage_key('rfe', split_key, model_type)
+    return not (stage_cached('rfe', rfe_key) and stage_cached('tune', stage_key('tune', rfe_key, model_type)))
+
+
+def run_block_group_job(df_block, grouping_name, block_group, branches):
+    """
+    One block-group job, run inline or inside a worker process. It is a small DAG:
+    the upstream node (balance -> split -> impute/normalize, fold plan) runs once
+    for the block group and fans out to one classifier branch per model strategy
+    in `branches` [(model_strategie_id, model_type), ...], which all share its output.
+    Returns the (report, export record) results of the branches.
+    """
+    log_message(f"--- Block Group: {block_group} ---", level="stage")
+
+    # B-C. Balance, split, impute, normalize (keyed by the hash of the group data)
+    split_key = stage_key('split', frame_digest(df_block))
+    block_data = memoize_stage('split', split_key, lambda: prepare_block_data(df_block))
+    X_train_samp, y_train_samp = block_data[4], block_data[5]
+
+    # C.2 Fold plan: CV folds + memory-mapped sample matrix shared by D, E and F of every branch
+    fold_plan = None
+    if getattr(ExperimentConfig, 'SHARED_FOLD_PLAN', False) and any(_branch_needs_fold_plan(split_key, t) for _, t in branches):
+        fold_plan = build_fold_plan(X_train_samp, y_train_samp)
+
+    # C.3 Binned tree trainer: the tree branches share the bin codes of the group
+    binned = None
+    if getattr(ExperimentConfig, 'TREE_TRAINER', 'exact') == 'binned' and any(t == 'decision_tree' for _, t in branches):
+        binned = bin_block_data(block_data, fold_plan)
+    try:
+        return [
+            run_classifier_branch(block_data, fold_plan, split_key, grouping_name, model_strategie_id, model_type, block_group, binned)
+            for model_strategie_id, model_type in branches
+        ]
+    finally:
+        for plan in (fold_plan, binned and binned[3]):
+            if plan is not None:
+                plan.release()
+
+
+def group_strategies_by_input():
+    """
+    Model strategies grouped by how they build their data (same label spec or same
+    process_function), in MODEL_STRATEGIES order: strategies in a group share all
+    of its upstream work.
+    """
+    grouped = {}
+    for model_strategie_id, model_strategie_cfg in MODEL_STRATEGIES.items():
+        if 'label_spec' in model_strategie_cfg:
+            input_key = ('label_spec', hash_values(model_strategie_cfg['label_spec']))
+        else:
+            input_key = ('process_function', model_strategie_cfg['process_function'])
+        grouped.setdefault(input_key, []).append(model_strategie_id)
+    return grouped
+
+
+def apply_model_strategie(model_strategie_cfg, df_grouped, partition):
+    """
+    Returns (frame, partition, labels) of a strategy. A label spec runs vectorized on
+    the shared frame: only a row mask (folded into the partition) and the new target
+    are built. A process_function builds its own frame (labels is None).
+    """
+    if 'label_spec' in model_strategie_cfg:
+        mask, labels = apply_label_spec(df_grouped[DataConfig.TARGET_COLUMN], model_strategie_cfg['label_spec'])
+        return df_grouped, mask_group_partition(partition, mask), labels
+
+    df_model_strategie = model_strategie_cfg['process_function'](df_grouped)
+    # The strategy may have filtered rows: map the partition onto its frame
+    return df_model_strategie, align_group_partition(partition, df_grouped.index, df_model_strategie), None
+
+
+def iter_block_group_jobs(df_raw):
+    """
+    Yields the arguments of every (grouping, strategy input, block group) job,
+    with the model strategies that share that input as its branches.
+    """
+    # Labels of every active strategy are computed in one vectorized pass
+    group_labels = compute_group_labels(df_raw, ExperimentConfig.ACTIVE_GROUPINGS)
+    strategies_by_input = group_strategies_by_input()
 
     # 2. Iterate over Grouping Strategies (area, max, single, etc.)
     for grouping_name in ExperimentConfig.ACTIVE_GROUPINGS:
         log_message(f"--- Grouping Strategy: {grouping_name} ---", level="stage")
         try:
-            df_grouped, groups = apply_grouping_strategy(df_raw, grouping_name)
+            df_grouped, groups = apply_grouping_strategy(df_raw, grouping_name, group_labels)
         except ValueError as e:
             log_message(f"Skipping strategy {grouping_name}: {e}", level="WARNING")
             continue
 
-        # 3. Iterate over MODEL_STRATEGIES (Model A, Model B)
-        for model_strategie_id, model_strategie_cfg in MODEL_STRATEGIES.items():
-            log_message(f"--- model_strategie: {model_strategie_id} ({model_strategie_cfg['description']}) ---", level="stage")
-            
-            # Apply specific model_strategie transformation (label modification/filtering)
-            df_model_strategie = model_strategie_cfg['process_function'](df_grouped)
-            
-            # Dynamic Model Type
-            current_model_type = model_strategie_cfg['classifier_type']
+        # Row positions of each block group, reused by every model strategy
+        partition = build_group_partition(df_grouped['BlockGroup'])
+
+        # 3. Iterate over the distinct inputs of MODEL_STRATEGIES (label spec / process function)
+        for strategy_ids in strategies_by_input.values():
+            branches = [(i, MODEL_STRATEGIES[i]['classifier_type']) for i in strategy_ids]
+            for model_strategie_id in strategy_ids:
+                log_message(f"--- model_strategie: {model_strategie_id} ({MODEL_STRATEGIES[model_strategie_id]['description']}) ---", level="stage")
+
+            # Apply the model_strategie transformation (label modification/filtering) once
+            df_model_strategie, strategy_partition, labels = apply_model_strategie(
+                MODEL_STRATEGIES[strategy_ids[0]], df_grouped, partition)
 
             # 4. Iterate over Block Groups (e.g., 64x64, 32x32)
             for block_group in groups:
-                group_id_clean = str(block_group).replace(":", "-").replace("×", "x")
-                log_message(f"--- Block Group: {block_group} ---", level="stage")
-                log_message(f"\n>>> Processing Group: {block_group} | Strategy: {grouping_name} | Model Type: {current_model_type}", level="INFO")
-                
-                # A. Filter by block group
-                df_block = df_model_strategie[df_model_strategie['BlockGroup'] == block_group].copy()
+                # A. Take the block group rows (partition index, no full-column scan)
+                positions = strategy_partition.get(block_group, [])
+                df_block = df_model_strategie.take(positions)
                 if df_block.empty:
                     continue
-                
-                # B. Balance Data
-                df_balanced = balance_group_data(df_block)
-                
-                # C. Split Train/Test and Sample for Tuning
-                X_train, X_test, y_train, y_test, X_train_samp, y_train_samp = split_and_sample(df_balanced)
-                
-                # C.0 Impute missing values if any
-                X_train, X_test, X_train_samp = impute_data(X_train, X_test, X_train_samp)     
-                               
-                # C.1 Normalize Data if configured
-                if ExperimentConfig.NORMALIZE_DATA:
-                    X_train, X_test, X_train_samp = normalize_data(X_train, X_test, X_train_samp)
-                
-                # D. (Optional) Validation / Learning Curves
-                if ExperimentConfig.RUN_VALIDATION_CURVES or ExperimentConfig.RUN_LEARNING_CURVES:
-                    subdir = f"{grouping_name}_{model_strategie_id}_{group_id_clean}"
-                    if ExperimentConfig.RUN_VALIDATION_CURVES:
-                        generate_validation_curves(X_train_samp, y_train_samp, subdir, model_type=current_model_type)
-                    if ExperimentConfig.RUN_LEARNING_CURVES:
-                        generate_learning_curve(X_train_samp, y_train_samp, subdir, model_type=current_model_type, train_sizes=ExperimentConfig.LEARNING_CURVE_TRAIN_SIZES)
-                    continue
+                if labels is not None:
+                    df_block[DataConfig.TARGET_COLUMN] = labels[positions]
+
+                yield df_block, grouping_name, block_group, branches
+
+
+def _run_job_with_budget(estimator_jobs, job):
+    """Runs one block-group job inside a pool worker, pinned to its share of the core budget."""
+    ExperimentConfig.N_JOBS = estimator_jobs
+    use_worker_log_file()
+    _, grouping_name, block_group, branches = job
+    try:
+        with threadpool_limits(limits=estimator_jobs):
+            return run_block_group_job(*job)
+    except Exception as e:
+        model_ids = ", ".join(i for i, _ in branches)
+        log_message(f"Job failed ({grouping_name}) Models {model_ids}, Group {block_group}: {e}", level="ERROR")
+        return None
+
+
+def run_jobs_in_pool(jobs, group_workers, estimator_jobs):
+    """
+    Runs block-group jobs in a process pool. Only 2 jobs per worker are dispatched
+    ahead, so just a few block frames are materialized at a time. Yields the
+    branch results of every job. Workers log to their own file (see
+    use_worker_log_file).
+    """
+    log_message(f"Running block-group jobs in parallel: {group_workers} workers x {estimator_jobs} estimator jobs", level="INFO")
+    
+    parallel = Parallel(n_jobs=group_workers, backend='loky', pre_dispatch='2*n_jobs', return_as='generator_unordered')
+    for results in parallel(delayed(_run_job_with_budget)(estimator_jobs, job) for job in jobs):
+        yield from results or []
+
+
+def main():
+    log_message("=== Starting VVC ML Pipeline ===", level="stage")
+    
+    # 1. Load Data
+    try:
+        df_raw = load_and_clean_data(DataConfig.FILE_PATH)
+        #df_raw = df_raw.sample(n=5000, random_state=42) # TODO: remover depois
+    except Exception as e:
+        log_message(f"Critical Error loading data: {e}", level="CRITICAL")
+        sys.exit(1)
+
+    jobs = iter_block_group_jobs(df_raw)
+    group_workers, estimator_jobs = split_core_budget()
+
+    if group_workers > 1:
+        results = list(run_jobs_in_pool(jobs, group_workers, estimator_jobs))
+    else:
+        results = [result for job in jobs for result in run_block_group_job(*job)]
 
-                # E. Feature Selection (RFE) using dynamic model type
-                log_message(f"--- Feature Selection (RFE) ---", level="stage")
-                selected_cols = run_rfe(X_train_samp, y_train_samp, current_model_type)
-                
-                # F. Hyperparameter Tuning (Random Search)
-                log_message(f"--- Hyperparameter Tuning ---", level="stage")
-                best_params = tune_hyperparameters(X_train_samp[selected_cols], y_train_samp, current_model_type)
-                
-                # G. Final Training (Full Train set, Selected Features)
-                log_message(f"--- Final Training ---", level="stage")
-                final_model = train_final_model(X_train[selected_cols], y_train, current_model_type, best_params)
-                
-                # H. Evaluation (delegated to src.evaluation.evaluate_and_save)
-                try:
-                    evaluate_and_save(
-                        final_model=final_model,
-                        X_test=X_test,
-                        y_test=y_test,
-                        X_train=X_train,
-                        y_train=y_train,
-                        selected_cols=selected_cols,
-                        grouping_name=grouping_name,
-                        model_strategie_id=model_strategie_id,
-                        block_group=block_group,
-                        current_model_type=current_model_type,
-                        best_params=best_params,
-                        export_model_callback=export_model_to_cpp,
-                    )
-                except Exception as e:
-                    log_message(f"Error during evaluation step: {e}", level="ERROR")
+    # 5. Bundle headers of every grouping/strategy (O(1) block-group dispatch)
+    if ExperimentConfig.EXPORT_CPP and getattr(ExperimentConfig, 'CPP_BUNDLE', False):
+        export_bundles([result[1] for result in results if result is not None and result[1] is not None])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,143 @@
+import os
+import numpy as np
+import pandas as pd
+from .grouping import GROUPING_VECTORIZED
+
+# Block sizes of the (Width, Height) lookup table: powers of two up to 128
+BLOCK_SIZES = [1 << i for i in range(8)]
+
+
+def dispatch_table(grouping_name, block_groups):
+    """
+    Lookup table of the model index of every dispatch key, derived by running the
+    grouping's own labelling function (GROUPING_VECTORIZED) over all the keys:
+    - 'frame_level': 1-D table indexed by FrameLevel (0 .. max exported level),
+    - any other grouping: 2-D table indexed by (log2(Width), log2(Height)).
+    Keys whose group has no model get -1.
+    """
+    model_index = {str(group): i for i, group in enumerate(block_groups)}
+
+    if grouping_name == 'frame_level':
+        keys = pd.DataFrame({'FrameLevel': np.arange(max(int(g) for g in block_groups) + 1)})
+        shape = (len(keys),)
+    else:
+        width, height = np.meshgrid(BLOCK_SIZES, BLOCK_SIZES, indexing='ij')
+        keys = pd.DataFrame({'Width': width.ravel(), 'Height': height.ravel()})
+        shape = (len(BLOCK_SIZES), len(BLOCK_SIZES))
+
+    labels = GROUPING_VECTORIZED[grouping_name](keys).astype(object)
+    table = np.array([model_index.get(str(label), -1) if pd.notna(label) else -1 for label in labels], dtype=np.int64)
+    return table.reshape(shape)
+
+
+def _model_wrapper(record, name, feature_index):
+    """
+    Calls one group model on the bundle feature array: its features are gathered
+    (by its feature index map) into a stack array, const float for table trees and
+    const double for the vector-style models, called through their _array entry point.
+    """
+    if record['arg'] == 'array':
+        ctype, function = "float", record['function_name']
+        gathered = ", ".join(f"(float)features[{name}_features[{i}]]" for i in range(len(feature_index)))
+    else:
+        ctype, function = "double", record['function_name'] + "_array"
+        gathered = ", ".join(f"features[{name}_features[{i}]]" for i in range(len(feature_index)))
+    code = f"static const int {name}_features[{len(feature_index)}] = {{ {', '.join(map(str, feature_index))} }};\n"
+
+    integer_classes = all(float(c).is_integer() for c in record['class_names']) if record['returns'] == 'class' else False
+    if integer_classes:
+        # Class index -> class label (groups may not share the same classes)
+        classes = ", ".join(str(int(c)) for c in record['class_names'])
+        code += f"static const int {name}_classes[{len(record['class_names'])}] = {{ {classes} }};\n"
+        ret, call = "int", f"{name}_classes[{function}(x)]"
+    else:
+        ret, call = {'class': 'int'}.get(record['returns'], record['returns']), f"{function}(x)"
+
+    code += f"inline {ret} {name}(const double * features) \n{{\n"
+    code += f"\tconst {ctype} x[{len(feature_index)}] = {{ {gathered} }};\n"
+    code += f"\treturn {call};\n}}\n"
+    return code, ret
+
+
+def save_bundle(records, grouping_name, bundle_name, output_dir):
+    """
+    Writes <output_dir>/<bundle_name>.h: the headers of every block-group model of
+    one grouping/strategy, a wrapper per model that gathers its features from the
+    double bundle feature array into a stack array (per-group index maps), and an
+    O(1) dispatcher: a lookup table maps (Width, Height) or FrameLevel to the model,
+    called through a table of function pointers. Vector-style models must have been
+    exported with their _array entry point. Returns the path of the bundle.
+    """
+    records = sorted(records, key=lambda r: str(r['block_group']))
+    block_groups = [r['block_group'] for r in records]
+    table = dispatch_table(grouping_name, block_groups)
+
+    # Bundle features: union of the group features, in order of first use
+    feature_names = list(dict.fromkeys(f for r in records for f in r['feature_names']))
+    position = {f: i for i, f in enumerate(feature_names)}
+
+    feature_string = "".join(f"features[{i}] - {f}\n" for i, f in enumerate(feature_names))
+    model_string = "".join(f"{i} - {r['block_group']} ({r['function_name']})\n" for i, r in enumerate(records))
+    key_string = "int frame_level" if grouping_name == 'frame_level' else "int width, int height"
+    code = f"""
+/*
+Bundle of the {len(records)} block-group models of grouping '{grouping_name}', automatically generated.
+
+{bundle_name}_model({key_string}) returns the model of a block through a lookup
+table derived from the grouping rules (-1: no model), and
+{bundle_name}({key_string}, const double * features, fallback) evaluates it (fallback when
+there is no model). It takes the bundle feature array:
+{feature_string}
+Models:
+{model_string}*/
+
+#include <vector>
+#include <cstdint>
+
+"""
+    for r in records:
+        with open(r['header']) as f:
+            code += f.read() + "\n"
+
+    rets = set()
+    for i, r in enumerate(records):
+        wrapper, ret = _model_wrapper(r, f"{bundle_name}_g{i}", [position[f] for f in r['feature_names']])
+        code += "\n" + wrapper
+        rets.add(ret)
+    if len(rets) != 1:
+        raise ValueError(f"Models of bundle {bundle_name} return different types: {sorted(rets)}")
+    ret = rets.pop()
+
+    # Dispatcher
+    code += f"\ntypedef {ret} (*{bundle_name}_fn)(const double *);\n"
+    code += f"static {bundle_name}_fn const {bundle_name}_models[{len(records)}] = {{ "
+    code += ", ".join(f"{bundle_name}_g{i}" for i in range(len(records))) + " };\n\n"
+
+    if grouping_name == 'frame_level':
+        code += f"static const int8_t {bundle_name}_lut[{len(table)}] = {{ {', '.join(map(str, table))} }};\n\n"
+        code += f"inline int {bundle_name}_model(int frame_level) \n{{\n"
+        code += f"\treturn frame_level >= 0 && frame_level < {len(table)} ? {bundle_name}_lut[frame_level] : -1;\n}}\n\n"
+        args, key_args = "int frame_level", "frame_level"
+    else:
+        size_index = [-1] * (BLOCK_SIZES[-1] + 1)
+        for i, size in enumerate(BLOCK_SIZES):
+            size_index[size] = i
+        rows = ",\n".join("\t{ " + ", ".join(map(str, row)) + " }" for row in table)
+        code += f"// log2 of a power-of-two block size (-1 otherwise)\n"
+        code += f"static const int8_t {bundle_name}_size_index[{len(size_index)}] = {{ {', '.join(map(str, size_index))} }};\n"
+        code += f"// Model of (log2(Width), log2(Height))\n"
+        code += f"static const int8_t {bundle_name}_lut[{len(BLOCK_SIZES)}][{len(BLOCK_SIZES)}] = {{\n{rows}\n}};\n\n"
+        code += f"inline int {bundle_name}_model(int width, int height) \n{{\n"
+        code += f"\tif (width < 0 || height < 0 || width > {BLOCK_SIZES[-1]} || height > {BLOCK_SIZES[-1]})\n\t\treturn -1;\n"
+        code += f"\tconst int w = {bundle_name}_size_index[width], h = {bundle_name}_size_index[height];\n"
+        code += f"\treturn w < 0 || h < 0 ? -1 : {bundle_name}_lut[w][h];\n}}\n\n"
+        args, key_args = "int width, int height", "width, height"
+
+    code += f"inline {ret} {bundle_name}({args}, const double * features, {ret} fallback) \n{{\n"
+    code += f"\tconst int model = {bundle_name}_model({key_args});\n"
+    code += f"\treturn model < 0 ? fallback : {bundle_name}_models[model](features);\n}}\n"
+
+    path = os.path.join(output_dir, bundle_name + ".h")
+    with open(path, "w") as f:
+        f.write(code)
+    return path
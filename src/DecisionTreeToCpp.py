@@ -9,8 +9,28 @@
 # http://stackoverflow.com/users/1885917/daniele
 #
 
+import numpy as np
 
-def get_code(tree, feature_names, function_name="decision_tree"):
+
+_LIKELY_MACRO = """#ifndef DT_LIKELY
+#if defined(__GNUC__) || defined(__clang__)
+#define DT_LIKELY(x) __builtin_expect(!!(x), 1)
+#else
+#define DT_LIKELY(x) (x)
+#endif
+#endif
+
+"""
+
+
+def get_code(tree, feature_names, function_name="decision_tree", visit_counts=None, array=False):
+    """
+    Nested if/else export. With `visit_counts` (profiled visits per node), the
+    more visited child of every node is emitted first and marked DT_LIKELY
+    (NaN-safe: a right-first node tests !(x <= threshold)). With `array`, the tree
+    is emitted as <function_name>_array(const double *) and the std::vector
+    function calls it.
+    """
     left = tree.tree_.children_left
     right = tree.tree_.children_right
     threshold = tree.tree_.threshold
@@ -20,17 +40,25 @@ def get_code(tree, feature_names, function_name="decision_tree"):
     def recurse(left, right, threshold, features, node, tabs):
         code = ''
         if threshold[node] != -2:
-            code += '%sif (feature_vector.at(%s) <= %s) {\n' % (tabs * '\t', feature_names.index(features[node]), round(threshold[node], 2))
+            test = access % feature_names.index(features[node]) + ' <= %s' % round(threshold[node], 2)
+            first, second = left[node], right[node]
+            if visit_counts is not None:
+                if visit_counts[right[node]] > visit_counts[left[node]]:
+                    test, first, second = '!(%s)' % test, second, first
+                if visit_counts[first] != visit_counts[second]:
+                    test = 'DT_LIKELY(%s)' % test
+
+            code += '%sif (%s) {\n' % (tabs * '\t', test)
             tabs += 1
 
-            if left[node] != -1:
-                code += recurse(left, right, threshold, features, left[node], tabs)
+            if first != -1:
+                code += recurse(left, right, threshold, features, first, tabs)
             tabs -= 1
             code += '%s}\n%selse {\n' % (tabs * '\t', tabs * '\t')
 
             tabs += 1
-            if right[node] != -1:
-                code += recurse(left, right, threshold, features, right[node], tabs)
+            if second != -1:
+                code += recurse(left, right, threshold, features, second, tabs)
             tabs -= 1
             code += '%s}\n' % (tabs * '\t')
 
@@ -39,16 +67,169 @@ def get_code(tree, feature_names, function_name="decision_tree"):
 
         return code
 
-    code = "inline int %s(const std::vector<double> & feature_vector) \n{\n%s}" \
-           % (function_name, recurse(left, right, threshold, features, 0, 1))
+    access = 'features[%s]' if array else 'feature_vector.at(%s)'
+    body = recurse(left, right, threshold, features, 0, 1)
+    if array:
+        code = "inline int %s_array(const double * features) \n{\n%s}\n\n%s" \
+               % (function_name, body, _vector_entry("int", function_name, len(feature_names)))
+    else:
+        code = "inline int %s(const std::vector<double> & feature_vector) \n{\n%s}" % (function_name, body)
+    if visit_counts is not None:
+        code = _LIKELY_MACRO + code
     return code
 
 
-def save_code(tree, feature_names, class_names, function_name="decision_tree"):
+def _vector_entry(ret, function_name, n_features):
+    """std::vector<double> entry point calling <function_name>_array on its data (after a bounds check)."""
+    return ("inline %s %s(const std::vector<double> & feature_vector) \n{\n"
+            "\t(void)feature_vector.at(%d); // throws std::out_of_range on a short vector\n"
+            "\treturn %s_array(feature_vector.data());\n}") % (ret, function_name, n_features - 1, function_name)
+
+
+def _hot_first_order(tree_, internal, visit_counts):
+    """Internal nodes in depth-first order, hot child first (the hot path is contiguous in the tables)."""
+    left, right = tree_.children_left, tree_.children_right
+    order, stack = [], [0]
+    while stack:
+        node = stack.pop()
+        if left[node] == -1:
+            continue
+        order.append(node)
+        hot, cold = (right[node], left[node]) if visit_counts[right[node]] > visit_counts[left[node]] else (left[node], right[node])
+        stack.extend((cold, hot))
+    return np.array(order, dtype=np.int64)
+
+
+def _float_threshold(threshold):
+    """Largest float32 <= threshold: for any float x, x <= t32 gives the same branch as x <= threshold."""
+    t32 = np.float32(threshold)
+    if t32 > threshold:
+        t32 = np.nextafter(t32, np.float32(-np.inf))
+    return t32
+
+
+def _float_literal(value):
+    """C++ float literal of the float32 `value`: shortest round-trip digits, always with a '.' or an exponent."""
+    return str(np.float32(value)) + 'f'
+
+
+def _int_type(max_abs):
+    for name, bits in (('int8_t', 8), ('int16_t', 16)):
+        if max_abs < 2 ** (bits - 1):
+            return name
+    return 'int32_t'
+
+
+def _table_arrays(tree, feature_names, function_name, visit_counts=None):
+    """
+    Static const node arrays of the table export: (code, leaf class of a single-leaf
+    tree or None). A child >= 0 is an internal node; a leaf is stored as ~class.
+    """
+    tree_ = tree.tree_
+    left, right = tree_.children_left, tree_.children_right
+    leaf_class = tree_.value[:, 0, :].argmax(axis=1)
+
+    internal = np.flatnonzero(left != -1)
+    if len(internal) == 0:
+        return "", int(leaf_class[0])
+
+    # Internal nodes renumbered in node order, or hot path first (the root stays 0)
+    if visit_counts is not None:
+        internal = _hot_first_order(tree_, internal, visit_counts)
+    table_id = np.full(tree_.node_count, -1, dtype=np.int64)
+    table_id[internal] = np.arange(len(internal))
+
+    def child_codes(children):
+        return [int(table_id[c]) if left[c] != -1 else ~int(leaf_class[c]) for c in children[internal]]
+
+    lefts, rights = child_codes(left), child_codes(right)
+    features = [int(tree_.feature[n]) for n in internal]
+    thresholds = [_float_literal(_float_threshold(tree_.threshold[n])) for n in internal]
 
+    child_type = _int_type(max(len(internal), int(leaf_class.max()) + 1))
+    feature_type = 'uint8_t' if len(feature_names) <= 256 else 'uint16_t'
+
+    def array(ctype, name, values):
+        return "static const %s %s_%s[%d] = { %s };\n" % (ctype, function_name, name, len(values), ", ".join(map(str, values)))
+
+    code = "// %d internal nodes, %d leaves\n" % (len(internal), tree_.node_count - len(internal))
+    code += array(feature_type, "feature", features)
+    code += array("float", "threshold", thresholds)
+    code += array(child_type, "left", lefts)
+    code += array(child_type, "right", rights)
+    return code, None
+
+
+def get_table_code(tree, feature_names, function_name="decision_tree", visit_counts=None, arrays=True):
+    """
+    Table-driven export: internal nodes as static const arrays (feature index, float
+    threshold, left/right child) and an iterative traversal over a `const float*`.
+    A child >= 0 is an internal node; a leaf is stored as ~class (i.e. -class - 1).
+    With `visit_counts`, nodes are laid out depth-first with the hot child first.
+    `arrays=False` omits the arrays (already emitted, e.g. for the batch API).
+    """
+    table, constant = _table_arrays(tree, feature_names, function_name, visit_counts)
+    if constant is not None:
+        return "inline int %s(const float * features) \n{\n\t(void)features;\n\treturn %d;\n}" \
+               % (function_name, constant)
+
+    code = table + "\n" if arrays else ""
+    code += "inline int %s(const float * features) \n{\n" % function_name
+    code += "\tint node = 0;\n"
+    code += "\tdo {\n"
+    code += "\t\tnode = features[{0}_feature[node]] <= {0}_threshold[node] ? {0}_left[node] : {0}_right[node];\n".format(function_name)
+    code += "\t} while (node >= 0);\n"
+    code += "\treturn ~node;\n}"
+    return code
+
+
+def get_batch_code(tree, feature_names, function_name="decision_tree", visit_counts=None, arrays=True):
+    """
+    Batch entry point <function_name>_batch over a structure-of-arrays float buffer
+    (feature j of sample i at features[j * n + i]), traversing the table arrays
+    (emitted here unless `arrays=False`). Writes the class index of every sample.
+    """
+    table, constant = _table_arrays(tree, feature_names, function_name, visit_counts)
+    signature = "inline void %s_batch(const float * __restrict features, int n, int * __restrict out) \n{\n" % function_name
+    if constant is not None:
+        return signature + "\t(void)features;\n\tfor (int i = 0; i < n; i++)\n\t\tout[i] = %d;\n}" % constant
+
+    code = table + "\n" if arrays else ""
+    code += "// SoA batch: feature j of sample i at features[j * n + i]\n"
+    code += signature
+    code += "\tfor (int i = 0; i < n; i++) {\n"
+    code += "\t\tint node = 0;\n"
+    code += "\t\tdo {\n"
+    code += "\t\t\tnode = features[(size_t){0}_feature[node] * n + i] <= {0}_threshold[node] ? {0}_left[node] : {0}_right[node];\n".format(function_name)
+    code += "\t\t} while (node >= 0);\n"
+    code += "\t\tout[i] = ~node;\n"
+    code += "\t}\n}"
+    return code
+
+
+def average_comparisons(tree, visit_counts):
+    """Expected number of comparisons per prediction under the profiled visit counts."""
+    internal = tree.tree_.children_left != -1
+    return visit_counts[internal].sum() / visit_counts[0] if visit_counts[0] else 0.0
+
+
+def save_code(tree, feature_names, class_names, function_name="decision_tree", style="if_else", visit_counts=None,
+              batch=False, array=False):
+    """
+    Writes <function_name>.h with the tree as nested if/else on a
+    std::vector<double> (style='if_else') or as static arrays traversed over a
+    const float* (style='table'). `visit_counts` (visits per node on profiling
+    data) enables the profile-guided branch layout. `batch` adds the
+    <function_name>_batch entry point over a structure-of-arrays float buffer.
+    `array` adds the if/else entry point <function_name>_array(const double *).
+    """
+    if style not in ('if_else', 'table'):
+        raise ValueError("Unknown C++ tree style: %s" % style)
+
+    arg_name = 'feature_vector' if style == 'if_else' else 'features'
     feature_string = ""
     for i in range(0, len(feature_names)):
-        feature_string += 'feature_vector[%s] - %s\n' % (i, feature_names[i])
+        feature_string += '%s[%s] - %s\n' % (arg_name, i, feature_names[i])
     classes_string = ""
     for i in range(0, len(class_names)):
         classes_string += '%s - %s\n' % (i, class_names[i])
@@ -57,7 +238,7 @@ def save_code(tree, feature_names, class_names, function_name="decision_tree"):
 /*
 This inline function was automatically generated using DecisionTreeToCpp Converter
 
-It takes feature vector as single argument:
+It takes %s as single argument:
 %s
 
 It returns index of predicted class:
@@ -66,9 +247,28 @@ It returns index of predicted class:
 Simply include this file to your project and use it
 */
 
-""" % (feature_string, classes_string)
+""" % ('feature vector' if style == 'if_else' else 'a float feature array', feature_string, classes_string)
+
+    if visit_counts is not None:
+        preamble += "// Profile-guided layout: %.2f comparisons per prediction on average (%d profiled rows)\n\n" \
+                    % (average_comparisons(tree, visit_counts), visit_counts[0])
+    if array and style == 'if_else':
+        preamble += "// %s_array(const double * features): same function on a plain array, same feature order\n\n" \
+                    % function_name
+
+    if style == 'table':
+        includes = ['cstdint']
+        body = get_table_code(tree, feature_names, function_name, visit_counts)
+    else:
+        includes = ['vector']
+        body = get_code(tree, feature_names, function_name, visit_counts, array)
+
+    if batch:
+        # The table style already emitted the node arrays
+        includes = ['cstddef', 'cstdint'] + [h for h in includes if h != 'cstdint']
+        body += '\n\n' + get_batch_code(tree, feature_names, function_name, visit_counts, arrays=(style != 'table'))
 
-    code = '%s#include <vector>\n\n%s' % (preamble, get_code(tree, feature_names, function_name))
+    code = '%s%s\n%s' % (preamble, ''.join('#include <%s>\n' % h for h in includes), body)
 
     with open(function_name + '.h', "w") as f:
         f.write(code)
@@ -1,44 +1,265 @@
 import math
+import numpy as np
 
-def get_code(model, feature_names, class_names, function_name="logistic_model"):
-    coefficients = model.coef_[0]
-    bias = model.intercept_[0]
-    
+def fold_preprocessing(model, feature_names, preprocessing=None):
+    """
+    Weights, bias and imputation values of the model on RAW features.
+
+    The standardization is folded into the weights:
+    w . (x - mean) / scale + b  ==  (w / scale) . x + (b - w . mean / scale)
+    `preprocessing` holds the pipeline's 'means' / 'scales' / 'impute_values'
+    (pd.Series by feature name); missing entries are skipped.
+    """
+    coefficients = np.asarray(model.coef_[0], dtype=np.float64)
+    bias = float(model.intercept_[0])
+    preprocessing = preprocessing or {}
+
+    if preprocessing.get('means') is not None:
+        scales = preprocessing['scales'][feature_names].to_numpy(dtype=np.float64)
+        means = preprocessing['means'][feature_names].to_numpy(dtype=np.float64)
+        coefficients = coefficients / scales
+        bias -= float(coefficients @ means)
+
+    impute_values = None
+    if preprocessing.get('impute_values') is not None:
+        impute_values = preprocessing['impute_values'][feature_names].to_numpy(dtype=np.float64)
+
+    return coefficients, bias, impute_values
+
+def _double_literal(value):
+    """C++ double literal that round-trips exactly (repr: shortest digits, always a '.' or an exponent)."""
+    return repr(float(value))
+
+def _float_literal(value):
+    """C++ float literal of float32(value): shortest round-trip digits, always a '.' or an exponent."""
+    return str(np.float32(value)) + 'f'
+
+def logit(probability):
+    """Score threshold equivalent to a probability threshold: sigmoid(score) > p  <=>  score > logit(p)."""
+    if not 0.0 < probability < 1.0:
+        raise ValueError("The decision threshold must be in (0, 1)")
+    return math.log(probability / (1.0 - probability))
+
+def _weight_bits(weight):
+    """Most fractional bits with round(weight * 2**bits) still in the int32 range."""
+    bits = 31 - math.frexp(weight)[1]
+    if abs(round(math.ldexp(weight, bits))) >= 2**31:
+        bits -= 1
+    return bits
+
+def quantize_weights(coefficients, bias, frac_bits, input_bits=0):
+    """
+    Fixed-point weights with one scale per feature: weight j is an int32 with its own
+    fractional bits, as many as fit (small weights keep their precision instead of
+    rounding to 0), and its int64 product with the feature is shifted right by
+    shifts[j] to the accumulator scale 2**(frac_bits + input_bits), for inputs with
+    `input_bits` fractional bits. frac_bits is reduced when a weight cannot reach it
+    within an int32. The bias is an int64 at the accumulator scale.
+    Returns (weights, shifts, bias, frac_bits).
+    """
+    bits = np.array([_weight_bits(w) if w != 0 else frac_bits for w in coefficients], dtype=np.int64)
+    if bits.min(initial=0) < 0:
+        raise ValueError("A weight does not fit an int32")
+    frac_bits = int(min(frac_bits, bits.min(initial=frac_bits)))
+    # Shifts of 63+ are undefined in C++; such weights are negligible anyway
+    shifts = np.minimum(bits - frac_bits, 62)
+    weights = np.round(np.ldexp(coefficients, frac_bits + shifts)).astype(np.int64)
+    return weights, shifts, int(np.round(math.ldexp(bias, frac_bits + input_bits))), frac_bits
+
+def fixed_point_mismatch(model, X, feature_names, preprocessing=None, threshold=0.5, frac_bits=16, input_bits=0):
+    """
+    Fraction of the rows of X (features as the model sees them, i.e. preprocessed)
+    where the fixed-point decision of the export differs from the float model's
+    decision_function > logit(threshold). The fixed-point side gets the raw
+    features as round(x * 2**input_bits) saturated to the int32 range of the C++
+    argument, and replays its int64 products and shifts exactly.
+    """
+    coefficients, bias, _ = fold_preprocessing(model, feature_names, preprocessing)
+    weights, shifts, bias_q, _ = quantize_weights(coefficients, bias - logit(threshold), frac_bits, input_bits)
+
+    preprocessing = preprocessing or {}
+    raw = np.asarray(X, dtype=np.float64)
+    if preprocessing.get('means') is not None:
+        raw = raw * preprocessing['scales'][feature_names].to_numpy() + preprocessing['means'][feature_names].to_numpy()
+
+    inputs = np.clip(np.rint(np.ldexp(raw, input_bits)), -2**31, 2**31 - 1).astype(np.int64)
+    float_decision = model.decision_function(X) > logit(threshold)
+    fixed_decision = (np.right_shift(inputs * weights, shifts).sum(axis=1) + bias_q) > 0
+    return float(np.mean(float_decision != fixed_decision)) if len(X) else 0.0
+
+def get_code(model, feature_names, class_names, function_name="logistic_model", preprocessing=None, threshold=None,
+             array=False):
+    """
+    Probability export (sigmoid through std::exp), or with a probability `threshold`
+    the decision only: the threshold becomes a logit threshold, so there is no exp.
+    With `array`, the function is emitted as <function_name>_array(const double *)
+    and the std::vector function calls it.
+    """
+    coefficients, bias, impute_values = fold_preprocessing(model, feature_names, preprocessing)
+    # Negligible weights are dropped on the model's own (standardized) scale, not the folded one
+    used = np.abs(np.asarray(model.coef_[0], dtype=np.float64)) > 1e-9
+
+    access = "features[{i}]" if array else "feature_vector.at({i})"
     code = ""
+    if impute_values is not None:
+        code += f"\t// Missing values (NaN) are replaced by the training imputation constants\n"
+        code += f"\tauto x = [&](int i) {{ const double v = {access.format(i='i')}; return std::isnan(v) ? {function_name}_impute_values[i] : v; }};\n\n"
+        value = "x({i})"
+    else:
+        value = access
+
     code += f"\t// Bias (Intercept)\n"
-    code += f"\tdouble score = {bias:.16f};\n\n"
-    
+    code += f"\tdouble score = {_double_literal(bias)};\n\n"
+
     code += f"\t// Weighted Sum (Dot Product)\n"
     for i, (coef, feat_name) in enumerate(zip(coefficients, feature_names)):
-        if abs(coef) > 1e-9:
-            code += f"\tscore += feature_vector.at({i}) * {coef:.16f}; // {feat_name}\n"
-    
-    code += "\n\t// Return Probability using Sigmoid: 1 / (1 + exp(-score))\n"
-    code += "\treturn 1.0 / (1.0 + std::exp(-score));\n"
-    wrapper = f"inline double {function_name}(const std::vector<double> & feature_vector) \n{{\n{code}}}"
+        if used[i]:
+            code += f"\tscore += {value.format(i=i)} * {_double_literal(coef)}; // {feat_name}\n"
+
+    if threshold is None:
+        code += "\n\t// Return Probability using Sigmoid: 1 / (1 + exp(-score))\n"
+        code += "\treturn 1.0 / (1.0 + std::exp(-score));\n"
+        ret = "double"
+    else:
+        code += f"\n\t// sigmoid(score) > {threshold}  <=>  score > logit({threshold})\n"
+        code += f"\treturn score > {_double_literal(logit(threshold))};\n"
+        ret = "bool"
+
+    if array:
+        wrapper = (f"inline {ret} {function_name}_array(const double * features) \n{{\n{code}}}\n\n"
+                   f"inline {ret} {function_name}(const std::vector<double> & feature_vector) \n{{\n"
+                   f"\t(void)feature_vector.at({len(feature_names) - 1}); // throws std::out_of_range on a short vector\n"
+                   f"\treturn {function_name}_array(feature_vector.data());\n}}")
+    else:
+        wrapper = f"inline {ret} {function_name}(const std::vector<double> & feature_vector) \n{{\n{code}}}"
+
+    if impute_values is not None:
+        constants = ", ".join(_double_literal(v) for v in impute_values)
+        wrapper = f"static const double {function_name}_impute_values[{len(impute_values)}] = {{ {constants} }};\n\n{wrapper}"
     return wrapper
 
-def save_code(model, feature_names, class_names, function_name="logistic_model", output_dir="."):
+def get_fixed_point_code(model, feature_names, function_name="logistic_model", preprocessing=None, threshold=0.5,
+                         frac_bits=16, input_bits=0):
+    """
+    Integer-only decision: int32 weights with a scale per feature (see
+    quantize_weights), each product shifted to an accumulator with `frac_bits`
+    fractional bits, the bias and logit threshold folded into one int64 constant,
+    integer features with `input_bits` fractional bits.
+    """
+    coefficients, bias, _ = fold_preprocessing(model, feature_names, preprocessing)
+    weights, shifts, bias_q, frac_bits = quantize_weights(coefficients, bias - logit(threshold), frac_bits, input_bits)
+
+    code = (f"\t// Fixed point, accumulator with {frac_bits + input_bits} and features with {input_bits} fractional bits: "
+            f"bias - logit({threshold}) folded into the accumulator\n")
+    code += f"\t// Weight j has {frac_bits} + shift fractional bits; >> is an arithmetic shift (floor)\n"
+    code += f"\tint64_t acc = {bias_q}LL;\n\n"
+    for i, (w, shift, feat_name) in enumerate(zip(weights, shifts, feature_names)):
+        if w != 0:
+            product = f"(int64_t)feature_vector.at({i}) * {w}"
+            term = f"({product}) >> {shift}" if shift else product
+            code += f"\tacc += {term}; // {feat_name}\n"
+    code += "\n\treturn acc > 0;\n"
+    return f"inline bool {function_name}_fixed(const std::vector<int32_t> & feature_vector) \n{{\n{code}}}"
+
+def get_batch_code(model, feature_names, function_name="logistic_model", preprocessing=None, threshold=None, block=64):
+    """
+    Batch entry point <function_name>_batch over a structure-of-arrays float buffer
+    (feature j of sample i at features[j * n + i]). Samples are scored in blocks:
+    for every feature, one weight of the aligned static weights array times a
+    contiguous run of samples, a loop the compiler auto-vectorizes. Writes the
+    probabilities, or the decisions (0/1) with a probability `threshold`.
+    """
+    coefficients, bias, impute_values = fold_preprocessing(model, feature_names, preprocessing)
+
+    def array(name, values):
+        return f"alignas(32) static const float {function_name}_{name}[{len(values)}] = {{ {', '.join(_float_literal(v) for v in values)} }};\n"
+
+    out_type = "float" if threshold is None else "uint8_t"
+    code = array("weights", coefficients)
+    if impute_values is not None:
+        code += array("batch_impute_values", impute_values)
+    code += "\n// SoA batch: feature j of sample i at features[j * n + i]\n"
+    code += f"inline void {function_name}_batch(const float * __restrict features, int n, {out_type} * __restrict out) \n{{\n"
+    code += f"\tfor (int start = 0; start < n; start += {block}) {{\n"
+    code += f"\t\tconst int m = n - start < {block} ? n - start : {block};\n"
+    code += f"\t\talignas(32) float score[{block}];\n"
+    code += "\t\tfor (int i = 0; i < m; i++)\n"
+    code += f"\t\t\tscore[i] = {_float_literal(bias)};\n"
+    code += f"\t\tfor (int j = 0; j < {len(coefficients)}; j++) {{\n"
+    code += f"\t\t\tconst float w = {function_name}_weights[j];\n"
+    code += "\t\t\tconst float * column = features + (size_t)j * n + start;\n"
+    code += "\t\t\tfor (int i = 0; i < m; i++)\n"
+    if impute_values is not None:
+        code += f"\t\t\t\tscore[i] += w * (std::isnan(column[i]) ? {function_name}_batch_impute_values[j] : column[i]);\n"
+    else:
+        code += "\t\t\t\tscore[i] += w * column[i];\n"
+    code += "\t\t}\n"
+    code += "\t\tfor (int i = 0; i < m; i++)\n"
+    if threshold is None:
+        code += "\t\t\tout[start + i] = 1.0f / (1.0f + std::exp(-score[i]));\n"
+    else:
+        code += f"\t\t\tout[start + i] = score[i] > {_float_literal(logit(threshold))};\n"
+    code += "\t}\n}"
+    return code
+
+def save_code(model, feature_names, class_names, function_name="logistic_model", output_dir=".", preprocessing=None,
+              threshold=None, frac_bits=None, input_bits=0, mismatch_rate=None, batch=False, array=False):
+    """
+    Writes <output_dir>/<function_name>.h. With a probability `threshold` the
+    function returns the decision (logit threshold, no exp), and with `frac_bits`
+    a <function_name>_fixed integer variant is added (features passed as
+    round(x * 2**input_bits)); `mismatch_rate` (fixed vs
+    float decisions on the test set) is reported in the header. `batch` adds the
+    <function_name>_batch entry point over a structure-of-arrays float buffer, and
+    `array` the <function_name>_array(const double *) entry point.
+    """
     feature_string = ""
     for i in range(len(feature_names)):
         feature_string += f"feature_vector[{i}] - {feature_names[i]}\n"
-    
+
+    preprocessing = preprocessing or {}
+    folded = []
+    if preprocessing.get('impute_values') is not None:
+        folded.append("NaN inputs are replaced by the training imputation values")
+    if preprocessing.get('means') is not None:
+        folded.append("the StandardScaler is folded into the weights and bias")
+    input_note = "Inputs are RAW features: " + "; ".join(folded) + ".\n" if folded else ""
+
+    if threshold is None:
+        output_note = "It returns the PROBABILITY (double) of the positive class (e.g., IsIntra).\nRange: [0.0, 1.0]"
+    else:
+        output_note = f"It returns the DECISION (bool): probability of the positive class (e.g., IsIntra) > {threshold}."
+    if threshold is not None and frac_bits is not None:
+        output_note += (f"\n{function_name}_fixed: same decision in integer arithmetic (quantized weights), "
+                        f"features passed as integers round(x * 2^{input_bits}).")
+        if mismatch_rate is not None:
+            output_note += f"\nFixed-point vs float decisions differ on {mismatch_rate * 100:.4f}% of the test set."
+    if array:
+        output_note += f"\n{function_name}_array: same function on a plain const double array, same feature order."
+
     preamble = f"""
 /*
 This inline function was automatically generated using LogisticRegToCpp Converter
 It takes feature vector as single argument:
 {feature_string}
-
-It returns the PROBABILITY (double) of the positive class (e.g., IsIntra).
-Range: [0.0, 1.0]
+{input_note}
+{output_note}
 */
 """
-    cpp_logic = get_code(model, feature_names, class_names, function_name)
-    
-    final_content = f"{preamble}#include <vector>\n#include <cmath>\n\n{cpp_logic}\n"
+    cpp_logic = get_code(model, feature_names, class_names, function_name, preprocessing, threshold, array)
+    includes = "#include <vector>\n#include <cmath>\n"
+    if threshold is not None and frac_bits is not None:
+        cpp_logic += "\n\n" + get_fixed_point_code(model, feature_names, function_name, preprocessing, threshold,
+                                                      frac_bits, input_bits)
+        includes += "#include <cstdint>\n"
+    if batch:
+        cpp_logic += "\n\n" + get_batch_code(model, feature_names, function_name, preprocessing, threshold)
+        includes += "#include <cstddef>\n" + ("" if "<cstdint>" in includes else "#include <cstdint>\n")
+
+    final_content = f"{preamble}{includes}\n{cpp_logic}\n"
 
     filename = f"{output_dir}/{function_name}.h"
     with open(filename, "w") as f:
         f.write(final_content)
-    
-    return 0
\ No newline at end of file
+
+    return 0
@@ -0,0 +1,249 @@
+import heapq
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.utils.validation import check_is_fitted
+from .tree_utils import TreeArrays, TREE_LEAF, TREE_UNDEFINED, impurity_importances
+
+_EPSILON = 1e-7
+
+
+def quantile_thresholds(X, max_bins=256, subsample=200_000, random_state=None):
+    """
+    Candidate split thresholds of every feature: midpoints between consecutive
+    distinct values (at most max_bins - 1 of them, quantile-spaced on a row
+    subsample when a feature has more distinct values).
+    """
+    rng = np.random.RandomState(random_state)
+    rows = rng.choice(X.shape[0], subsample, replace=False) if X.shape[0] > subsample else slice(None)
+
+    thresholds = []
+    for j in range(X.shape[1]):
+        col = np.asarray(X[rows, j], dtype=np.float64)
+        uniques = np.unique(col[~np.isnan(col)])
+        if len(uniques) <= max_bins:
+            cuts = uniques[:-1]
+        else:
+            ordered = np.sort(col[~np.isnan(col)])
+            cuts = np.unique(ordered[np.linspace(0, len(ordered) - 1, max_bins + 1)[1:-1].astype(np.int64)])
+            cuts = cuts[cuts < uniques[-1]]
+        upper = uniques[np.searchsorted(uniques, cuts) + 1]
+        thresholds.append((cuts + upper) / 2)
+    return thresholds
+
+
+def bin_features(X, thresholds):
+    """uint8 bin codes: code <= b  <=>  value <= thresholds[b] (NaN goes to the last bin)."""
+    codes = np.empty(X.shape, dtype=np.uint8)
+    for j, t in enumerate(thresholds):
+        codes[:, j] = np.searchsorted(t, X[:, j], side='left')
+    return codes
+
+
+class FeatureBinner:
+    """
+    Bins the features of one block group once: quantile thresholds fitted on its
+    train frame, uint8 codes of any frame with those columns. The codes go through
+    every decision-tree fit of the group (RFE, tuning, curves, final model) with
+    prebinned estimators, and restore_thresholds puts a fitted tree back in
+    feature units for evaluation and export.
+    """
+
+    def __init__(self, max_bins=256, random_state=None):
+        self.max_bins = max_bins
+        self.random_state = random_state
+
+    def fit(self, X):
+        if not 2 <= self.max_bins <= 256:
+            raise ValueError("max_bins must be in [2, 256]")
+        thresholds = quantile_thresholds(X.to_numpy(dtype=np.float64), self.max_bins, random_state=self.random_state)
+        self.thresholds_ = dict(zip(X.columns, thresholds))
+        return self
+
+    def transform(self, X):
+        codes = bin_features(X.to_numpy(dtype=np.float64), [self.thresholds_[c] for c in X.columns])
+        return pd.DataFrame(codes, index=X.index, columns=X.columns)
+
+    def restore_thresholds(self, model):
+        """Maps the code-unit thresholds (bin + 0.5) of a prebinned tree to feature units, in place."""
+        tree = model.tree_
+        thresholds = [self.thresholds_[c] for c in model.feature_names_in_]
+        for node in np.flatnonzero(tree.feature >= 0):
+            tree.threshold[node] = thresholds[tree.feature[node]][int(tree.threshold[node])]
+        model.bin_thresholds_, model.prebinned = thresholds, False
+        return model
+
+
+def _xlog2x(x):
+    return x * np.log2(np.where(x > 0, x, 1))
+
+
+def _weighted_impurity(counts, n, criterion):
+    """n * impurity (gini or entropy) of class counts (..., K) with totals n (...)."""
+    safe_n = np.where(n > 0, n, 1)
+    if criterion == 'gini':
+        return n - np.einsum('...k,...k->...', counts, counts) / safe_n
+    return _xlog2x(n) - _xlog2x(counts).sum(axis=-1)
+
+
+class BinnedDecisionTreeClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Decision tree grown by histogram split finding on binned features.
+
+    Each feature is quantized into at most `max_bins` (<= 256) bins (uint8 codes),
+    and each node finds its best split from per-bin class counts (one bincount over
+    all features, the larger child's histogram being the parent minus the smaller
+    one) instead of sorting the raw values. The fitted `tree_` has sklearn's array
+    layout, thresholds in real feature units, so it is exported and pruned like a
+    DecisionTreeClassifier.
+
+    With `prebinned`, X already holds the codes of a FeatureBinner (binned once per
+    block group) and the thresholds are in code units until
+    FeatureBinner.restore_thresholds. Otherwise every fit bins its own X.
+
+    Equivalence with DecisionTreeClassifier holds on the training data only: the
+    splits are limited to the bin edges of the training values, so the trees match
+    only when every feature has at most max_bins distinct training values, and
+    unseen values between two edges follow the binned split.
+    """
+
+    def __init__(self, criterion='gini', max_depth=None, min_samples_split=2, min_samples_leaf=1,
+                 max_leaf_nodes=None, ccp_alpha=0.0, max_bins=256, prebinned=False, random_state=None):
+        self.criterion = criterion
+        self.max_depth = max_depth
+        self.min_samples_split = min_samples_split
+        self.min_samples_leaf = min_samples_leaf
+        self.max_leaf_nodes = max_leaf_nodes
+        self.ccp_alpha = ccp_alpha
+        self.max_bins = max_bins
+        self.prebinned = prebinned
+        self.random_state = random_state
+
+    def _min_count(self, value, n_samples):
+        # Float values are fractions of the samples, like sklearn
+        return int(np.ceil(value * n_samples)) if isinstance(value, float) else int(value)
+
+    def fit(self, X, y):
+        if not 2 <= self.max_bins <= 256:
+            raise ValueError("max_bins must be in [2, 256]")
+        if self.criterion not in ('gini', 'entropy', 'log_loss'):
+            raise ValueError(f"Unknown criterion: {self.criterion}")
+        if hasattr(X, 'columns'):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        X = np.asarray(X)
+        if X.dtype.kind != 'f':
+            X = X.astype(np.float64)
+
+        self.classes_, y_codes = np.unique(np.asarray(y), return_inverse=True)
+        self.n_classes_ = len(self.classes_)
+        self.n_features_in_ = X.shape[1]
+        self.n_outputs_ = 1
+
+        if self.prebinned:
+            # Codes of a FeatureBinner: a split after bin b is the threshold b + 0.5
+            codes = X.astype(np.uint8)
+            if not np.array_equal(codes, X):
+                raise ValueError("prebinned=True expects the bin codes of a FeatureBinner (integers in [0, 255])")
+            self._n_bins = int(codes.max(initial=0)) + 1
+            self.bin_thresholds_ = [np.arange(self._n_bins - 1) + 0.5] * X.shape[1]
+        else:
+            self.bin_thresholds_ = quantile_thresholds(X, self.max_bins, random_state=self.random_state)
+            codes = bin_features(X, self.bin_thresholds_)
+            self._n_bins = max(len(t) for t in self.bin_thresholds_) + 1
+
+        self.tree_ = self._grow(codes, y_codes.astype(np.int64)).prune(self.ccp_alpha)
+        return self
+
+    def _histogram(self, codes, y, idx):
+        """Per feature x bin x class counts of the rows `idx` (one bincount for all features)."""
+        n_features, n_bins, n_classes = codes.shape[1], self._n_bins, self.n_classes_
+        flat = (codes[idx].astype(np.int64) * n_classes + y[idx, None]
+                + np.arange(n_features) * (n_bins * n_classes))
+        return np.bincount(flat.ravel(), minlength=n_features * n_bins * n_classes).reshape(n_features, n_bins, n_classes)
+
+    def _best_split(self, hist, counts, impurity, depth, max_depth, min_split, min_leaf):
+        """(improvement, feature, bin) of the best valid split of a node, or None."""
+        n = counts.sum()
+        if depth >= max_depth or n < min_split or n < 2 * min_leaf or impurity <= _EPSILON:
+            return None
+
+        left = np.cumsum(hist, axis=1)[:, :-1, :]  # split after bin b -> bins <= b go left
+        n_left = left.sum(axis=-1)
+        n_right = n - n_left
+        children = (_weighted_impurity(left, n_left, self.criterion)
+                    + _weighted_impurity(counts - left, n_right, self.criterion))
+        children[(n_left < min_leaf) | (n_right < min_leaf)] = np.inf
+
+        best = np.argmin(children)
+        if not np.isfinite(children.flat[best]):
+            return None
+        feature, split_bin = np.unravel_index(best, children.shape)
+        return n * impurity - children.flat[best], int(feature), int(split_bin)
+
+    def _grow(self, codes, y):
+        n_samples = len(y)
+        max_depth = np.inf if self.max_depth is None else self.max_depth
+        min_leaf = self._min_count(self.min_samples_leaf, n_samples)
+        min_split = max(self._min_count(self.min_samples_split, n_samples), 2 * min_leaf)
+        max_leaves = self.max_leaf_nodes or np.inf
+
+        nodes = []  # [left, right, feature, threshold, counts, impurity]
+        pending = []  # best-first frontier: (-improvement, node, split, idx, hist, depth)
+
+        def add_node(idx, hist, depth):
+            counts = hist[0].sum(axis=0)
+            n = counts.sum()
+            impurity = _weighted_impurity(counts, n, self.criterion) / n
+            node = len(nodes)
+            nodes.append([TREE_LEAF, TREE_LEAF, TREE_UNDEFINED, float(TREE_UNDEFINED), counts, impurity])
+            split = self._best_split(hist, counts, impurity, depth, max_depth, min_split, min_leaf)
+            if split is not None:
+                heapq.heappush(pending, (-split[0], node, split[1:], idx, hist, depth))
+
+        add_node(np.arange(n_samples), self._histogram(codes, y, np.arange(n_samples)), 0)
+        n_leaves = 1
+        while pending and n_leaves < max_leaves:
+            _, node, (feature, split_bin), idx, hist, depth = heapq.heappop(pending)
+            go_left = codes[idx, feature] <= split_bin
+            idx_left, idx_right = idx[go_left], idx[~go_left]
+
+            # Histogram subtraction: only the smaller child is counted
+            if len(idx_left) <= len(idx_right):
+                hist_left = self._histogram(codes, y, idx_left)
+                hist_right = hist - hist_left
+            else:
+                hist_right = self._histogram(codes, y, idx_right)
+                hist_left = hist - hist_right
+
+            nodes[node][0], nodes[node][1] = len(nodes), len(nodes) + 1
+            nodes[node][2], nodes[node][3] = feature, float(self.bin_thresholds_[feature][split_bin])
+            add_node(idx_left, hist_left, depth + 1)
+            add_node(idx_right, hist_right, depth + 1)
+            n_leaves += 1
+
+        left, right, feature, threshold, counts, impurity = zip(*nodes)
+        counts = np.array(counts, dtype=np.float64)
+        n_node = counts.sum(axis=1)
+        return TreeArrays(left, right, feature, threshold, (counts / n_node[:, None])[:, None, :],
+                          impurity, n_node.astype(np.int64), n_node)
+
+    @property
+    def feature_importances_(self):
+        check_is_fitted(self, 'tree_')
+        return impurity_importances(self.tree_, self.n_features_in_)
+
+    def get_depth(self):
+        return self.tree_.max_depth
+
+    def get_n_leaves(self):
+        return self.tree_.n_leaves
+
+    def apply(self, X):
+        check_is_fitted(self, 'tree_')
+        return self.tree_.apply(np.asarray(X))
+
+    def predict_proba(self, X):
+        return self.tree_.value[self.apply(X), 0, :]
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -0,0 +1,250 @@
+import os
+import re
+import json
+import hashlib
+from pathlib import Path
+import joblib
+import sklearn
+import pandas as pd
+from config.settings import DataConfig, ExperimentConfig, CACHE_DIR
+from config.model_hyperparameters import BASE_MODELS, SEARCH_SPACES
+from .utils import log_message
+
+# Bump when the cleaning logic in src/data.py or a stage output changes so old entries are not reused
+CACHE_VERSION = 2
+
+_FINGERPRINT_BLOCK = 1024 * 1024 # 1MB
+_DATA_CACHE_DIR = CACHE_DIR / "data"
+_STAGE_CACHE_DIR = CACHE_DIR / "stages"
+
+# ExperimentConfig fields each pipeline stage depends on (besides its upstream key)
+_STAGE_FIELDS = {
+    'split': ('TEST_SIZE', 'MAX_SAMPLES_PER_CLASS', 'RANDOM_STATE', 'IMPUTE_MISSING_VALUES', 'NORMALIZE_DATA',
+              'PREPROCESSING_MODE'),
+    'rfe': ('RFE_ENABLED', 'RFE_ENGINE', 'RFE_STEP', 'RFE_MIN_FEATURES', 'RFE_COARSE_FRACTION', 'RFE_PATIENCE',
+            'RFE_TOLERANCE', 'CV_FOLDS', 'SCORING', 'SHARED_FOLD_PLAN'),
+    'tune': ('SEARCH_ENGINE', 'RANDOM_SEARCH_ITER', 'HALVING_FACTOR', 'HALVING_MIN_RESOURCES', 'CCP_ALPHA_CANDIDATES',
+             'CV_FOLDS', 'SCORING', 'RANDOM_STATE', 'SHARED_FOLD_PLAN'),
+    'train': ('LR_TRAINER', 'STREAMING_BATCH_SIZE', 'STREAMING_EPOCHS'),
+}
+
+
+def file_fingerprint(filepath, full_hash=False):
+    """
+    Fingerprint of a source file.
+
+    Fast mode hashes size, mtime and the first/last 1MB of the file.
+    Full mode hashes the whole content (slow on multi-GB files).
+    """
+    stat = os.stat(filepath)
+    digest = hashlib.sha256()
+
+    with open(filepath, 'rb') as f:
+        if full_hash:
+            for block in iter(lambda: f.read(8 * _FINGERPRINT_BLOCK), b''):
+                digest.update(block)
+        else:
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+            digest.update(f.read(_FINGERPRINT_BLOCK))
+            if stat.st_size > _FINGERPRINT_BLOCK:
+                f.seek(-_FINGERPRINT_BLOCK, os.SEEK_END)
+                digest.update(f.read(_FINGERPRINT_BLOCK))
+
+    return digest.hexdigest()
+
+
+def hash_values(values):
+    """Stable short hash of a JSON-serializable structure (config fields, keys)."""
+    payload = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _mappings_fingerprint():
+    """Hash of the persisted category mappings file (the codes of the cached frame), None if missing."""
+    mappings_file = getattr(DataConfig, 'CATEGORY_MAPPINGS_FILE', None)
+    if not mappings_file or not os.path.exists(mappings_file):
+        return None
+    with open(mappings_file, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def data_cache_key(filepath):
+    """
+    Cache key: source fingerprint + every config field that changes the cleaned frame,
+    including the category mappings the encoded columns refer to.
+    """
+    full_hash = getattr(DataConfig, 'DATA_CACHE_FULL_HASH', False)
+    return hash_values({
+        'version': CACHE_VERSION,
+        'source': file_fingerprint(filepath, full_hash=full_hash),
+        'separator': DataConfig.CSV_SEPARATOR,
+        'chunk_size': getattr(DataConfig, 'CSV_CHUNK_SIZE', None),
+        'remove_columns': list(DataConfig.REMOVE_COLUMNS or []),
+        'excluded_lines': getattr(DataConfig, 'EXCLUDED_LINES', None),
+        'target_column': DataConfig.TARGET_COLUMN,
+        'impute_missing_values': getattr(ExperimentConfig, 'IMPUTE_MISSING_VALUES', False),
+        'reuse_category_mappings': getattr(DataConfig, 'REUSE_CATEGORY_MAPPINGS', False),
+        'category_mappings': _mappings_fingerprint(),
+    })
+
+
+def _data_cache_path(filepath, key):
+    return _DATA_CACHE_DIR / f"{Path(filepath).stem}_{key}.parquet"
+
+
+def cached_frame_path(filepath):
+    """Path of the current cached cleaned frame of `filepath`, or None when it is not cached."""
+    cache_file = _data_cache_path(filepath, data_cache_key(filepath))
+    return cache_file if cache_file.exists() else None
+
+
+def load_cached_frame(filepath):
+    """Returns the cached cleaned frame for `filepath`, or None on a miss."""
+    cache_file = _data_cache_path(filepath, data_cache_key(filepath))
+    if not cache_file.exists():
+        log_message(f"Data cache miss: {cache_file.name}", level="INFO")
+        return None
+
+    try:
+        df = pd.read_parquet(cache_file)
+    except ImportError:
+        log_message("pyarrow is not installed. Data cache disabled.", level="WARNING")
+        return None
+    except Exception as e:
+        log_message(f"Could not read data cache {cache_file}: {e}", level="WARNING")
+        return None
+
+    log_message(f"Data cache hit: {cache_file.name} ({len(df)} rows)", level="INFO")
+    return df
+
+
+def save_cached_frame(filepath, df):
+    """Stores the cleaned frame and evicts stale entries of the same source file."""
+    cache_file = _data_cache_path(filepath, data_cache_key(filepath))
+    os.makedirs(_DATA_CACHE_DIR, exist_ok=True)
+
+    tmp_file = cache_file.with_suffix('.tmp')
+    try:
+        df.to_parquet(tmp_file)
+        os.replace(tmp_file, cache_file)
+    except ImportError:
+        log_message("pyarrow is not installed. Data cache disabled.", level="WARNING")
+        return
+    except Exception as e:
+        log_message(f"Could not write data cache {cache_file}: {e}", level="WARNING")
+        if tmp_file.exists():
+            tmp_file.unlink()
+        return
+
+    # Entries of the same source with another key are stale (file or config changed)
+    stem = Path(filepath).stem
+    for stale in _DATA_CACHE_DIR.glob(f"{stem}_*.parquet"):
+        stale_key = stale.stem[len(stem) + 1:]
+        if stale != cache_file and re.fullmatch(r"[0-9a-f]{16}", stale_key):
+            stale.unlink()
+            log_message(f"Evicted stale data cache entry: {stale.name}", level="DEBUG")
+
+    log_message(f"Cleaned data cached to {cache_file}", level="INFO")
+
+
+def frame_digest(df):
+    """Content hash of a DataFrame (values, index, columns and dtypes)."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    digest.update(json.dumps([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    return digest.hexdigest()[:16]
+
+
+def stage_key(stage, upstream_key, model_type=None):
+    """
+    Key of a pipeline stage: its upstream key (group data hash or previous stage key)
+    + the config fields the stage depends on + the model definition, if any.
+    """
+    values = {
+        'version': CACHE_VERSION,
+        'sklearn': sklearn.__version__,
+        'stage': stage,
+        'upstream': upstream_key,
+        'config': {field: getattr(ExperimentConfig, field, None) for field in _STAGE_FIELDS[stage]},
+    }
+    if stage == 'split':
+        values['target_column'] = DataConfig.TARGET_COLUMN
+        values['balance_columns'] = list(DataConfig.BALANCE_COLUMNS)
+    if model_type is not None:
+        values['model'] = BASE_MODELS[model_type]
+        if stage == 'tune':
+            values['search_space'] = SEARCH_SPACES.get(model_type)
+    return hash_values(values)
+
+
+def _stage_path(stage, key):
+    return _STAGE_CACHE_DIR / f"{stage}_{key}.joblib"
+
+
+def _stage_cache_enabled():
+    return getattr(ExperimentConfig, 'STAGE_CACHE_ENABLED', False)
+
+
+def stage_cached(stage, key):
+    return _stage_cache_enabled() and _stage_path(stage, key).exists()
+
+
+def memoize_stage(stage, key, compute):
+    """
+    Returns the stored result of `stage` for `key`, or runs `compute()` and stores it.
+    Hits refresh the entry mtime, which is the recency used by the LRU eviction.
+    """
+    if not _stage_cache_enabled():
+        return compute()
+
+    cache_file = _stage_path(stage, key)
+    if cache_file.exists():
+        try:
+            result = joblib.load(cache_file)
+            os.utime(cache_file)
+            log_message(f"Stage cache hit: {cache_file.name}", level="INFO")
+            return result
+        except Exception as e:
+            log_message(f"Could not read stage cache {cache_file}: {e}", level="WARNING")
+
+    result = compute()
+
+    os.makedirs(_STAGE_CACHE_DIR, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        joblib.dump(result, tmp_file)
+        os.replace(tmp_file, cache_file)
+        log_message(f"Stage result cached: {cache_file.name}", level="DEBUG")
+    except Exception as e:
+        log_message(f"Could not write stage cache {cache_file}: {e}", level="WARNING")
+        if tmp_file.exists():
+            tmp_file.unlink()
+        return result
+
+    _evict_stage_cache(getattr(ExperimentConfig, 'STAGE_CACHE_MAX_BYTES', None))
+    return result
+
+
+def _evict_stage_cache(max_bytes):
+    """Deletes the least recently used entries until the stage cache fits in `max_bytes`."""
+    if not max_bytes:
+        return
+
+    entries = []
+    for entry in _STAGE_CACHE_DIR.glob("*.joblib"):
+        try:
+            st = entry.stat()
+        except FileNotFoundError:  # evicted by another worker
+            continue
+        entries.append((st.st_mtime, st.st_size, entry))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        try:
+            entry.unlink()
+            log_message(f"Evicted stage cache entry: {entry.name}", level="DEBUG")
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -1,14 +1,43 @@
 import os
+import numpy as np
 import pandas as pd
 from config.settings import DataConfig, ExperimentConfig
 from .utils import log_message
+from .cache import load_cached_frame, save_cached_frame
+from .encoding import encode_column, load_category_mappings, save_category_mappings
+
+_CLIP_LIMIT = 1e18
 
 def load_and_clean_data(filepath):
-    """Loads data, removes nulls/duplicates/unwanted columns."""
+    """Loads data, removes nulls/duplicates/unwanted columns (served from the cache when possible)."""
     log_message(f"Loading data from {filepath}...", level="INFO")
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"File not found: {filepath}")
 
+    use_cache = getattr(DataConfig, 'USE_DATA_CACHE', False)
+    mappings_file = getattr(DataConfig, 'CATEGORY_MAPPINGS_FILE', None)
+    if use_cache:
+        # Cached codes are only valid together with the persisted category dictionaries
+        if mappings_file and not os.path.exists(mappings_file):
+            log_message("Category mappings not found. Ignoring data cache.", level="INFO")
+        else:
+            df = load_cached_frame(filepath)
+            if df is not None:
+                return df
+
+    df = _read_and_clean(filepath)
+
+    if use_cache:
+        save_cached_frame(filepath, df)
+
+    return df
+
+def _read_and_clean(filepath):
+    """Parses the CSV and applies exclusion, null handling, dedup, clipping and encoding."""
+    chunk_size = getattr(DataConfig, 'CSV_CHUNK_SIZE', None)
+    if chunk_size:
+        return _read_and_clean_chunked(filepath, chunk_size)
+
     df = pd.read_csv(filepath, sep=DataConfig.CSV_SEPARATOR, low_memory=False)
 
     # 0. Exclude specific rows based on config
@@ -52,31 +81,160 @@ def load_and_clean_data(filepath):
             log_message(f"Removed {before - len(df)} rows.", level="WARNING")
         
     # 3. Handle Duplicates
+    df = _drop_duplicates(df)
+    _clip_numeric(df)
+
+    # 5. Convert categorical columns
+    _encode_categoricals(df)
+
+    return df
+
+def _read_and_clean_chunked(filepath, chunk_size):
+    """
+    Streaming variant of _read_and_clean.
+
+    Each chunk is filtered (excluded rows, null target/features), clipped and
+    downcast (float32, smallest int) before being kept, so peak memory is one
+    raw chunk plus the compact result instead of the full float64/object frame.
+    """
+    log_message(f"Streaming CSV in chunks of {chunk_size} rows (compact dtypes)...", level="INFO")
+
+    excluded_cfg = getattr(DataConfig, 'EXCLUDED_LINES', None) or {}
+    excluded_col = excluded_cfg.get('collum_name')
+    excluded_values = excluded_cfg.get('values', [])
+    remove_cols = set(DataConfig.REMOVE_COLUMNS or [])
+    impute = getattr(ExperimentConfig, 'IMPUTE_MISSING_VALUES', False)
+
+    # Removed columns are never parsed, except the one needed for row exclusion
+    header = pd.read_csv(filepath, sep=DataConfig.CSV_SEPARATOR, nrows=0).columns
+    usecols = [c for c in header if c not in remove_cols or (excluded_values and c == excluded_col)]
+
+    chunks = []
+    removed_excluded = 0
+    dropped_target = 0
+    dropped_features = 0
+    null_counts = None
+    clipped_cols = set()
+
+    reader = pd.read_csv(filepath, sep=DataConfig.CSV_SEPARATOR, usecols=usecols, chunksize=chunk_size, low_memory=False)
+    for chunk in reader:
+        # 0. Exclude specific rows based on config
+        if excluded_values and excluded_col in chunk.columns:
+            keep = ~chunk[excluded_col].isin(excluded_values)
+            removed_excluded += int((~keep).sum())
+            chunk = chunk[keep]
+
+        # 1. Remove unwanted columns
+        chunk = chunk.drop(columns=[c for c in chunk.columns if c in remove_cols])
+
+        # 2. Handle null values
+        if DataConfig.TARGET_COLUMN in chunk.columns:
+            target_null = chunk[DataConfig.TARGET_COLUMN].isnull()
+            if target_null.any():
+                dropped_target += int(target_null.sum())
+                chunk = chunk[~target_null]
+
+        chunk_nulls = chunk.isnull().sum()
+        null_counts = chunk_nulls if null_counts is None else null_counts.add(chunk_nulls, fill_value=0)
+        if not impute and chunk_nulls.any():
+            before = len(chunk)
+            chunk = chunk.dropna()
+            dropped_features += before - len(chunk)
+
+        chunks.append(_compact_chunk(chunk, clipped_cols))
+
+    df = pd.concat(chunks) if chunks else pd.DataFrame(columns=[c for c in usecols if c not in remove_cols])
+    del chunks
+
+    for col in sorted(clipped_cols):
+        log_message(f"Clipped values in column: {col}", level="DEBUG")
+
+    if removed_excluded > 0:
+        log_message(f"Filtered out {removed_excluded} rows from excluded {excluded_col}: {excluded_values}", level="WARNING")
+    if remove_cols:
+        log_message(f"Removed columns: {DataConfig.REMOVE_COLUMNS}", level="INFO")
+    if dropped_target > 0:
+        log_message(f"Dropped {dropped_target} rows where Target '{DataConfig.TARGET_COLUMN}' was null.", level="WARNING")
+
+    if null_counts is not None and null_counts.any():
+        log_message("Detailed Null Report:", level="INFO")
+        for col, count in null_counts[null_counts > 0].items():
+            log_message(f"  -> Column '{col}': {int(count)} missing values", level="DEBUG")
+
+        if impute:
+            log_message("Config IMPUTE_MISSING_VALUES=True: Keeping rows with null features for later imputation.", level="INFO")
+        else:
+            log_message("Config IMPUTE_MISSING_VALUES=False: Removing rows with missing values.", level="WARNING")
+            log_message(f"Removed {dropped_features} rows.", level="WARNING")
+
+    # 3. Handle Duplicates
+    df = _drop_duplicates(df)
+
+    # 5. Convert categorical columns
+    _encode_categoricals(df)
+
+    log_message(f"Compact frame: {len(df)} rows, {df.memory_usage(deep=True).sum() / 1024**2:.1f} MB", level="INFO")
+    return df
+
+def _drop_duplicates(df):
     before = len(df)
     df = df.drop_duplicates()
     if len(df) < before:
         log_message(f"Removed {before - len(df)} duplicate rows.", level="WARNING")
+    return df
+
+def _clip_numeric(df):
+    """Clips numeric columns to +-1e18 in place, rewriting only the columns that overflow."""
     for col in df.select_dtypes(include='number').columns:
-        clipped = df[col].clip(lower=-1e18, upper=1e18)
-        if not clipped.equals(df[col]):
+        values = df[col].to_numpy()
+        if (np.abs(values) > _CLIP_LIMIT).any():
+            df[col] = df[col].clip(lower=-_CLIP_LIMIT, upper=_CLIP_LIMIT)
             log_message(f"Clipped values in column: {col}", level="DEBUG")
-        df[col] = clipped
-        
-    # 5. Convert categorical columns
-    cat_cols = df.select_dtypes(include=['object', 'category']).columns
+
+def _compact_chunk(df, clipped_cols):
+    """
+    Returns a clipped copy of the chunk with compact dtypes:
+    floats -> float32, integers -> smallest int type (e.g. Width/Height/QP -> int8/int16).
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            if (np.abs(values.to_numpy()) > _CLIP_LIMIT).any():
+                values = values.clip(lower=-_CLIP_LIMIT, upper=_CLIP_LIMIT)
+                clipped_cols.add(col)
+            if pd.api.types.is_float_dtype(values):
+                values = values.astype(np.float32)
+            else:
+                values = pd.to_numeric(values, downcast='integer')
+        columns[col] = values
+    return pd.DataFrame(columns, index=df.index)
+
+def _encode_categoricals(df):
+    """
+    Encodes object/category columns in place as integer ids in first-seen order.
+
+    With REUSE_CATEGORY_MAPPINGS the persisted dictionaries are extended instead of
+    rebuilt, so reruns and incremental data keep the codes the C++ side already uses.
+    The mappings are persisted even when there is nothing to encode: the data cache
+    is only served together with them.
+    """
+    cat_cols = df.select_dtypes(include=['object', 'category', 'string']).columns
+
+    mappings_file = getattr(DataConfig, 'CATEGORY_MAPPINGS_FILE', None)
+    reuse = getattr(DataConfig, 'REUSE_CATEGORY_MAPPINGS', False)
+    mappings = load_category_mappings(mappings_file) if reuse else {}
 
     for col in cat_cols:
-        mapping = {}   # dict<string, int>
-        next_id = 0
-
-        new_values = []
-        for val in df[col].astype(str):
-            if val not in mapping:
-                mapping[val] = next_id
-                next_id += 1
-            new_values.append(mapping[val])
-
-        df[col] = new_values
-        log_message(f"Encoded '{col}' with mapping: {mapping}", level="DEBUG")
-        
-    return df
\ No newline at end of file
+        known = mappings.get(col, [])
+        codes, categories = encode_column(df[col], known)
+        df[col] = codes
+        mappings[col] = categories
+
+        if len(categories) > len(known):
+            log_message(f"Encoded '{col}' with {len(categories) - len(known)} new categories: {categories[len(known):]}", level="DEBUG")
+        else:
+            log_message(f"Encoded '{col}' reusing {len(known)} persisted categories.", level="DEBUG")
+
+    if mappings_file:
+        save_category_mappings(mappings, mappings_file)
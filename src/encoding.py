@@ -0,0 +1,67 @@
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+from .utils import log_message
+
+
+def encode_column(values, categories=None):
+    """
+    Vectorized first-seen integer encoding of a column (as strings).
+
+    `categories` is the persisted dictionary (list index = code). Known values
+    keep their code; new values get the next ids in first-seen order, exactly
+    as the row-by-row loop would assign them.
+    Returns (codes, updated_categories).
+    """
+    categories = list(categories or [])
+    # Missing values are encoded as the string 'nan', like the str() of a float NaN
+    local_codes, uniques = pd.factorize(values.astype(str).fillna('nan'), sort=False)
+
+    lookup = pd.Index(categories, dtype=object).get_indexer(uniques) if categories else np.full(len(uniques), -1)
+    is_new = lookup < 0
+    lookup[is_new] = np.arange(len(categories), len(categories) + is_new.sum())
+    categories.extend(uniques[is_new].tolist())
+
+    return lookup[local_codes], categories
+
+
+def load_category_mappings(path):
+    """Loads the persisted {column: [value, ...]} dictionaries (empty if missing)."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_category_mappings(mappings, path):
+    """Saves the dictionaries as JSON plus a C++ header with the same codes."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(mappings, f, indent=2, ensure_ascii=False)
+
+    header_path = os.path.splitext(path)[0] + ".h"
+    with open(header_path, "w", encoding="utf-8") as f:
+        f.write(get_mappings_code(mappings))
+
+    log_message(f"Category mappings saved: {path} / {header_path}", level="INFO")
+
+
+def get_mappings_code(mappings):
+    """C++ lookup tables: the code of a value is its index in <column>_categories."""
+    code = "\n/*\nThis file was automatically generated from the categorical encoding of the dataset.\n"
+    code += "The code of a value is its index in <column>_categories (-1 if unknown).\n*/\n\n"
+    code += "#include <string>\n\n"
+
+    for col, categories in mappings.items():
+        name = re.sub(r'\W', '_', col)
+        values = ", ".join(json.dumps(str(v), ensure_ascii=False) for v in categories)
+        code += f"static const char* const {name}_categories[] = {{ {values} }};\n"
+        code += f"static const int {name}_category_count = {len(categories)};\n\n"
+        code += f"inline int encode_{name}(const std::string & value) \n{{\n"
+        code += f"\tfor (int i = 0; i < {name}_category_count; ++i) {{\n"
+        code += f"\t\tif (value == {name}_categories[i]) return i;\n"
+        code += "\t}\n\treturn -1;\n}\n\n"
+
+    return code
@@ -18,10 +18,18 @@ def evaluate_and_save(
     current_model_type,
     best_params=None,
     export_model_callback=None,
+    preprocessing=None,
+    fit_X_train=None,
 ):
     """
     Run evaluation (report, confusion matrix, confidences), save report,
     optionally generate learning curve and export to C++ via callback.
+    Returns (report, export record): the record describes the exported header
+    (for the bundle export), None when nothing was exported.
+    `preprocessing` (imputation values / scaler statistics) is forwarded to the
+    logistic regression export, which folds it into the exported weights.
+    `fit_X_train` is the train matrix the estimator type is fitted on when it is
+    not X_train (bin codes of the binned tree trainer), used by the learning curve.
     """
 
     log_message("--- Evaluation ---", level="stage")
@@ -104,7 +112,7 @@ def evaluate_and_save(
             log_message(f"--- Generating learning curve after final training ---", level="stage")
             subdir_final = f"{grouping_name}_{model_strategie_id}_{block_group.replace('×', 'x')}_final"
             generate_learning_curve(
-                X_train[selected_cols],
+                (X_train if fit_X_train is None else fit_X_train)[selected_cols],
                 y_train,
                 subdir_final,
                 model_type=current_model_type,
@@ -115,22 +123,37 @@ def evaluate_and_save(
         log_message(f"Error generating end-of-pipeline learning curve: {e}", level="ERROR")
 
     # 7. Export to C++ via callback (Handles both Tree and LR)
+    export_record = None
     if ExperimentConfig.EXPORT_CPP:
         try:
             if export_model_callback:
                 func_name = f"{current_model_type}_{grouping_name}_m{model_strategie_id}_{block_group}"
-                
-                export_model_callback(
+
+                # Profiling data of the branch layout (decision trees only)
+                profile_data = getattr(ExperimentConfig, 'CPP_PROFILE_DATA', None)
+                profile_X = None
+                if profile_data is not None and current_model_type == 'decision_tree':
+                    profile_X = (X_train if profile_data == 'train' else X_test)[selected_cols]
+
+                header = export_model_callback(
                     final_model,
                     list(selected_cols),
                     sorted(y_train.unique()),
                     func_name,
                     f'cpp_exports/{grouping_name}',
-                    current_model_type
+                    current_model_type,
+                    profile_X=profile_X,
+                    preprocessing=preprocessing if current_model_type == 'logistic_regression' else None,
+                    test_X=X_test[selected_cols]
                 )
+                if header is not None:
+                    export_record = dict(header, function_name=func_name, grouping_name=grouping_name,
+                                         model_strategie_id=model_strategie_id, block_group=block_group,
+                                         model_type=current_model_type, feature_names=list(selected_cols),
+                                         class_names=sorted(y_train.unique()))
             else:
                 log_message("No export_model_callback provided; skipping C++ export.", level="WARNING")
         except Exception as e:
             log_message(f"Error exporting to C++ ({grouping_name}) Model {model_strategie_id}, Group {block_group}: {e}", level="ERROR")
 
-    return report
+    return report, export_record
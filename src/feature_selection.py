@@ -1,53 +1,173 @@
 import time
 import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.feature_selection import RFECV
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import check_cv
 from config.settings import ExperimentConfig
 from config.model_hyperparameters import BASE_MODELS
 from .utils import log_message
 
-def run_rfe(X, y, model_type):
-    """Runs Recursive Feature Elimination."""
+def run_rfe(X, y, model_type, fold_plan=None):
+    """Runs Recursive Feature Elimination (on the fold plan data and folds, if given)."""
     if not ExperimentConfig.RFE_ENABLED:
         return X.columns.tolist()
 
+    engine = getattr(ExperimentConfig, 'RFE_ENGINE', 'rfecv')
+    if engine == 'fast':
+        return run_fast_rfe(X, y, model_type, fold_plan)
+    if engine != 'rfecv':
+        raise ValueError(f"Unknown RFE engine: {engine}")
+
     log_message(f"Running RFECV with {model_type}...", level="INFO")
     start_time = time.time()
-    
+
     model_conf = BASE_MODELS[model_type]
     estimator = model_conf['estimator'](**model_conf['params'])
-    
+
+    feature_names = X.columns
+    cv = ExperimentConfig.CV_FOLDS
+    if fold_plan is not None:
+        X, y, cv = fold_plan.matrix(feature_names), fold_plan.y, fold_plan.folds
+
     rfecv = RFECV(
         estimator=estimator,
         step=ExperimentConfig.RFE_STEP,
-        cv=ExperimentConfig.CV_FOLDS,
+        cv=cv,
         scoring=ExperimentConfig.SCORING,
         min_features_to_select=ExperimentConfig.RFE_MIN_FEATURES,
         n_jobs=ExperimentConfig.N_JOBS
     )
-    
+
     rfecv.fit(X, y)
-    
-    selected_features = X.columns[rfecv.support_].tolist()
-    
-    final_estimator = rfecv.estimator_
-    importances = None
 
-    if hasattr(final_estimator, 'feature_importances_'):
-        importances = final_estimator.feature_importances_
-    elif hasattr(final_estimator, 'coef_'):
-        importances = np.ravel(final_estimator.coef_)
+    selected_features = feature_names[rfecv.support_].tolist()
 
     log_message(f"RFECV finished in {time.time() - start_time:.2f}s. Optimal number of features: {rfecv.n_features_}", level="INFO")
     log_message(f"Selected Features List: {selected_features}", level="DEBUG")
 
+    _log_importances(selected_features, rfecv.estimator_, "RFECV Final Model")
+
+    return selected_features
+
+
+def _importances(estimator):
+    """Feature importances or |coefficients| (L2 norm over classes), None if unavailable."""
+    if hasattr(estimator, 'feature_importances_'):
+        return estimator.feature_importances_
+    if hasattr(estimator, 'coef_'):
+        coef = np.atleast_2d(estimator.coef_)
+        return coef[0] if coef.shape[0] == 1 else np.linalg.norm(coef, axis=0)
+    return None
+
+
+def _log_importances(selected_features, estimator, title):
+    importances = _importances(estimator)
+
     if importances is not None:
         feature_score_pairs = list(zip(selected_features, importances))
         feature_score_pairs.sort(key=lambda x: abs(x[1]), reverse=True)
-        
-        log_message("=== Feature Importances (RFECV Final Model) ===", level="INFO")
+
+        log_message(f"=== Feature Importances ({title}) ===", level="INFO")
         for feature_name, score in feature_score_pairs:
             log_message(f"Feature: {feature_name:<20} | Importance: {score:.6f}", level="INFO")
     else:
         log_message("Could not extract feature importance/coefficients from this estimator.", level="WARNING")
-    
-    return selected_features
\ No newline at end of file
+
+
+def _rank_features(estimator, X, y):
+    """Feature indices by decreasing importance of `estimator` fitted on all features."""
+    model = clone(estimator).fit(X, y)
+    importances = _importances(model)
+    if importances is None:
+        raise ValueError(f"{type(model).__name__} exposes neither feature_importances_ nor coef_")
+    # Stable sort: equal importances keep the column order
+    return np.argsort(-np.abs(importances), kind='stable')
+
+
+def _score_top_k(estimator, scorer, X, y, train_idx, val_idx, ranking, k):
+    cols = ranking[:k]
+    model = clone(estimator).fit(X[np.ix_(train_idx, cols)], y[train_idx])
+    return scorer(model, X[np.ix_(val_idx, cols)], y[val_idx])
+
+
+def run_fast_rfe(X, y, model_type, fold_plan=None):
+    """
+    Fast alternative to RFECV.
+
+    Features are ranked once per CV fold by a model fitted on all of them, so
+    scoring a feature count k is a single fit per fold on the top-k features.
+    The feature count is searched coarse-to-fine: upward steps of
+    RFE_COARSE_FRACTION of the features until the CV score has not improved by
+    RFE_TOLERANCE for RFE_PATIENCE steps, then every count around the best one.
+    """
+    log_message(f"Running fast RFE with {model_type}...", level="INFO")
+    start_time = time.time()
+
+    model_conf = BASE_MODELS[model_type]
+    estimator = model_conf['estimator'](**model_conf['params'])
+    scorer = get_scorer(ExperimentConfig.SCORING)
+
+    if fold_plan is not None:
+        X_values, y_values, folds = fold_plan.matrix(X.columns), fold_plan.y, fold_plan.folds
+    else:
+        X_values = np.asarray(X, dtype=np.float64)
+        y_values = np.asarray(y)
+        # Same folds as RFECV(cv=CV_FOLDS)
+        folds = list(check_cv(ExperimentConfig.CV_FOLDS, y_values, classifier=True).split(X_values, y_values))
+
+    n_features = X_values.shape[1]
+    min_features = min(ExperimentConfig.RFE_MIN_FEATURES, n_features)
+    rankings = Parallel(n_jobs=ExperimentConfig.N_JOBS)(
+        delayed(_rank_features)(estimator, X_values[train_idx], y_values[train_idx])
+        for train_idx, _ in folds
+    )
+
+    scores = {}
+
+    def cv_score(k):
+        if k not in scores:
+            fold_scores = Parallel(n_jobs=ExperimentConfig.N_JOBS)(
+                delayed(_score_top_k)(estimator, scorer, X_values, y_values, train_idx, val_idx, ranking, k)
+                for (train_idx, val_idx), ranking in zip(folds, rankings)
+            )
+            scores[k] = np.mean(fold_scores)
+            log_message(f"{k} features: CV score {scores[k]:.4f}", level="DEBUG")
+        return scores[k]
+
+    # Coarse upward sweep with early stopping
+    step = max(1, int(round(n_features * getattr(ExperimentConfig, 'RFE_COARSE_FRACTION', 0.1))))
+    patience = getattr(ExperimentConfig, 'RFE_PATIENCE', 2)
+    tolerance = getattr(ExperimentConfig, 'RFE_TOLERANCE', 1e-3)
+
+    best_k, best_score, stale = min_features, cv_score(min_features), 0
+    k = min_features
+    while k < n_features and stale < patience:
+        k = min(k + step, n_features)
+        if cv_score(k) > best_score + tolerance:
+            best_k, best_score, stale = k, scores[k], 0
+        else:
+            stale += 1
+
+    # Fine search around the coarse optimum
+    for k in range(max(min_features, best_k - step + 1), min(n_features, best_k + step - 1) + 1):
+        cv_score(k)
+
+    # Ties go to the smaller feature count
+    best_score = max(scores.values())
+    n_selected = min(k for k, score in scores.items() if score == best_score)
+
+    # Final ranking and model on the full data, like RFECV
+    ranking = _rank_features(estimator, X_values, y_values)
+    support = np.zeros(n_features, dtype=bool)
+    support[ranking[:n_selected]] = True
+    selected_features = X.columns[support].tolist()
+    final_estimator = clone(estimator).fit(X_values[:, support], y_values)
+
+    log_message(f"Fast RFE finished in {time.time() - start_time:.2f}s ({len(scores)} feature counts evaluated). Optimal number of features: {n_selected}", level="INFO")
+    log_message(f"Selected Features List: {selected_features}", level="DEBUG")
+
+    _log_importances(selected_features, final_estimator, "Fast RFE Final Model")
+
+    return selected_features
@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from numpy.lib.format import open_memmap
+from sklearn.model_selection import StratifiedKFold
+from config.settings import ExperimentConfig, CACHE_DIR
+from .utils import log_message
+
+_FOLDS_DIR = CACHE_DIR / "folds"
+_WRITE_CHUNK_ROWS = 100_000
+
+
+class FoldPlan:
+    """
+    CV folds and feature matrix of one block-group job, shared by every stage.
+
+    Fold indices are computed once (StratifiedKFold(CV_FOLDS), i.e. the folds
+    sklearn uses for cv=CV_FOLDS) and the features are stored once as a read-only
+    float32 memory-mapped .npy file. Joblib workers receive memmaps as a reference
+    to the file, so no stage pickles or copies the matrix again.
+    """
+
+    def __init__(self, X, y, directory):
+        self.directory = directory
+        self.feature_names = list(X.columns)
+        self.y = np.asarray(y)
+        self.folds = list(StratifiedKFold(n_splits=ExperimentConfig.CV_FOLDS).split(np.zeros(len(self.y)), self.y))
+        self._matrices = {}
+        self.X = self._store_frame(X)
+
+    def _store_frame(self, X):
+        path = os.path.join(self.directory, "X.npy")
+        mm = open_memmap(path, mode='w+', dtype=np.float32, shape=X.shape)
+        # Written in row chunks: the float32 copy of the whole frame never exists in RAM
+        for start in range(0, len(X), _WRITE_CHUNK_ROWS):
+            mm[start:start + _WRITE_CHUNK_ROWS] = X.iloc[start:start + _WRITE_CHUNK_ROWS].to_numpy(dtype=np.float32)
+        mm.flush()
+        del mm
+        return np.load(path, mmap_mode='r')
+
+    def matrix(self, columns=None):
+        """Read-only matrix of `columns` (all features by default), stored once per column set."""
+        columns = list(columns) if columns is not None else self.feature_names
+        if columns == self.feature_names:
+            return self.X
+
+        key = tuple(columns)
+        if key not in self._matrices:
+            positions = [self.feature_names.index(c) for c in columns]
+            path = os.path.join(self.directory, f"X_{len(self._matrices)}.npy")
+            np.save(path, self.X[:, positions])
+            self._matrices[key] = np.load(path, mmap_mode='r')
+        return self._matrices[key]
+
+    def release(self):
+        """Drops the memmaps and deletes their files."""
+        self.X = None
+        self._matrices.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def build_fold_plan(X, y):
+    """Builds the fold plan of a job (folds + memory-mapped X) under CACHE_DIR/folds."""
+    os.makedirs(_FOLDS_DIR, exist_ok=True)
+    directory = tempfile.mkdtemp(prefix="plan_", dir=_FOLDS_DIR)
+    plan = FoldPlan(X, y, directory)
+    log_message(f"Fold plan: {len(plan.folds)} folds, {plan.X.shape[0]}x{plan.X.shape[1]} float32 matrix ({plan.X.nbytes / 1e6:.1f}MB) at {directory}", level="DEBUG")
+    return plan
@@ -1,5 +1,17 @@
+import numpy as np
+import pandas as pd
 from .utils import log_message
 
+AREA_TO_GROUP = {
+    16: "G0", 32: "G1", 64: "G2", 128: "G3",
+    256: "G4", 512: "G5", 1024: "G6", 2048: "G7",
+    4096: "G8", 8192: "G9", 16384: "G10"
+}
+
+SIZE_TO_GROUP = {128: "128x128", 64: "64x64", 32: "32x32", 16: "16x16", 8: "8x8"}
+
+ASPECT_RATIO_GROUPS = {1: "1:1", 2: "2:1", 4: "4:1", 8: "8:1", 16: "16:1", 32: "32:1"}
+
 # --- Grouping Logic Functions ---
 
 def determine_size_group(row):
@@ -19,12 +31,7 @@ def determine_area_group(row):
     h = row["Height"]
     area = min(w, h) * max(w, h)
     
-    area_to_group = {
-        16: "G0", 32: "G1", 64: "G2", 128: "G3",
-        256: "G4", 512: "G5", 1024: "G6", 2048: "G7",
-        4096: "G8", 8192: "G9", 16384: "G10"
-    }
-    return area_to_group.get(area, "other")
+    return AREA_TO_GROUP.get(area, "other")
 
 def determine_all_group(row):
     w = row["Width"]
@@ -73,21 +80,155 @@ GROUPING_STRATEGIES = {
     'frame_level': determine_frame_level_group
 }
 
-def apply_grouping_strategy(df, strategy_name):
+# --- Vectorized Grouping Functions ---
+# Columnar equivalents of the row functions above: one call per frame instead of
+# one Python call per row. Each returns a categorical Series aligned with df.
+
+def _labels(df, values):
+    return pd.Series(pd.Categorical(values), index=df.index)
+
+def _dims(df):
+    return df["Width"].to_numpy(dtype=np.float64), df["Height"].to_numpy(dtype=np.float64)
+
+def size_group_labels(df):
+    w, h = _dims(df)
+    max_dim = np.maximum(w, h)
+    conditions = [max_dim == size for size in SIZE_TO_GROUP]
+    return _labels(df, np.select(conditions, list(SIZE_TO_GROUP.values()), default="4x4"))
+
+def area_group_labels(df):
+    w, h = _dims(df)
+    area = w * h
+    conditions = [area == a for a in AREA_TO_GROUP]
+    return _labels(df, np.select(conditions, list(AREA_TO_GROUP.values()), default="other"))
+
+def all_group_labels(df):
+    # Formats each distinct (Width, Height) pair once instead of once per row
+    pairs = pd.MultiIndex.from_arrays([df["Width"].to_numpy(), df["Height"].to_numpy()])
+    codes, uniques = pd.factorize(pairs)
+    # A missing Width/Height gets code -1, i.e. the trailing None: a missing label, the row is dropped
+    codes[df["Width"].isna().to_numpy() | df["Height"].isna().to_numpy()] = -1
+    fmt = lambda v: f"{int(v)}" if float(v).is_integer() else f"{v}"
+    names = np.array([f"{fmt(w)}x{fmt(h)}" if pd.notna(w) and pd.notna(h) else None for w, h in uniques] + [None],
+                     dtype=object)
+    return _labels(df, names[codes])
+
+def orientation_group_labels(df):
+    w, h = _dims(df)
+    return _labels(df, np.select([w == h, w > h], ["Square", "Horizontal"], default="Vertical"))
+
+def aspect_ratio_group_labels(df):
+    w, h = _dims(df)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.maximum(w, h) / np.minimum(w, h)
+    conditions = [np.abs(ratio - r) < 0.01 for r in ASPECT_RATIO_GROUPS]
+    return _labels(df, np.select(conditions, list(ASPECT_RATIO_GROUPS.values()), default="other"))
+
+def single_group_labels(df):
+    return _labels(df, np.full(len(df), "All_Blocks", dtype=object))
+
+def frame_level_group_labels(df):
+    level = df["FrameLevel"]
+    valid = (level.notna() & (level != 0)).to_numpy()
+    categories = np.unique(level.to_numpy()[valid]).astype(np.int64)
+
+    codes = np.full(len(df), -1, dtype=np.int64)
+    codes[valid] = np.searchsorted(categories, level.to_numpy()[valid])
+    # FrameLevel 0 -> missing label (row is filtered out, like the row function returning None)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=df.index)
+
+GROUPING_VECTORIZED = {
+    'area': area_group_labels,
+    'max': size_group_labels,
+    'orientation': orientation_group_labels,
+    'aspect_ratio': aspect_ratio_group_labels,
+    'all': all_group_labels,
+    'single': single_group_labels,
+    'frame_level': frame_level_group_labels
+}
+
+def compute_group_labels(df, strategy_names):
+    """Computes the BlockGroup labels of several strategies at once, as lightweight categorical columns."""
+    labels = {}
+    for name in strategy_names:
+        if name in GROUPING_VECTORIZED:
+            labels[name] = GROUPING_VECTORIZED[name](df)
+    return pd.DataFrame(labels, index=df.index)
+
+def apply_grouping_strategy(df, strategy_name, group_labels=None):
+    """
+    Adds the BlockGroup column of `strategy_name` and drops rows without a group.
+
+    The caller's frame is left untouched: the column is added to a shallow copy
+    (no copy of the feature columns), and a row subset is only materialized when
+    the strategy filters rows out. `group_labels` can carry labels precomputed by
+    compute_group_labels.
+    """
     if strategy_name not in GROUPING_STRATEGIES:
         raise ValueError(f"Grouping strategy '{strategy_name}' not found.")
     
     log_message(f"Applying grouping strategy: {strategy_name}", level="INFO")
     
-    df_out = df.copy()
+    if group_labels is not None and strategy_name in group_labels:
+        block_group = group_labels[strategy_name]
+    else:
+        block_group = GROUPING_VECTORIZED[strategy_name](df)
+    
+    keep = block_group.notna().to_numpy()
+    before_drop = len(df)
     
-    df_out["BlockGroup"] = df_out.apply(GROUPING_STRATEGIES[strategy_name], axis=1)
+    if keep.all():
+        df_out = df.copy(deep=False)
+    else:
+        rows = np.flatnonzero(keep)
+        df_out = df.take(rows)
+        block_group = block_group.take(rows)
     
-    before_drop = len(df_out)
-    df_out = df_out.dropna(subset=["BlockGroup"])
+    df_out["BlockGroup"] = block_group.cat.remove_unused_categories()
     after_drop = len(df_out)
     
     if before_drop > after_drop:
         log_message(f"Strategy '{strategy_name}' filtered out {before_drop - after_drop} rows (e.g. FrameLevel 0).", level="WARNING")
     
-    return df_out, sorted(df_out["BlockGroup"].unique())
\ No newline at end of file
+    return df_out, sorted(df_out["BlockGroup"].cat.categories.tolist())
+
+def build_group_partition(block_group):
+    """
+    Partition index of a BlockGroup column: {group: row positions}.
+
+    Built once per grouping with a single factorize + stable argsort, so each group
+    is then served by a take over its own rows instead of a full-column scan.
+    """
+    codes, uniques = pd.factorize(block_group)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+    # Rows without a group (code -1) sort first
+    bounds = np.concatenate(([0], np.cumsum(counts))) + (len(codes) - counts.sum())
+    return {group: order[bounds[i]:bounds[i + 1]] for i, group in enumerate(uniques)}
+
+def align_group_partition(partition, base_index, df):
+    """
+    Re-expresses a partition built on `base_index` as positions into `df`,
+    a row subset of the same frame (e.g. after a model strategy filtered rows).
+    """
+    if df.index is base_index or df.index.equals(base_index):
+        return partition
+
+    base_positions = base_index.get_indexer(df.index)
+    found = base_positions >= 0
+    base_to_local = np.full(len(base_index), -1, dtype=np.int64)
+    base_to_local[base_positions[found]] = np.flatnonzero(found)
+
+    aligned = {}
+    for group, positions in partition.items():
+        local = base_to_local[positions]
+        aligned[group] = local[local >= 0]
+    return aligned
+
+
+def mask_group_partition(partition, mask):
+    """Keeps, in every group of the partition, only the positions where `mask` is True."""
+    if mask is None:
+        return partition
+    return {group: positions[mask[positions]] for group, positions in partition.items()}
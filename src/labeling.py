@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+# Keys of a declarative label spec (see config/model_strategies.py)
+LABEL_SPEC_KEYS = ('keep', 'drop', 'map', 'default')
+
+
+def apply_label_spec(target, spec):
+    """
+    Executes a label spec on the target column of the shared grouped frame.
+
+    - 'keep' / 'drop': target values whose rows are kept / removed.
+    - 'map': {target value: new label}.
+    - 'default': label of the values missing from 'map' (None: keep the value).
+
+    Returns (mask, labels) as numpy arrays aligned with `target`: mask is None when
+    no row is filtered, labels is None when the target is unchanged. Nothing else
+    of the frame is copied.
+    """
+    unknown = set(spec) - set(LABEL_SPEC_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown label spec keys: {sorted(unknown)}")
+
+    values = target.to_numpy()
+
+    mask = None
+    if 'keep' in spec:
+        mask = np.isin(values, spec['keep'])
+    if 'drop' in spec:
+        dropped = ~np.isin(values, spec['drop'])
+        mask = dropped if mask is None else mask & dropped
+
+    labels = None
+    if spec.get('map') or spec.get('default') is not None:
+        mapping = spec.get('map') or {}
+        positions = pd.Index(list(mapping.keys())).get_indexer(values)
+        mapped = np.asarray(list(mapping.values()))[np.maximum(positions, 0)] if mapping else values
+        fallback = values if spec.get('default') is None else spec['default']
+        labels = np.where(positions >= 0, mapped, fallback)
+
+    return mask, labels
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.utils import resample
@@ -6,15 +7,22 @@ from sklearn.impute import SimpleImputer
 from config.settings import DataConfig, ExperimentConfig
 from .utils import log_message
 
-def balance_group_data(df_group):
-    """Balances data within a specific block group."""
+def balance_group_indices(df_group):
+    """
+    Row positions of the balanced block group, or None to keep every row.
+
+    The composite BALANCE_COLUMNS key is encoded as an integer (ngroup) and every
+    key is undersampled to the size of the smallest one. Positions are drawn with
+    the same permutation sklearn.utils.resample uses (a RandomState(RANDOM_STATE)
+    per key, groups in sorted key order), so the rows are identical to resampling
+    each group sub-frame.
+    """
     target_col = DataConfig.TARGET_COLUMN
     
     if df_group[target_col].nunique() < 2:
         log_message(f"Group has less than 2 classes. Skipping balance.", level="WARNING")
-        return df_group
+        return None
 
-    # Create composite key for balancing
     # Only use columns that exist in the dataframe
     valid_cols = [c for c in DataConfig.BALANCE_COLUMNS if c in df_group.columns]
     missing_cols = [c for c in DataConfig.BALANCE_COLUMNS if c not in df_group.columns]
@@ -23,26 +31,41 @@ def balance_group_data(df_group):
     
     if not valid_cols:
         log_message(f"No valid columns found for balancing. Skipping balance.", level="ERROR")
-        return df_group
+        return None
 
-    df_group['balance_key'] = list(zip(*(df_group[c] for c in valid_cols)))
-    
-    min_samples = df_group['balance_key'].value_counts().min()
-    
-    if min_samples < 1:
-         return df_group.drop(columns=['balance_key'])
+    codes = df_group.groupby(valid_cols, sort=True, dropna=False, observed=True).ngroup().to_numpy()
+    counts = np.bincount(codes)
+    min_samples = counts.min()
 
-    balanced_df = pd.concat([
-        resample(g, replace=False, n_samples=min_samples, random_state=ExperimentConfig.RANDOM_STATE)
-        for _, g in df_group.groupby('balance_key')
-    ])
-    
+    # Rows of each key, in frame order, laid out key after key
+    order = np.argsort(codes, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    draws = {}  # the draw only depends on the key size
+    positions = np.empty(min_samples * len(counts), dtype=np.int64)
+    for key, (start, n) in enumerate(zip(starts, counts)):
+        if n not in draws:
+            draws[n] = np.random.RandomState(ExperimentConfig.RANDOM_STATE).permutation(n)[:min_samples]
+        positions[key * min_samples:(key + 1) * min_samples] = order[start + draws[n]]
+    return positions
+
+
+def balance_group_data(df_group):
+    """Balances data within a specific block group (the caller's frame is not modified)."""
+    positions = balance_group_indices(df_group)
+    if positions is None:
+        return df_group
+
+    balanced_df = df_group.take(positions)
     log_message(f"Group balanced. Total: {len(balanced_df)} samples.", level="INFO")
-    return balanced_df.drop(columns=['balance_key'])
+    return balanced_df
 
 
-def normalize_data(X_train, X_test, X_train_samp):
-    """Normalizes data using StandardScaler (fit on Train only)."""
+def normalize_data(X_train, X_test, X_train_samp, params=None):
+    """
+    Normalizes data using StandardScaler (fit on Train only). The fitted means and
+    scales are stored in `params` (dict, if given) for the C++ export.
+    """
     log_message("Normalizing data (fit on Train only)...", level="INFO")
     
     scaler = StandardScaler()
@@ -61,16 +84,23 @@ def normalize_data(X_train, X_test, X_train_samp):
     log_message(f"- Feature Order: {feature_names}", level="DEBUG")
     log_message(f"- means[] = {{ {means_str} }};", level="DEBUG")
     log_message(f"- scales[] = {{ {scales_str} }};", level="DEBUG")
+
+    if params is not None:
+        params['means'] = pd.Series(scaler.mean_, index=feature_names)
+        params['scales'] = pd.Series(scaler.scale_, index=feature_names)
     
     return X_train_norm, X_test_norm, X_train_samp_norm
 
 
-def impute_data(X_train, X_test, X_train_samp):
-    """Imputes missing values using a hybrid strategy: Mean for floats, Mode for ints/objects."""
+def impute_data(X_train, X_test, X_train_samp, params=None):
+    """
+    Imputes missing values using a hybrid strategy: Mean for floats, Mode for ints/objects.
+    The applied values are stored in `params` (dict, if given) for the C++ export.
+    """
     log_message("Imputing missing values ...", level="INFO")
     
     float_cols = X_train.select_dtypes(include=['float', 'float32', 'float64']).columns # Floats -> Average
-    cat_cols = X_train.select_dtypes(include=['int', 'int32', 'int64', 'object', 'category']).columns  # Ints/Objects -> Mode
+    cat_cols = X_train.select_dtypes(include=['integer', 'object', 'category']).columns  # Ints/Objects -> Mode
     
     X_train_imp = X_train.copy()
     X_test_imp = X_test.copy()
@@ -111,6 +141,8 @@ def impute_data(X_train, X_test, X_train_samp):
     
     if getattr(ExperimentConfig, 'IMPUTE_MISSING_VALUES', False):
         log_message(">> Applying imputation to datasets (Config=True).", level="WARNING")
+        if params is not None:
+            params['impute_values'] = pd.Series(ordered_vals, index=feature_names, dtype=np.float64)
         return X_train_imp, X_test_imp, X_train_samp_imp
     else:
         log_message(">> Skipping imputation application (Config=False). Using original data.", level="INFO")
@@ -141,4 +173,112 @@ def split_and_sample(df):
     X_train_samp = train_sampled.drop(columns=[DataConfig.TARGET_COLUMN])
     y_train_samp = train_sampled[DataConfig.TARGET_COLUMN]
     
-    return X_train, X_test, y_train, y_test, X_train_samp, y_train_samp
\ No newline at end of file
+    return X_train, X_test, y_train, y_test, X_train_samp, y_train_samp
+
+def _sample_positions(y_train):
+    """
+    Positions (into the train rows) of the tuning sample: per class, the rows
+    split_and_sample's resample would draw, in the same order.
+    """
+    picks = []
+    for label in np.unique(y_train):
+        rows = np.flatnonzero(y_train == label)
+        n_samples = min(len(rows), ExperimentConfig.MAX_SAMPLES_PER_CLASS)
+        picks.append(rows[np.random.RandomState(ExperimentConfig.RANDOM_STATE).permutation(len(rows))[:n_samples]])
+    return np.concatenate(picks)
+
+
+def _column_modes(values):
+    """Most frequent non-missing value of each column (smallest on ties, like SimpleImputer)."""
+    modes = np.empty(values.shape[1])
+    for j in range(values.shape[1]):
+        col = values[:, j]
+        uniques, counts = np.unique(col[~np.isnan(col)], return_counts=True)
+        modes[j] = uniques[counts.argmax()] if len(uniques) else np.nan
+    return modes
+
+
+def split_and_preprocess_matrix(df, params=None):
+    """
+    Matrix mode of split_and_sample -> impute_data -> normalize_data.
+
+    Rows are split and sampled as index arrays (same rows as the frame path), then
+    gathered once into a single float32 matrix ordered [tuning sample | rest of
+    train | test]. Imputation and scaling statistics come from the train rows and
+    are applied in place, once. X_train, X_test and X_train_samp are DataFrame views
+    of that matrix: the sample is the first rows of the train view. The applied
+    statistics are stored in `params` (dict, if given) like impute_data/normalize_data.
+    Note: train rows come sample first, so their order differs from the frame path.
+    """
+    target_col = DataConfig.TARGET_COLUMN
+    feature_cols = [c for c in df.columns if c not in (target_col, 'BlockGroup')]
+    y = df[target_col].to_numpy()
+
+    train_pos, test_pos = train_test_split(
+        np.arange(len(df)),
+        test_size=ExperimentConfig.TEST_SIZE,
+        random_state=ExperimentConfig.RANDOM_STATE,
+        stratify=y
+    )
+
+    samp_in_train = _sample_positions(y[train_pos])
+    is_rest = np.ones(len(train_pos), dtype=bool)
+    is_rest[samp_in_train] = False
+    row_order = np.concatenate((train_pos[samp_in_train], train_pos[is_rest], test_pos))
+    n_samp, n_train = len(samp_in_train), len(train_pos)
+
+    # One gather per column straight into the float32 matrix
+    X = np.empty((len(row_order), len(feature_cols)), dtype=np.float32)
+    for j, col in enumerate(feature_cols):
+        X[:, j] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)[row_order]
+    train = X[:n_train]
+
+    # Imputation: mean for floats, mode for ints/objects (statistics of the train rows)
+    is_float = np.array([pd.api.types.is_float_dtype(df[c].dtype) for c in feature_cols], dtype=bool)
+    impute_vals = np.empty(len(feature_cols))
+    impute_vals[is_float] = np.nanmean(train[:, is_float], axis=0, dtype=np.float64)
+    impute_vals[~is_float] = _column_modes(train[:, ~is_float])
+
+    vals_str = ", ".join(f"{v:.6f}" for v in impute_vals)
+    log_message("=== Imputation Parameters -  Mean (floats) / Mode (ints) ===", level="INFO")
+    log_message(f"- Feature Order: {feature_cols}", level="DEBUG")
+    log_message(f"- impute_vals[] = {{ {vals_str} }};", level="DEBUG")
+
+    if getattr(ExperimentConfig, 'IMPUTE_MISSING_VALUES', False):
+        log_message(">> Applying imputation to datasets (Config=True).", level="WARNING")
+        for j in np.flatnonzero(np.isnan(X).any(axis=0)):
+            X[np.isnan(X[:, j]), j] = impute_vals[j]
+        if params is not None:
+            params['impute_values'] = pd.Series(impute_vals, index=feature_cols)
+    else:
+        log_message(">> Skipping imputation application (Config=False). Using original data.", level="INFO")
+
+    # Standardization in place (StandardScaler statistics of the train rows)
+    if ExperimentConfig.NORMALIZE_DATA:
+        log_message("Normalizing data (fit on Train only)...", level="INFO")
+        means = np.nanmean(train, axis=0, dtype=np.float64)
+        scales = np.nanstd(train, axis=0, dtype=np.float64)
+        scales[scales == 0.0] = 1.0
+        X -= means.astype(np.float32)
+        X /= scales.astype(np.float32)
+
+        log_message(f"Normalized params:", level="DEBUG")
+        log_message(f"- Feature Order: {feature_cols}", level="DEBUG")
+        log_message(f"- means[] = {{ {', '.join(f'{m:.6f}' for m in means)} }};", level="DEBUG")
+        log_message(f"- scales[] = {{ {', '.join(f'{s:.6f}' for s in scales)} }};", level="DEBUG")
+
+        if params is not None:
+            params['means'] = pd.Series(means, index=feature_cols)
+            params['scales'] = pd.Series(scales, index=feature_cols)
+
+    index = df.index[row_order]
+    target = pd.Series(y[row_order], index=index, name=target_col)
+
+    def view(rows):
+        return pd.DataFrame(X[rows], columns=feature_cols, index=index[rows], copy=False)
+
+    return (
+        view(slice(0, n_train)), view(slice(n_train, None)),
+        target.iloc[:n_train], target.iloc[n_train:],
+        view(slice(0, n_samp)), target.iloc[:n_samp],
+    )
@@ -0,0 +1,116 @@
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+from config.settings import ExperimentConfig
+from .utils import log_message
+
+
+def iter_batches(X, y, batch_size):
+    """Yields (X, y) mini-batches of rows, the features as float64 (X: array or frame)."""
+    y = np.asarray(y)
+    for start in range(0, len(y), batch_size):
+        X_batch = X.iloc[start:start + batch_size] if hasattr(X, 'iloc') else X[start:start + batch_size]
+        yield np.asarray(X_batch, dtype=np.float64), y[start:start + batch_size]
+
+
+def parquet_batches(path, columns, y, batch_size, preprocessing=None):
+    """
+    Disk-backed batch source: a callable returning an iterator of (X, y) mini-batches
+    read from a Parquet file (e.g. the cached cleaned frame) by record batches of
+    `batch_size` rows, only `columns` and the index. Rows are kept when their index
+    is in `y` (a Series of the train labels, indexed like the file), in file order,
+    and get the split's imputation values / scaler statistics of `preprocessing`
+    applied per batch, so they match the in-memory train matrix.
+    Returns None when the file does not hold every column.
+    """
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    if not set(columns) <= set(parquet.schema_arrow.names):
+        return None
+
+    # Index of the frame: a stored column, or a RangeIndex described in the metadata
+    index_column = (parquet.schema_arrow.pandas_metadata or {}).get('index_columns', [None])[0]
+    read_columns = list(columns) + ([index_column] if isinstance(index_column, str) else [])
+
+    preprocessing = preprocessing or {}
+    impute_values = preprocessing.get('impute_values')
+    means, scales = preprocessing.get('means'), preprocessing.get('scales')
+    impute_values = None if impute_values is None else impute_values[columns].to_numpy(dtype=np.float64)
+    means = None if means is None else means[columns].to_numpy(dtype=np.float64)
+    scales = None if scales is None else scales[columns].to_numpy(dtype=np.float64)
+    labels = np.asarray(y)
+
+    def batches():
+        n_rows, n_kept = 0, 0
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=read_columns):
+            if isinstance(index_column, str):
+                index = batch.column(index_column).to_numpy()
+            elif isinstance(index_column, dict):  # {'kind': 'range', 'start', 'step', ...}
+                index = index_column['start'] + index_column['step'] * np.arange(n_rows, n_rows + batch.num_rows)
+            else:
+                index = np.arange(n_rows, n_rows + batch.num_rows)
+            n_rows += batch.num_rows
+
+            positions = y.index.get_indexer(index)
+            keep = positions >= 0
+            if not keep.any():
+                continue
+            X_batch = np.column_stack([batch.column(c).to_numpy(zero_copy_only=False).astype(np.float64)[keep]
+                                       for c in columns])
+            if impute_values is not None:
+                missing = np.isnan(X_batch)
+                X_batch[missing] = np.broadcast_to(impute_values, X_batch.shape)[missing]
+            if means is not None:
+                X_batch = (X_batch - means) / scales
+            n_kept += int(keep.sum())
+            yield X_batch, labels[positions[keep]]
+
+        if n_kept != len(labels):
+            raise ValueError(f"{len(labels) - n_kept} train rows are missing from {path}")
+
+    return batches
+
+
+def train_streaming_logistic(batches, params):
+    """
+    Logistic regression trained out-of-core with SGD (log loss) over mini-batches.
+
+    `batches` is a callable returning a fresh iterator of (X, y) batches. A first
+    streaming pass computes the StandardScaler statistics and the classes; then
+    STREAMING_EPOCHS passes of partial_fit run on the scaled batches. The L2 penalty
+    matches LogisticRegression's C (alpha = 1 / (C * n_samples)), and the scaling is
+    folded into coef_/intercept_ so the model takes the unscaled features (and is
+    exported by LogisticRegToCpp as is).
+    """
+    scaler = StandardScaler()
+    batch_classes = []
+    n_samples = 0
+    for X_batch, y_batch in batches():
+        scaler.partial_fit(X_batch)
+        batch_classes.append(np.unique(y_batch))
+        n_samples += len(y_batch)
+    # Concatenated (not accumulated from an empty float array): keeps the label dtype
+    classes = np.unique(np.concatenate(batch_classes))
+
+    model = SGDClassifier(
+        loss='log_loss',
+        penalty='l2',
+        alpha=1.0 / (params.get('C', 1.0) * n_samples),
+        average=True,
+        random_state=params.get('random_state'),
+    )
+    rng = np.random.RandomState(params.get('random_state'))
+    epochs = getattr(ExperimentConfig, 'STREAMING_EPOCHS', 5)
+    for _ in range(epochs):
+        for X_batch, y_batch in batches():
+            order = rng.permutation(len(y_batch))
+            model.partial_fit(scaler.transform(X_batch[order]), y_batch[order], classes=classes)
+
+    # w . (x - mean) / scale + b  ==  (w / scale) . x + (b - w . mean / scale)
+    coef = model.coef_ / scaler.scale_
+    model.intercept_ = model.intercept_ - coef @ scaler.mean_
+    model.coef_ = coef
+
+    log_message(f"Streaming logistic regression: {n_samples} samples, {epochs} epochs, alpha={model.alpha:.3e}", level="INFO")
+    return model
@@ -1,13 +1,52 @@
 import time
-from sklearn.model_selection import RandomizedSearchCV
-from config.settings import ExperimentConfig
+import numpy as np
+from functools import partial
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, balanced_accuracy_score, f1_score
+from sklearn.model_selection import StratifiedKFold, ParameterGrid
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingRandomSearchCV)
+from sklearn.model_selection import RandomizedSearchCV, HalvingRandomSearchCV
+from config.settings import DataConfig, ExperimentConfig
 from config.model_hyperparameters import BASE_MODELS, SEARCH_SPACES
 from .utils import log_message
+from .tree_utils import ccp_candidate_alphas, ccp_resolved_nodes
+from .streaming import iter_batches, parquet_batches, train_streaming_logistic
+from .cache import cached_frame_path
 
-def tune_hyperparameters(X, y, model_type):
-    """Executes RandomizedSearchCV to find best params."""
-    log_message(f"Starting Randomized Hyperparameter Search for {model_type}...", level="INFO")
+# Prediction-based metrics usable by the path engines (they score predictions, not estimators)
+_PATH_METRICS = {
+    'accuracy': accuracy_score,
+    'balanced_accuracy': balanced_accuracy_score,
+    'f1_macro': partial(f1_score, average='macro'),
+    'f1_weighted': partial(f1_score, average='weighted'),
+}
+
+def tune_hyperparameters(X, y, model_type, fold_plan=None):
+    """
+    Finds the best params with the engine selected by ExperimentConfig.SEARCH_ENGINE:
+    - 'random': RandomizedSearchCV over RANDOM_SEARCH_ITER candidates.
+    - 'halving': successive halving over the number of samples; the same candidates
+      start on a small subset and only the survivors are fitted on the full data.
+    - 'path': model-specific path search (decision_tree: cost-complexity pruning path,
+      logistic_regression: warm-started regularization path over C).
+    With a fold plan, the search runs on its memory-mapped matrix and shared folds.
+    """
+    engine = getattr(ExperimentConfig, 'SEARCH_ENGINE', 'random')
     start_time = time.time()
+
+    cv, folds = ExperimentConfig.CV_FOLDS, None
+    if fold_plan is not None:
+        X, y, folds = fold_plan.matrix(X.columns), fold_plan.y, fold_plan.folds
+        cv = folds
+
+    if engine == 'path':
+        if model_type in PATH_TUNERS:
+            best_params = PATH_TUNERS[model_type](X, y, folds)
+            log_message(f"Total time: {time.time() - start_time:.2f} seconds", level="DEBUG")
+            return best_params
+        log_message(f"No path search for {model_type}. Falling back to random search.", level="WARNING")
+        engine = 'random'
     
     model_conf = BASE_MODELS[model_type]
     estimator = model_conf['estimator'](**model_conf['params'])
@@ -15,31 +54,205 @@ def tune_hyperparameters(X, y, model_type):
     if model_type not in SEARCH_SPACES:
         raise ValueError(f"Search space not defined for {model_type}")
 
-    search = RandomizedSearchCV(
-        estimator=estimator,
-        param_distributions=SEARCH_SPACES[model_type],
-        n_iter=ExperimentConfig.RANDOM_SEARCH_ITER,
-        cv=ExperimentConfig.CV_FOLDS,
-        scoring=ExperimentConfig.SCORING,
-        n_jobs=ExperimentConfig.N_JOBS,
-        random_state=ExperimentConfig.RANDOM_STATE
-    )
+    if engine == 'halving':
+        log_message(f"Starting Successive Halving Search for {model_type}...", level="INFO")
+        search = HalvingRandomSearchCV(
+            estimator=estimator,
+            param_distributions=SEARCH_SPACES[model_type],
+            n_candidates=ExperimentConfig.RANDOM_SEARCH_ITER,
+            factor=getattr(ExperimentConfig, 'HALVING_FACTOR', 3),
+            resource='n_samples',
+            min_resources=getattr(ExperimentConfig, 'HALVING_MIN_RESOURCES', 'exhaust'),
+            cv=cv,
+            scoring=ExperimentConfig.SCORING,
+            n_jobs=ExperimentConfig.N_JOBS,
+            random_state=ExperimentConfig.RANDOM_STATE
+        )
+    elif engine == 'random':
+        log_message(f"Starting Randomized Hyperparameter Search for {model_type}...", level="INFO")
+        search = RandomizedSearchCV(
+            estimator=estimator,
+            param_distributions=SEARCH_SPACES[model_type],
+            n_iter=ExperimentConfig.RANDOM_SEARCH_ITER,
+            cv=cv,
+            scoring=ExperimentConfig.SCORING,
+            n_jobs=ExperimentConfig.N_JOBS,
+            random_state=ExperimentConfig.RANDOM_STATE
+        )
+    else:
+        raise ValueError(f"Unknown SEARCH_ENGINE: {engine}")
     
     search.fit(X, y)
+    if engine == 'halving':
+        for i, (n_cand, n_res) in enumerate(zip(search.n_candidates_, search.n_resources_)):
+            log_message(f"Halving iteration {i}: {n_cand} candidates x {n_res} samples", level="DEBUG")
     log_message(f"Best parameters found: {search.best_params_}", level="INFO")
     log_message(f"Best cross-validation score: {search.best_score_:.4f}", level="INFO")
     log_message(f"Total time: {time.time() - start_time:.2f} seconds", level="DEBUG")
     
     return search.best_params_
 
-def train_final_model(X_train, y_train, model_type, best_params):
-    """Trains the final model with best params on full training set."""
+def train_final_model(X_train, y_train, model_type, best_params, preprocessing=None):
+    """
+    Trains the final model with best params on full training set. `preprocessing`
+    (imputation values / scaler statistics of the split) is applied to the batches
+    the streaming logistic regression reads from disk.
+    """
     log_message(f"Training final {model_type} model...", level="INFO")
     model_conf = BASE_MODELS[model_type]
     
     # Merge static params with tuned params
     final_params = {**model_conf['params'], **best_params}
+
+    # Streaming mode: mini-batches of the train rows read from the cached cleaned frame
+    # on disk (preprocessed per batch), no full float64 copy for lbfgs
+    if model_type == 'logistic_regression' and getattr(ExperimentConfig, 'LR_TRAINER', 'lbfgs') == 'streaming':
+        batch_size = getattr(ExperimentConfig, 'STREAMING_BATCH_SIZE', 50000)
+        source = cached_frame_path(DataConfig.FILE_PATH)
+        batches = source and parquet_batches(source, list(X_train.columns), y_train, batch_size, preprocessing)
+        if batches is None:
+            log_message("No cached frame with the train features on disk. Streaming the in-memory train split.", level="WARNING")
+            batches = lambda: iter_batches(X_train, y_train, batch_size)
+        return train_streaming_logistic(batches, final_params)
     
     model = model_conf['estimator'](**final_params)
     model.fit(X_train, y_train)
-    return model
\ No newline at end of file
+    return model
+
+
+def _path_scorer():
+    if ExperimentConfig.SCORING not in _PATH_METRICS:
+        raise ValueError(f"SCORING '{ExperimentConfig.SCORING}' is not supported by the path search engines.")
+    return _PATH_METRICS[ExperimentConfig.SCORING]
+
+
+def _cv_folds(X, y):
+    # Same folds as cv=CV_FOLDS in the sklearn searches (StratifiedKFold, no shuffle)
+    return list(StratifiedKFold(n_splits=ExperimentConfig.CV_FOLDS).split(X, y))
+
+
+def _score_pruned_tree(tree, alphas, X, y, train_idx, val_idx, score_func):
+    """Fits one large tree on the fold and scores every pruned version of it on the validation rows."""
+    tree.fit(X[train_idx], y[train_idx])
+
+    resolved = ccp_resolved_nodes(tree.tree_, alphas)
+    node_class = tree.classes_[tree.tree_.value[:, 0, :].argmax(axis=1)]
+    preds = node_class[resolved[tree.apply(X[val_idx])]]  # (n_val, n_alphas)
+
+    y_val = y[val_idx]
+    return np.array([score_func(y_val, preds[:, i]) for i in range(len(alphas))])
+
+
+def _tune_tree_by_pruning(X, y, folds=None):
+    """
+    Cost-complexity path search for decision trees.
+
+    Per criterion, one large tree (least restrictive size controls of the search
+    space) is grown on each CV fold. Every candidate ccp_alpha is then evaluated by
+    pruning that tree instead of refitting, so the whole search costs
+    criteria x (CV_FOLDS + 1) fits.
+    """
+    log_message("Starting Cost-Complexity Pruning Path Search for decision_tree...", level="INFO")
+    space = SEARCH_SPACES['decision_tree']
+    score_func = _path_scorer()
+    max_candidates = getattr(ExperimentConfig, 'CCP_ALPHA_CANDIDATES', 200)
+
+    # Least restrictive size controls: pruning explores the complexities below them
+    grow_params = {}
+    for param, pick in (('min_samples_split', min), ('min_samples_leaf', min), ('max_depth', max), ('max_leaf_nodes', max)):
+        if param in space:
+            grow_params[param] = pick(space[param])
+
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    folds = folds if folds is not None else _cv_folds(X, y)
+    model_conf = BASE_MODELS['decision_tree']
+
+    best = (-np.inf, None, None)
+    for criterion in space.get('criterion', ['gini']):
+        tree = model_conf['estimator'](**{**model_conf['params'], **grow_params, 'criterion': criterion})
+
+        # Alpha grid from a tree grown on the whole sample
+        alphas = ccp_candidate_alphas(clone(tree).fit(X, y).tree_, max_candidates)
+
+        fold_scores = Parallel(n_jobs=ExperimentConfig.N_JOBS)(
+            delayed(_score_pruned_tree)(clone(tree), alphas, X, y, train_idx, val_idx, score_func)
+            for train_idx, val_idx in folds
+        )
+        mean_scores = np.mean(fold_scores, axis=0)
+
+        # Ties go to the larger alpha (smaller tree)
+        i = len(alphas) - 1 - np.argmax(mean_scores[::-1])
+        log_message(f"criterion={criterion}: {len(alphas)} alphas, best ccp_alpha={alphas[i]:.3e} (score {mean_scores[i]:.4f})", level="DEBUG")
+        if mean_scores[i] > best[0]:
+            best = (mean_scores[i], criterion, alphas[i])
+
+    best_score, best_criterion, best_alpha = best
+    best_params = {**grow_params, 'criterion': best_criterion, 'ccp_alpha': float(best_alpha)}
+
+    log_message(f"Best parameters found: {best_params}", level="INFO")
+    log_message(f"Best cross-validation score: {best_score:.4f}", level="INFO")
+    return best_params
+
+
+def _score_regularization_path(estimator, Cs, X, y, train_idx, val_idx, score_func):
+    """Walks the C grid on one fold, each fit warm-started from the previous coefficients."""
+    X_train, y_train = X[train_idx], y[train_idx]
+    X_val, y_val = X[val_idx], y[val_idx]
+
+    model = clone(estimator).set_params(warm_start=True)
+    scores = []
+    for C in Cs:
+        model.set_params(C=C)
+        model.fit(X_train, y_train)
+        scores.append(score_func(y_val, model.predict(X_val)))
+    return np.array(scores)
+
+
+def _tune_logistic_by_path(X, y, folds=None):
+    """
+    Regularization path search for logistic regression.
+
+    The C grid is walked in increasing order (strongest regularization first) and
+    each fit starts from the previous solution, so the whole path on a fold costs
+    about as much as a few cold fits. Folds and the dense (already standardized)
+    matrix are built once and shared by every point of the path.
+    """
+    log_message("Starting Regularization Path Search for logistic_regression...", level="INFO")
+    space = SEARCH_SPACES['logistic_regression']
+    score_func = _path_scorer()
+    Cs = sorted(space['C'])
+
+    # A fold plan matrix (float32 memmap) is used as is, without a float64 copy
+    X = X if isinstance(X, np.ndarray) else np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    folds = folds if folds is not None else _cv_folds(X, y)
+    model_conf = BASE_MODELS['logistic_regression']
+
+    best = (-np.inf, None)
+    # One path per combination of the other params (solver, penalty, max_iter...)
+    for fixed_params in ParameterGrid({k: v for k, v in space.items() if k != 'C'}):
+        estimator = model_conf['estimator'](**{**model_conf['params'], **fixed_params})
+
+        fold_scores = Parallel(n_jobs=ExperimentConfig.N_JOBS)(
+            delayed(_score_regularization_path)(estimator, Cs, X, y, train_idx, val_idx, score_func)
+            for train_idx, val_idx in folds
+        )
+        mean_scores = np.mean(fold_scores, axis=0)
+
+        # Ties go to the smaller C (stronger regularization)
+        i = int(np.argmax(mean_scores))
+        log_message(f"{fixed_params}: best C={Cs[i]} (score {mean_scores[i]:.4f})", level="DEBUG")
+        if mean_scores[i] > best[0]:
+            best = (mean_scores[i], {**fixed_params, 'C': Cs[i]})
+
+    best_score, best_params = best
+    log_message(f"Best parameters found: {best_params}", level="INFO")
+    log_message(f"Best cross-validation score: {best_score:.4f}", level="INFO")
+    return best_params
+
+
+PATH_TUNERS = {
+    'decision_tree': _tune_tree_by_pruning,
+    'logistic_regression': _tune_logistic_by_path,
+}
@@ -0,0 +1,317 @@
+import numpy as np
+
+# sklearn.tree._tree constants
+TREE_LEAF = -1
+TREE_UNDEFINED = -2
+
+
+def node_parents(tree_):
+    """Parent of every node (-1 for the root)."""
+    parents = np.full(tree_.node_count, -1, dtype=np.int64)
+    internal = np.flatnonzero(tree_.children_left != TREE_LEAF)
+    parents[tree_.children_left[internal]] = internal
+    parents[tree_.children_right[internal]] = internal
+    return parents
+
+
+def node_visit_counts(tree_, leaf_ids):
+    """Rows reaching every node, from the leaf each row ends in (e.g. tree.apply(X))."""
+    counts = np.bincount(leaf_ids, minlength=tree_.node_count).astype(np.int64)
+    parents = node_parents(tree_)
+    # Children always have larger ids than their parent: a reverse scan is bottom-up
+    for node in range(tree_.node_count - 1, 0, -1):
+        counts[parents[node]] += counts[node]
+    return counts
+
+
+def _node_risk(tree_):
+    """R(t): impurity of each node weighted by its share of the training samples."""
+    weights = tree_.weighted_n_node_samples / tree_.weighted_n_node_samples[0]
+    return weights * tree_.impurity
+
+
+def ccp_candidate_alphas(tree_, max_candidates=200):
+    """
+    Grid of cost-complexity alphas for a fully grown tree.
+
+    Uses the weakest-link effective alpha of each internal node,
+    g(t) = (R(t) - R(T_t)) / (|leaves(T_t)| - 1), thinned to `max_candidates`
+    quantile-spaced values (0, i.e. the unpruned tree, is always included).
+    """
+    left, right = tree_.children_left, tree_.children_right
+    risk = _node_risk(tree_)
+    subtree_risk = risk.copy()
+    n_leaves = np.ones(tree_.node_count, dtype=np.int64)
+
+    # Children always have larger ids than their parent: a reverse scan is bottom-up
+    for node in range(tree_.node_count - 1, -1, -1):
+        if left[node] != TREE_LEAF:
+            subtree_risk[node] = subtree_risk[left[node]] + subtree_risk[right[node]]
+            n_leaves[node] = n_leaves[left[node]] + n_leaves[right[node]]
+
+    internal = left != TREE_LEAF
+    g = np.unique(np.clip((risk[internal] - subtree_risk[internal]) / (n_leaves[internal] - 1), 0.0, None))
+    # Equal alphas computed along different sums differ by rounding: merge them
+    g = g[np.concatenate(([True], ~np.isclose(g[1:], g[:-1], rtol=1e-9, atol=0.0)))]
+
+    # Midpoints between consecutive effective alphas avoid ties at the exact collapse points
+    alphas = np.unique(np.concatenate(([0.0], (g[:-1] + g[1:]) / 2, g[-1:] * 1.5)))
+
+    if len(alphas) > max_candidates:
+        idx = np.unique(np.linspace(0, len(alphas) - 1, max_candidates).round().astype(int))
+        alphas = alphas[idx]
+    return alphas
+
+
+def ccp_resolved_nodes(tree_, alphas):
+    """
+    Minimal cost-complexity pruning of a fitted tree for many alphas at once.
+
+    Returns an (n_nodes, n_alphas) array: the node each node of the full tree
+    resolves to once the tree is pruned with that alpha (itself, or the pruned
+    ancestor that became a leaf). Predictions of the pruned trees are then just
+    resolved[tree.apply(X)], with no refit.
+    """
+    left, right = tree_.children_left, tree_.children_right
+    n_nodes = tree_.node_count
+    alphas = np.asarray(alphas, dtype=np.float64)
+    risk = _node_risk(tree_)
+
+    # Bottom-up: optimal subtree cost R_alpha(T_t) and whether t collapses into a leaf
+    cost = np.empty((n_nodes, len(alphas)))
+    terminal = np.ones((n_nodes, len(alphas)), dtype=bool)
+    for node in range(n_nodes - 1, -1, -1):
+        leaf_cost = risk[node] + alphas
+        if left[node] == TREE_LEAF:
+            cost[node] = leaf_cost
+        else:
+            subtree_cost = cost[left[node]] + cost[right[node]]
+            # Ties collapse, like sklearn (smallest optimal subtree)
+            terminal[node] = subtree_cost >= leaf_cost
+            cost[node] = np.minimum(subtree_cost, leaf_cost)
+
+    # Top-down: every node resolves to its shallowest terminal ancestor
+    parents = node_parents(tree_)
+    resolved = np.where(terminal[0], 0, -1)[None, :].repeat(n_nodes, axis=0)
+    for node in range(1, n_nodes):
+        inherited = resolved[parents[node]]
+        resolved[node] = np.where(inherited >= 0, inherited, np.where(terminal[node], node, -1))
+    return resolved
+
+
+class TreeArrays:
+    """
+    Array representation of a fitted binary classification tree, with the same
+    attribute names as sklearn's `tree_` (children_left/right, feature, threshold,
+    value, impurity, n_node_samples, weighted_n_node_samples, node_count...).
+    Children always have larger ids than their parent.
+    """
+
+    def __init__(self, children_left, children_right, feature, threshold, value, impurity,
+                 n_node_samples, weighted_n_node_samples):
+        self.children_left = np.asarray(children_left, dtype=np.int64)
+        self.children_right = np.asarray(children_right, dtype=np.int64)
+        self.feature = np.asarray(feature, dtype=np.int64)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.impurity = np.asarray(impurity, dtype=np.float64)
+        self.n_node_samples = np.asarray(n_node_samples, dtype=np.int64)
+        self.weighted_n_node_samples = np.asarray(weighted_n_node_samples, dtype=np.float64)
+
+        self.node_count = len(self.children_left)
+        self.n_outputs = 1
+        self.n_classes = np.array([self.value.shape[2]])
+        self.max_n_classes = self.value.shape[2]
+        self.n_leaves = int(np.sum(self.children_left == TREE_LEAF))
+        self.max_depth = int(node_depths(self).max())
+
+    def apply(self, X):
+        """Leaf id of every row of X (X[:, feature] <= threshold goes left)."""
+        X = np.asarray(X)
+        rows = np.arange(X.shape[0])
+        node = np.zeros(X.shape[0], dtype=np.int64)
+        internal = self.children_left[node] != TREE_LEAF
+        while internal.any():
+            r, n = rows[internal], node[internal]
+            go_left = X[r, self.feature[n]] <= self.threshold[n]
+            node[r] = np.where(go_left, self.children_left[n], self.children_right[n])
+            internal[r] = self.children_left[node[r]] != TREE_LEAF
+        return node
+
+    def subtree(self, keep, make_leaf):
+        """
+        New TreeArrays with the nodes in `keep` (a connected set containing the root),
+        the nodes in `make_leaf` becoming leaves. Ids are renumbered in order.
+        """
+        old_ids = np.flatnonzero(keep)
+        new_id = np.full(self.node_count, TREE_LEAF, dtype=np.int64)
+        new_id[old_ids] = np.arange(len(old_ids))
+
+        is_leaf = make_leaf[old_ids] | (self.children_left[old_ids] == TREE_LEAF)
+        left = np.where(is_leaf, TREE_LEAF, new_id[self.children_left[old_ids]])
+        right = np.where(is_leaf, TREE_LEAF, new_id[self.children_right[old_ids]])
+        return TreeArrays(
+            left, right,
+            np.where(is_leaf, TREE_UNDEFINED, self.feature[old_ids]),
+            np.where(is_leaf, float(TREE_UNDEFINED), self.threshold[old_ids]),
+            self.value[old_ids], self.impurity[old_ids],
+            self.n_node_samples[old_ids], self.weighted_n_node_samples[old_ids],
+        )
+
+    def prune(self, ccp_alpha):
+        """Minimal cost-complexity pruning (same subtree as sklearn's ccp_alpha)."""
+        if ccp_alpha <= 0.0:
+            return self
+        resolved = ccp_resolved_nodes(self, [ccp_alpha])[:, 0]
+        # -1: above every pruned node; itself: leaf or pruned node; else: inside a pruned subtree
+        terminal = resolved == np.arange(self.node_count)
+        return self.subtree((resolved == -1) | terminal, terminal)
+
+
+def node_depths(tree_):
+    """Depth of every node (root = 0)."""
+    depths = np.zeros(tree_.node_count, dtype=np.int64)
+    for node in range(tree_.node_count):
+        if tree_.children_left[node] != TREE_LEAF:
+            depths[tree_.children_left[node]] = depths[node] + 1
+            depths[tree_.children_right[node]] = depths[node] + 1
+    return depths
+
+
+def impurity_importances(tree_, n_features):
+    """Normalized total impurity decrease per feature (sklearn's feature_importances_)."""
+    left, right = tree_.children_left, tree_.children_right
+    w = tree_.weighted_n_node_samples
+    internal = np.flatnonzero(left != TREE_LEAF)
+    decrease = (w[internal] * tree_.impurity[internal]
+                - w[left[internal]] * tree_.impurity[left[internal]]
+                - w[right[internal]] * tree_.impurity[right[internal]])
+
+    importances = np.bincount(tree_.feature[internal], weights=decrease, minlength=n_features)
+    total = importances.sum()
+    return importances / total if total > 0 else importances
+
+
+def tree_stats(tree_):
+    """Node count, leaf count, max depth and mean leaf depth of a tree."""
+    leaves = tree_.children_left == TREE_LEAF
+    depths = node_depths(tree_)
+    return {'nodes': int(tree_.node_count), 'leaves': int(leaves.sum()),
+            'max_depth': int(depths.max()), 'mean_depth': float(depths[leaves].mean())}
+
+
+def simplify_tree(tree_):
+    """
+    Tree predicting the same class for every finite input, without redundant nodes:
+    - a split one side of which no input can reach (empty feature interval given
+      the thresholds on its path) is replaced by its other side,
+    - a subtree whose reachable leaves all predict one class becomes a leaf.
+    Returns a TreeArrays, nodes renumbered depth-first.
+    """
+    left, right = tree_.children_left, tree_.children_right
+    feature, threshold = tree_.feature, tree_.threshold
+    n_nodes = tree_.node_count
+    predicted = tree_.value[:, 0, :].argmax(axis=1)
+
+    # Top-down: reachable children of every node, x[f] in (lo[f], hi[f]] along the path
+    reach_left = np.zeros(n_nodes, dtype=bool)
+    reach_right = np.zeros(n_nodes, dtype=bool)
+    n_features = int(feature.max()) + 1 if (left != TREE_LEAF).any() else 0
+    stack = [(0, np.full(n_features, -np.inf), np.full(n_features, np.inf))]
+    while stack:
+        node, lo, hi = stack.pop()
+        if left[node] == TREE_LEAF:
+            continue
+        f, t = feature[node], threshold[node]
+        reach_left[node], reach_right[node] = t > lo[f], t < hi[f]
+        if reach_left[node]:
+            hi_left = hi.copy()
+            hi_left[f] = min(hi[f], t)
+            stack.append((left[node], lo, hi_left))
+        if reach_right[node]:
+            lo_right = lo.copy()
+            lo_right[f] = max(lo[f], t)
+            stack.append((right[node], lo_right, hi))
+
+    # Bottom-up: class of the subtrees that predict a single class (-1 otherwise), and
+    # a node whose value predicts it (children always have larger ids than their parent)
+    constant = np.where(left == TREE_LEAF, predicted, -1)
+    source = np.arange(n_nodes)
+    for node in range(n_nodes - 1, -1, -1):
+        if left[node] == TREE_LEAF:
+            continue
+        children = [c for c, reached in ((left[node], reach_left[node]), (right[node], reach_right[node])) if reached]
+        classes = {constant[c] for c in children}
+        if len(classes) == 1 and -1 not in classes:
+            constant[node] = classes.pop()
+            source[node] = node if predicted[node] == constant[node] else source[children[0]]
+
+    # Depth-first rebuild: bypass one-sided splits, constant subtrees become leaves
+    nodes, new_left, new_right = [], [], []
+    stack = [(0, -1, True)]
+    while stack:
+        node, parent, is_left = stack.pop()
+        while left[node] != TREE_LEAF and constant[node] == -1 and reach_left[node] != reach_right[node]:
+            node = left[node] if reach_left[node] else right[node]
+        new_id = len(nodes)
+        if parent >= 0:
+            (new_left if is_left else new_right)[parent] = new_id
+        leaf = left[node] == TREE_LEAF or constant[node] != -1
+        nodes.append((node, leaf))
+        new_left.append(TREE_LEAF)
+        new_right.append(TREE_LEAF)
+        if not leaf:
+            stack.append((right[node], new_id, False))
+            stack.append((left[node], new_id, True))
+
+    old = np.array([n for n, _ in nodes], dtype=np.int64)
+    is_leaf = np.array([leaf for _, leaf in nodes], dtype=bool)
+    value_of = np.where(is_leaf, source[old], old)
+    return TreeArrays(
+        new_left, new_right,
+        np.where(is_leaf, TREE_UNDEFINED, feature[old]),
+        np.where(is_leaf, float(TREE_UNDEFINED), threshold[old]),
+        tree_.value[value_of], tree_.impurity[old],
+        tree_.n_node_samples[old], tree_.weighted_n_node_samples[old],
+    )
+
+
+class ArrayTreeClassifier:
+    """
+    Fitted classifier around a TreeArrays (e.g. a simplified tree), with the
+    interface of sklearn's tree the exporters and evaluation use.
+    """
+
+    def __init__(self, tree_, classes, n_features_in, feature_names_in=None):
+        self.tree_ = tree_
+        self.classes_ = np.asarray(classes)
+        self.n_classes_ = len(self.classes_)
+        self.n_features_in_ = n_features_in
+        self.n_outputs_ = 1
+        if feature_names_in is not None:
+            self.feature_names_in_ = np.asarray(feature_names_in, dtype=object)
+
+    @classmethod
+    def simplified(cls, model):
+        """The simplified tree (simplify_tree) of a fitted tree classifier."""
+        return cls(simplify_tree(model.tree_), model.classes_, model.n_features_in_,
+                   getattr(model, 'feature_names_in_', None))
+
+    @property
+    def feature_importances_(self):
+        return impurity_importances(self.tree_, self.n_features_in_)
+
+    def get_depth(self):
+        return self.tree_.max_depth
+
+    def get_n_leaves(self):
+        return self.tree_.n_leaves
+
+    def apply(self, X):
+        return self.tree_.apply(np.asarray(X))
+
+    def predict_proba(self, X):
+        return self.tree_.value[self.apply(X), 0, :]
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
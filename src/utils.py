@@ -2,7 +2,7 @@ import os
 import logging
 import colorlog
 from logging.handlers import RotatingFileHandler
-from config.settings import LOG_FILE
+from config.settings import LOG_FILE, ExperimentConfig
 
 def _setup_logger():
     """Sets up a logger that logs to both console (with colors)"""
@@ -83,4 +83,41 @@ def log_message(message: str, level: str = 'info'):
     elif lvl == 'stage':
         _logger.stage(message)
     else:
-        _logger.info(message)
\ No newline at end of file
+        _logger.info(message)
+
+
+def use_worker_log_file():
+    """
+    Moves the file log of a pool worker to its own file, <log>.<pid>.log next to
+    LOG_FILE: a RotatingFileHandler is not safe across processes sharing one path
+    (concurrent rollovers lose or interleave records).
+    """
+    root, ext = os.path.splitext(LOG_FILE)
+    path = f"{root}.{os.getpid()}{ext}"
+    for handler in list(_logger.handlers):
+        if isinstance(handler, RotatingFileHandler):
+            if handler.baseFilename == os.path.abspath(path):
+                return
+            worker_handler = RotatingFileHandler(path, maxBytes=handler.maxBytes, backupCount=handler.backupCount,
+                                                 encoding='utf-8')
+            worker_handler.setFormatter(handler.formatter)
+            worker_handler.setLevel(handler.level)
+            _logger.removeHandler(handler)
+            handler.close()
+            _logger.addHandler(worker_handler)
+
+
+def split_core_budget():
+    """
+    Splits the core budget between block-group workers and estimator-level jobs.
+
+    Returns (group_workers, estimator_jobs) with group_workers * estimator_jobs
+    never above the budget, so nested joblib pools do not oversubscribe the machine.
+    """
+    budget = getattr(ExperimentConfig, 'CORE_BUDGET', None) or os.cpu_count() or 1
+    group_workers = max(1, min(getattr(ExperimentConfig, 'GROUP_JOBS', 1), budget))
+
+    if group_workers == 1:
+        return 1, ExperimentConfig.N_JOBS
+
+    return group_workers, max(1, budget // group_workers)
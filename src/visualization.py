@@ -7,7 +7,7 @@ from config.settings import ExperimentConfig, RESULTS_DIR
 from config.model_hyperparameters import VAL_CURVE_PARAMS, BASE_MODELS
 from .utils import log_message
 
-def generate_validation_curves(X, y, output_subdir, model_type):
+def generate_validation_curves(X, y, output_subdir, model_type, fold_plan=None):
     log_message(f"Generating validation curves for {output_subdir} (model: {model_type})...")
 
     # Instantiate estimator from BASE_MODELS
@@ -32,6 +32,10 @@ def generate_validation_curves(X, y, output_subdir, model_type):
         log_message(f"No numeric parameter ranges found for model '{model_type}'. Skipping validation curves.")
         return
 
+    cv = ExperimentConfig.CV_FOLDS
+    if fold_plan is not None:
+        X, y, cv = fold_plan.matrix(X.columns), fold_plan.y, fold_plan.folds
+
     for param_name, param_range in param_map.items():
         try:
             train_scores, test_scores = validation_curve(
@@ -39,7 +43,7 @@ def generate_validation_curves(X, y, output_subdir, model_type):
                 param_name=param_name,
                 param_range=param_range,
                 scoring=ExperimentConfig.SCORING,
-                cv=ExperimentConfig.CV_FOLDS,
+                cv=cv,
                 n_jobs=ExperimentConfig.N_JOBS
             )
         except Exception as e:
@@ -63,12 +67,13 @@ def generate_validation_curves(X, y, output_subdir, model_type):
 
 
 
-def generate_learning_curve(X, y, output_subdir, model_type, train_sizes=np.linspace(0.1, 1.0, 10), best_params=None):
+def generate_learning_curve(X, y, output_subdir, model_type, train_sizes=np.linspace(0.1, 1.0, 10), best_params=None, fold_plan=None):
     """
     Generate learning curve plots for a given model and dataset.
 
     If `best_params` is provided, they will override the default estimator
     parameters defined in `BASE_MODELS` when instantiating the estimator.
+    If `fold_plan` is provided, its memory-mapped matrix and folds are used.
     """
 
     log_message(f"Generating learning curve for {output_subdir} (model: {model_type})...")
@@ -92,13 +97,17 @@ def generate_learning_curve(X, y, output_subdir, model_type, train_sizes=np.lins
     save_path = RESULTS_DIR / "learning_curves" / output_subdir
     os.makedirs(save_path, exist_ok=True)
 
+    cv = ExperimentConfig.CV_FOLDS
+    if fold_plan is not None:
+        X, y, cv = fold_plan.matrix(X.columns), fold_plan.y, fold_plan.folds
+
     try:
         train_sizes_abs, train_scores, test_scores = learning_curve(
             estimator=clf,
             X=X,
             y=y,
             train_sizes=train_sizes,
-            cv=ExperimentConfig.CV_FOLDS,
+            cv=cv,
             scoring=ExperimentConfig.SCORING,
             n_jobs=ExperimentConfig.N_JOBS,
             shuffle=True,
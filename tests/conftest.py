@@ -0,0 +1,36 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Log to a temporary file instead of <repo>/execution.log (before src.utils sets the logger up)
+import config.settings as settings
+settings.LOG_FILE = Path(tempfile.mkdtemp()) / "execution.log"
+
+
+@pytest.fixture
+def cxx(tmp_path):
+    """Compiles `source` (C++ with the generated headers in `headers`) with g++ and runs it; returns stdout."""
+    compiler = shutil.which("g++")
+    if compiler is None:
+        pytest.skip("g++ not available")
+
+    def build_and_run(source, headers=(), args=()):
+        for header in headers:
+            shutil.copy(header, tmp_path)
+        (tmp_path / "main.cpp").write_text(source)
+        binary = tmp_path / "main"
+        build = subprocess.run([compiler, "-std=c++17", "-O2", "-Wall", "-Werror", "-I", str(tmp_path),
+                                str(tmp_path / "main.cpp"), "-o", str(binary)], capture_output=True, text=True)
+        assert build.returncode == 0, build.stderr
+        run = subprocess.run([str(binary), *args], capture_output=True, text=True, cwd=tmp_path)
+        assert run.returncode == 0, run.stderr
+        return run.stdout
+
+    return build_and_run
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import learning_curve
+from sklearn.tree import DecisionTreeClassifier
+
+import src.evaluation as evaluation
+import src.visualization as visualization
+from config.model_hyperparameters import BASE_MODELS
+from config.settings import ExperimentConfig
+
+from src.binned_tree import BinnedDecisionTreeClassifier, FeatureBinner
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    # Few distinct values per feature: one bin per value
+    X = pd.DataFrame(np.round(rng.randn(3000, 6), 1), columns=[f"f{j}" for j in range(6)])
+    y = ((X['f0'] + 0.5 * X['f1'] - X['f2'] * X['f3'] + 0.3 * rng.randn(len(X))) > 0).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize('criterion', ['gini', 'entropy'])
+def test_matches_exact_trainer_on_training_data(data, criterion):
+    X, y = data
+    params = dict(criterion=criterion, max_depth=4, min_samples_leaf=20)
+    exact = DecisionTreeClassifier(random_state=0, **params).fit(X, y)
+    binned = BinnedDecisionTreeClassifier(**params).fit(X, y)
+
+    assert binned.get_n_leaves() == exact.get_n_leaves()
+    np.testing.assert_array_equal(binned.predict(X), exact.predict(X))
+    np.testing.assert_allclose(binned.predict_proba(X), exact.predict_proba(X))
+
+
+def test_group_binning_matches_per_fit_binning(data):
+    X, y = data
+    train, test = X.iloc[:2000], X.iloc[2000:]
+    per_fit = BinnedDecisionTreeClassifier(max_depth=5, max_bins=16).fit(train, y[:2000])
+
+    binner = FeatureBinner(max_bins=16).fit(train)
+    prebinned = BinnedDecisionTreeClassifier(max_depth=5, max_bins=16, prebinned=True).fit(binner.transform(train), y[:2000])
+    np.testing.assert_array_equal(prebinned.predict(binner.transform(test)), per_fit.predict(test))
+
+    binner.restore_thresholds(prebinned)
+    np.testing.assert_array_equal(prebinned.tree_.threshold, per_fit.tree_.threshold)
+    np.testing.assert_array_equal(prebinned.predict(test), per_fit.predict(test))
+
+
+def test_codes_route_like_thresholds(data):
+    X, _ = data
+    binner = FeatureBinner(max_bins=8).fit(X)
+    codes = binner.transform(X)
+    for column, thresholds in binner.thresholds_.items():
+        for b, t in enumerate(thresholds):
+            np.testing.assert_array_equal(codes[column] <= b, X[column] <= t)
+
+
+def test_prebinned_fit_rejects_raw_features(data):
+    X, y = data
+    with pytest.raises(ValueError, match="bin codes"):
+        BinnedDecisionTreeClassifier(prebinned=True).fit(X * 100 + 1000.5, y)
+
+
+def test_end_of_run_learning_curve_fits_on_the_bin_codes(monkeypatch, tmp_path):
+    monkeypatch.setattr(evaluation, 'RESULTS_DIR', tmp_path)
+    monkeypatch.setattr(visualization, 'RESULTS_DIR', tmp_path)
+    monkeypatch.setattr(ExperimentConfig, 'RUN_LEARNING_CURVES_AT_END', True, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'LEARNING_CURVE_TRAIN_SIZES', [1.0], raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'CV_FOLDS', 3, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'N_JOBS', 1, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'EXPORT_CPP', False, raising=False)
+    monkeypatch.setitem(BASE_MODELS, 'decision_tree', {'estimator': BinnedDecisionTreeClassifier,
+                                                       'params': {'max_bins': 256, 'prebinned': True}})
+    curves = []
+    monkeypatch.setattr(visualization, 'learning_curve',
+                        lambda **kwargs: curves.append(learning_curve(**kwargs)) or curves[-1])
+
+    # Separable on feature values far outside the uint8 range
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame({'a': rng.uniform(1000, 2000, 900), 'b': rng.randn(900)})
+    y = pd.Series(np.where(X['a'] > 1500.5, 20, 10))
+    binner = FeatureBinner(max_bins=256).fit(X)
+    codes = binner.transform(X)
+    model = BinnedDecisionTreeClassifier(prebinned=True).fit(codes, y)
+    binner.restore_thresholds(model)
+
+    evaluation.evaluate_and_save(model, X, y, X, y, ['a', 'b'], 'area', 'tree', '8x8', 'decision_tree',
+                                 best_params={}, fit_X_train=codes)
+
+    # Same train accuracy as the in-memory binned fit
+    (_, train_scores, _), = curves
+    assert model.score(X, y) == 1.0
+    np.testing.assert_array_equal(train_scores, 1.0)
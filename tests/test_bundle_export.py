@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+import src.DecisionTreeToCpp as tree_to_cpp
+import src.LogisticRegToCpp as lr_to_cpp
+from src.BundleToCpp import BLOCK_SIZES, dispatch_table, save_bundle
+from src.grouping import GROUPING_STRATEGIES
+
+FEATURES = ["a", "b", "c", "d", "e"]
+GROUP_FEATURES = {"Horizontal": ["a", "c"], "Square": ["b", "c", "e"], "Vertical": ["d", "a"]}
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.RandomState(0)
+    # Values that are not float32-exact: narrowing to float would show in the LR outputs
+    return pd.DataFrame(rng.randn(300, len(FEATURES)) * 3 + 0.1, columns=FEATURES)
+
+
+def _labels(rows, group):
+    columns = GROUP_FEATURES[group]
+    return (rows[columns].sum(axis=1) + 0.3 * np.sin(7 * rows[columns[0]]) > 0).astype(int) * 10
+
+
+def _records(tmp_path, monkeypatch, rows, model_type):
+    export_dir = tmp_path / "export"
+    export_dir.mkdir()
+    monkeypatch.chdir(export_dir)
+    records, models = [], {}
+    for i, (group, columns) in enumerate(GROUP_FEATURES.items()):
+        name = f"model_{group}"
+        X, y = rows[columns], _labels(rows, group)
+        if model_type == 'decision_tree':
+            model = DecisionTreeClassifier(max_leaf_nodes=12, random_state=0).fit(X, y)
+            style = 'table' if i == 0 else 'if_else'
+            tree_to_cpp.save_code(model, columns, ["10", "0"], name, style=style, array=True)
+            record = {'arg': 'array' if style == 'table' else 'vector', 'returns': 'class',
+                      'class_names': [str(c) for c in model.classes_]}
+        else:
+            model = LogisticRegression(max_iter=10000).fit(X, y)
+            lr_to_cpp.save_code(model, columns, ["0", "10"], name, str(export_dir), array=True)
+            record = {'arg': 'vector', 'returns': 'double', 'class_names': ["0", "10"]}
+        record.update(header=str(export_dir / f"{name}.h"), function_name=name, feature_names=columns, block_group=group)
+        records.append(record)
+        models[group] = model
+    return records, models
+
+
+@pytest.mark.parametrize('model_type', ['decision_tree', 'logistic_regression'])
+def test_bundle_dispatches_to_the_group_models(cxx, tmp_path, monkeypatch, rows, model_type):
+    records, models = _records(tmp_path, monkeypatch, rows, model_type)
+    path = save_bundle(records, 'orientation', "bundle", str(tmp_path / "export"))
+
+    # Bundle feature array: union of the group features in order of first use
+    bundle_features = list(dict.fromkeys(f for group in sorted(GROUP_FEATURES) for f in GROUP_FEATURES[group]))
+    keys = [(w, h) for w in (4, 8, 32, 64) for h in (4, 16, 64)]
+    values = ", ".join("{ " + ", ".join(repr(float(v)) for v in row) + " }" for row in rows[bundle_features].to_numpy())
+    fmt = "%d" if model_type == 'decision_tree' else "%.17g"
+    source = '#include <cstdio>\n#include "bundle.h"\n'
+    source += f"static const double rows[{len(rows)}][{len(FEATURES)}] = {{ {values} }};\n"
+    source += "static const int keys[][2] = { " + ", ".join(f"{{ {w}, {h} }}" for w, h in keys) + " };\n"
+    source += f"int main() {{\n\tfor (int k = 0; k < {len(keys)}; k++)\n\t\tfor (int i = 0; i < {len(rows)}; i++)\n"
+    source += f"\t\t\tprintf(\"{fmt}\\n\", bundle(keys[k][0], keys[k][1], rows[i], -1));\n\treturn 0;\n}}\n"
+    result = np.array(cxx(source, headers=[path]).split(), dtype=np.float64).reshape(len(keys), len(rows))
+
+    for k, (w, h) in enumerate(keys):
+        model = models[GROUPING_STRATEGIES['orientation']({'Width': w, 'Height': h})]
+        X = rows[list(model.feature_names_in_)]
+        if model_type == 'decision_tree':
+            np.testing.assert_array_equal(result[k], model.predict(X))
+        else:
+            np.testing.assert_allclose(result[k], model.predict_proba(X)[:, 1], rtol=1e-12)
+
+
+def test_dispatch_table_follows_the_grouping_rules():
+    table = dispatch_table('orientation', ["Horizontal", "Square", "Vertical"])
+    for i, w in enumerate(BLOCK_SIZES):
+        for j, h in enumerate(BLOCK_SIZES):
+            group = GROUPING_STRATEGIES['orientation']({'Width': w, 'Height': h})
+            assert table[i, j] == ["Horizontal", "Square", "Vertical"].index(group)
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from config.settings import DataConfig
+from src import cache
+
+
+def _key(tmp_path, monkeypatch, mappings=None, reuse=True):
+    source = tmp_path / "data.csv"
+    if not source.exists():
+        source.write_text("a;b\n1;x\n")
+    mappings_file = tmp_path / "category_mappings.json"
+    if mappings is not None:
+        mappings_file.write_text(json.dumps(mappings))
+    monkeypatch.setattr(DataConfig, 'CATEGORY_MAPPINGS_FILE', mappings_file, raising=False)
+    monkeypatch.setattr(DataConfig, 'REUSE_CATEGORY_MAPPINGS', reuse, raising=False)
+    return cache.data_cache_key(source)
+
+
+def test_data_cache_key_is_stable(tmp_path, monkeypatch):
+    assert _key(tmp_path, monkeypatch, {"b": ["x"]}) == _key(tmp_path, monkeypatch)
+
+
+def test_data_cache_key_follows_category_mappings(tmp_path, monkeypatch):
+    base = _key(tmp_path, monkeypatch, {"b": ["x"]})
+    assert _key(tmp_path, monkeypatch, {"b": ["y", "x"]}) != base
+
+
+def test_data_cache_key_follows_reuse_flag(tmp_path, monkeypatch):
+    assert _key(tmp_path, monkeypatch, {"b": ["x"]}, reuse=True) != _key(tmp_path, monkeypatch, reuse=False)
+
+
+def test_stage_cache_is_off_by_default(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, '_STAGE_CACHE_DIR', tmp_path)
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+
+    assert cache.memoize_stage('split', 'k', compute) == 1
+    assert cache.memoize_stage('split', 'k', compute) == 2
+    assert not list(tmp_path.iterdir())
+
+
+def test_stage_cache_round_trip_and_eviction(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, '_STAGE_CACHE_DIR', tmp_path)
+    monkeypatch.setattr(cache.ExperimentConfig, 'STAGE_CACHE_ENABLED', True, raising=False)
+    monkeypatch.setattr(cache.ExperimentConfig, 'STAGE_CACHE_MAX_BYTES', None, raising=False)
+
+    assert cache.memoize_stage('split', 'a', lambda: [1, 2]) == [1, 2]
+    assert cache.stage_cached('split', 'a')
+    assert cache.memoize_stage('split', 'a', lambda: pytest.fail("recomputed")) == [1, 2]
+
+    monkeypatch.setattr(cache.ExperimentConfig, 'STAGE_CACHE_MAX_BYTES', 1, raising=False)
+    cache.memoize_stage('split', 'b', lambda: 'b')
+    assert not cache.stage_cached('split', 'a')
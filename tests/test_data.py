@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from config.settings import DataConfig, ExperimentConfig
+from src import cache as data_cache, data
+
+
+@pytest.fixture
+def csv_file(tmp_path, monkeypatch):
+    rng = np.random.RandomState(0)
+    n = 1000
+    df = pd.DataFrame({
+        'VideoName': rng.choice(['A', 'B', 'Skip'], n),
+        'Frame': rng.randint(0, 30, n),
+        'Width': rng.choice([4, 8, 16, 32], n),
+        'Height': rng.choice([4, 8, 16, 32], n),
+        'SliceType': rng.choice(['I', 'B', 'P'], n),
+        'feat': rng.randn(n),
+        'huge': rng.choice([1.0, 1e20, -1e25], n),
+        'IsIntra': rng.randint(0, 2, n).astype(float),
+    })
+    df.loc[rng.choice(n, 30, replace=False), 'feat'] = np.nan
+    df.loc[rng.choice(n, 10, replace=False), 'IsIntra'] = np.nan
+    df = pd.concat([df, df.iloc[:50]])  # duplicates
+
+    path = tmp_path / "data.csv"
+    df.to_csv(path, sep=';', index=False)
+    monkeypatch.setattr(DataConfig, 'CSV_SEPARATOR', ';')
+    monkeypatch.setattr(DataConfig, 'TARGET_COLUMN', 'IsIntra')
+    monkeypatch.setattr(DataConfig, 'REMOVE_COLUMNS', ['VideoName', 'Frame'])
+    monkeypatch.setattr(DataConfig, 'EXCLUDED_LINES', {'collum_name': 'VideoName', 'values': ['Skip']}, raising=False)
+    monkeypatch.setattr(DataConfig, 'CATEGORY_MAPPINGS_FILE', tmp_path / "mappings.json", raising=False)
+    monkeypatch.setattr(DataConfig, 'REUSE_CATEGORY_MAPPINGS', False, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'IMPUTE_MISSING_VALUES', False, raising=False)
+    return path
+
+
+def _read(path, monkeypatch, chunk_size):
+    monkeypatch.setattr(DataConfig, 'CSV_CHUNK_SIZE', chunk_size, raising=False)
+    return data._read_and_clean(path)
+
+
+def test_chunked_ingestion_matches_full_read(csv_file, monkeypatch):
+    full = _read(csv_file, monkeypatch, None)
+    chunked = _read(csv_file, monkeypatch, 128)
+
+    assert list(chunked.columns) == list(full.columns)
+    assert 'VideoName' not in full and len(full) < 1000
+    pd.testing.assert_frame_equal(chunked, full, check_dtype=False, rtol=1e-6)
+
+
+def test_chunked_ingestion_uses_compact_dtypes(csv_file, monkeypatch):
+    chunked = _read(csv_file, monkeypatch, 128)
+    assert chunked['feat'].dtype == np.float32
+    assert chunked['Width'].dtype == np.int8
+    assert chunked['huge'].abs().max() <= 1e18
+
+
+def test_data_cache_hits_without_categorical_columns(csv_file, monkeypatch, tmp_path):
+    monkeypatch.setattr(data_cache, '_DATA_CACHE_DIR', tmp_path / "cache")
+    monkeypatch.setattr(DataConfig, 'USE_DATA_CACHE', True, raising=False)
+    monkeypatch.setattr(DataConfig, 'CSV_CHUNK_SIZE', None, raising=False)
+    # Every string column is removed: nothing left to encode
+    monkeypatch.setattr(DataConfig, 'REMOVE_COLUMNS', ['VideoName', 'Frame', 'SliceType'])
+
+    reads = []
+    read_and_clean = data._read_and_clean
+    monkeypatch.setattr(data, '_read_and_clean', lambda path: reads.append(path) or read_and_clean(path))
+
+    first = data.load_and_clean_data(csv_file)
+    second = data.load_and_clean_data(csv_file)
+    assert len(reads) == 1
+    pd.testing.assert_frame_equal(second, first)
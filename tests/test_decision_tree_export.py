@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+import src.DecisionTreeToCpp as tree_to_cpp
+from src.tree_utils import ArrayTreeClassifier, node_visit_counts
+
+
+@pytest.fixture
+def tree_and_rows():
+    rng = np.random.RandomState(0)
+    # Half-integer values: many split thresholds are whole numbers (e.g. 12.0)
+    X = rng.randint(0, 40, size=(2000, 4)) + 0.5
+    y = (X[:, 0] + X[:, 1] > 40).astype(int) + (X[:, 2] > 30)
+    tree = DecisionTreeClassifier(max_leaf_nodes=40, random_state=0).fit(X, y)
+    assert any(float(t).is_integer() for t in tree.tree_.threshold[tree.tree_.feature >= 0])
+    return tree, X[:200]
+
+
+def _cpp_rows(rows):
+    return ", ".join("{ " + ", ".join(repr(float(v)) for v in row) + " }" for row in rows)
+
+
+def _predict(cxx, header, style, batch, rows):
+    n, d = rows.shape
+    source = f'#include <cstdio>\n#include <vector>\n#include "{header.name}"\n'
+    source += f"static const double rows[{n}][{d}] = {{ {_cpp_rows(rows)} }};\n"
+    source += "int main() {\n"
+    if batch:
+        source += f"\tstatic float soa[{d * n}];\n\tstatic int out[{n}];\n"
+        source += f"\tfor (int i = 0; i < {n}; i++) for (int j = 0; j < {d}; j++) soa[j * {n} + i] = (float)rows[i][j];\n"
+        source += f"\ttree_batch(soa, {n}, out);\n\tfor (int i = 0; i < {n}; i++) printf(\"%d\\n\", out[i]);\n"
+    else:
+        source += f"\tfor (int i = 0; i < {n}; i++) {{\n"
+        if style == 'if_else':
+            source += f"\t\tstd::vector<double> x(rows[i], rows[i] + {d});\n"
+        else:
+            source += f"\t\tfloat x[{d}];\n\t\tfor (int j = 0; j < {d}; j++) x[j] = (float)rows[i][j];\n"
+        source += "\t\tprintf(\"%d\\n\", tree(x));\n\t}\n"
+    source += "\treturn 0;\n}\n"
+    return np.array(cxx(source, headers=[header]).split(), dtype=np.int64)
+
+
+@pytest.mark.parametrize('style, batch, profiled, array', [
+    ('if_else', False, False, False), ('if_else', False, True, False), ('table', False, False, False),
+    ('table', False, True, False), ('table', True, False, False), ('if_else', True, False, False),
+    ('if_else', False, True, True),
+])
+def test_export_compiles_and_predicts_like_sklearn(cxx, tmp_path, monkeypatch, tree_and_rows, style, batch, profiled,
+                                                   array):
+    tree, rows = tree_and_rows
+    export_dir = tmp_path / "export"
+    export_dir.mkdir()
+    monkeypatch.chdir(export_dir)
+    visit_counts = node_visit_counts(tree.tree_, tree.apply(rows)) if profiled else None
+    tree_to_cpp.save_code(tree, ["a", "b", "c", "d"], ["0", "1", "2"], "tree", style=style, visit_counts=visit_counts,
+                          batch=batch, array=array)
+
+    np.testing.assert_array_equal(_predict(cxx, export_dir / "tree.h", style, batch, rows), tree.predict(rows))
+    if array:
+        assert "inline int tree_array(const double * features)" in (export_dir / "tree.h").read_text()
+
+
+def test_float_literals_are_valid_cpp():
+    assert tree_to_cpp._float_literal(12) == "12.0f"
+    assert tree_to_cpp._float_literal(1e30) == "1e+30f"
+    for t in (0.1, -3.3, 2.5e-8, 123456.789):
+        literal = tree_to_cpp._float_literal(tree_to_cpp._float_threshold(t))
+        assert np.float32(literal[:-1]) <= t
+
+
+def test_profile_counts_and_hot_first_layout(tree_and_rows):
+    tree, rows = tree_and_rows
+    tree_ = tree.tree_
+    path = tree.decision_path(rows).toarray()
+    visit_counts = node_visit_counts(tree_, tree.apply(rows))
+    np.testing.assert_array_equal(visit_counts, path.sum(axis=0))
+
+    # One comparison per internal node on the path of every row
+    internal = tree_.children_left != -1
+    assert tree_to_cpp.average_comparisons(tree, visit_counts) == pytest.approx(path[:, internal].sum(axis=1).mean())
+
+    # Every internal node, each followed by its hottest child when that child is internal
+    order = tree_to_cpp._hot_first_order(tree_, np.flatnonzero(internal), visit_counts)
+    assert order[0] == 0 and sorted(order) == list(np.flatnonzero(internal))
+    for node, following in zip(order[:-1], order[1:]):
+        children = [tree_.children_left[node], tree_.children_right[node]]
+        hot = max(children, key=lambda c: (visit_counts[c], c == children[0]))
+        if internal[hot]:
+            assert following == hot
+
+
+@pytest.mark.parametrize('style', ['if_else', 'table'])
+def test_simplified_export_compiles_and_predicts_like_sklearn(cxx, tmp_path, monkeypatch, tree_and_rows, style):
+    tree, rows = tree_and_rows
+    simplified = ArrayTreeClassifier.simplified(tree)
+    export_dir = tmp_path / "export"
+    export_dir.mkdir()
+    monkeypatch.chdir(export_dir)
+    tree_to_cpp.save_code(simplified, ["a", "b", "c", "d"], ["0", "1", "2"], "tree", style=style)
+
+    np.testing.assert_array_equal(_predict(cxx, export_dir / "tree.h", style, False, rows), tree.predict(rows))
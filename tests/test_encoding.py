@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.encoding import encode_column, get_mappings_code
+
+
+def _baseline_codes(values):
+    """The original row-by-row first-seen encoding."""
+    mapping = {}
+    codes = []
+    for val in values.astype(str):
+        if val not in mapping:
+            mapping[val] = len(mapping)
+        codes.append(mapping[val])
+    return codes, list(mapping)
+
+
+def test_encoding_matches_row_by_row_loop():
+    rng = np.random.RandomState(0)
+    values = pd.Series(rng.choice(['I', 'B', 'P', None], 500), dtype=object)
+    codes, categories = encode_column(values)
+    expected_codes, expected_categories = _baseline_codes(values)
+    assert list(codes) == expected_codes
+    # Missing values are persisted as the string 'nan'
+    assert categories == [str(c) for c in expected_categories]
+
+
+def test_known_categories_keep_their_codes():
+    codes, categories = encode_column(pd.Series(['P', 'X', 'I', 'X']), ['I', 'B', 'P'])
+    assert list(codes) == [2, 3, 0, 3]
+    assert categories == ['I', 'B', 'P', 'X']
+
+
+def test_mappings_header_encodes_like_python(cxx, tmp_path):
+    mappings = {'SliceType': ['I', 'B', 'P'], 'Encoder Preset': ['slow', 'fast "x"']}
+    header = tmp_path / "mappings" / "category_mappings.h"
+    header.parent.mkdir()
+    header.write_text(get_mappings_code(mappings))
+
+    source = '#include <cstdio>\n#include "category_mappings.h"\nint main() {\n'
+    calls = [('SliceType', 'I'), ('SliceType', 'P'), ('SliceType', 'Q'), ('Encoder_Preset', 'fast "x"')]
+    for name, value in calls:
+        source += f'\tprintf("%d\\n", encode_{name}({json.dumps(value)}));\n'
+    source += '\treturn 0;\n}\n'
+    assert cxx(source, headers=[header]).split() == ['0', '2', '-1', '1']
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_selection import RFECV
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import cross_val_score
+
+from config.settings import ExperimentConfig
+from src.feature_selection import run_fast_rfe, run_rfe
+
+
+@pytest.fixture
+def rfe_config(monkeypatch):
+    monkeypatch.setattr(ExperimentConfig, 'RFE_ENABLED', True, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'RFE_MIN_FEATURES', 2, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'RFE_STEP', 1, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'CV_FOLDS', 3, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'N_JOBS', 1, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'SCORING', 'accuracy', raising=False)
+    return monkeypatch
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame(rng.randn(3000, 12), columns=[f"f{j}" for j in range(12)])
+    # 4 informative features, 8 of noise
+    y = (X['f1'] - 2 * X['f4'] + X['f7'] + 0.5 * X['f9'] + 0.5 * rng.randn(len(X)) > 0).astype(int)
+    return X, y.to_numpy()
+
+
+def _cv_accuracy(X, y, features):
+    return cross_val_score(LogisticRegression(max_iter=10000), X[features], y, cv=3, scoring='accuracy').mean()
+
+
+def test_fast_rfe_matches_rfecv_selection_quality(rfe_config, data):
+    X, y = data
+    fast = run_fast_rfe(X, y, 'logistic_regression')
+    assert {'f1', 'f4', 'f7', 'f9'} <= set(fast)
+
+    # Baseline: exact RFECV
+    rfecv = RFECV(LogisticRegression(max_iter=10000), step=1, cv=3, scoring='accuracy', min_features_to_select=2).fit(X, y)
+    exact = X.columns[rfecv.support_].tolist()
+    assert _cv_accuracy(X, y, fast) >= _cv_accuracy(X, y, exact) - 0.005
+
+
+def test_engine_selection(rfe_config, data):
+    X, y = data
+    rfe_config.setattr(ExperimentConfig, 'RFE_ENGINE', 'fast', raising=False)
+    assert run_rfe(X, y, 'logistic_regression') == run_fast_rfe(X, y, 'logistic_regression')
+
+    rfe_config.setattr(ExperimentConfig, 'RFE_ENGINE', 'exhaustive', raising=False)
+    with pytest.raises(ValueError, match="Unknown RFE engine"):
+        run_rfe(X, y, 'logistic_regression')
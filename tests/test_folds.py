@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import check_cv
+
+import src.folds as folds
+from config.settings import ExperimentConfig
+from src.feature_selection import run_rfe
+from src.training import tune_hyperparameters
+
+
+@pytest.fixture
+def plan_config(monkeypatch, tmp_path):
+    monkeypatch.setattr(folds, '_FOLDS_DIR', tmp_path / "folds")
+    monkeypatch.setattr(folds, '_WRITE_CHUNK_ROWS', 700)
+    monkeypatch.setattr(ExperimentConfig, 'CV_FOLDS', 3, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'N_JOBS', 1, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'SCORING', 'accuracy', raising=False)
+    return monkeypatch
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame(rng.randn(2000, 6), columns=[f"f{j}" for j in range(6)])
+    y = np.where(X['f0'] - X['f2'] * X['f3'] + 0.5 * rng.randn(len(X)) > 0, 3, 1)
+    return X, y
+
+
+def test_plan_matches_cv_folds_and_frame(plan_config, data):
+    X, y = data
+    plan = folds.build_fold_plan(X, y)
+
+    # Same folds as cv=CV_FOLDS in the sklearn searches
+    for (train, val), (train_cv, val_cv) in zip(plan.folds, check_cv(3, y, classifier=True).split(X, y), strict=True):
+        np.testing.assert_array_equal(train, train_cv)
+        np.testing.assert_array_equal(val, val_cv)
+
+    # Chunked float32 memmap, read-only
+    np.testing.assert_array_equal(plan.matrix(), X.to_numpy(dtype=np.float32))
+    assert isinstance(plan.X, np.memmap) and not plan.X.flags.writeable
+
+    subset = plan.matrix(['f3', 'f1'])
+    np.testing.assert_array_equal(subset, X[['f3', 'f1']].to_numpy(dtype=np.float32))
+    assert plan.matrix(['f3', 'f1']) is subset
+
+    plan.release()
+    assert not os.path.exists(plan.directory)
+
+
+def test_stages_give_the_same_results_with_a_plan(plan_config, data):
+    X, y = data
+    plan_config.setattr(ExperimentConfig, 'RFE_ENABLED', True, raising=False)
+    plan_config.setattr(ExperimentConfig, 'RFE_ENGINE', 'rfecv', raising=False)
+    plan_config.setattr(ExperimentConfig, 'RFE_STEP', 1, raising=False)
+    plan_config.setattr(ExperimentConfig, 'RFE_MIN_FEATURES', 2, raising=False)
+    plan_config.setattr(ExperimentConfig, 'SEARCH_ENGINE', 'random', raising=False)
+    plan_config.setattr(ExperimentConfig, 'RANDOM_SEARCH_ITER', 5, raising=False)
+
+    plan = folds.build_fold_plan(X, y)
+    try:
+        # Trees work on float32 anyway: the plan changes nothing
+        selected = run_rfe(X, y, 'decision_tree', plan)
+        assert selected == run_rfe(X, y, 'decision_tree')
+        assert tune_hyperparameters(X[selected], y, 'decision_tree', plan) == tune_hyperparameters(X[selected], y, 'decision_tree')
+    finally:
+        plan.release()
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.grouping import (GROUPING_STRATEGIES, GROUPING_VECTORIZED, apply_grouping_strategy,
+                          build_group_partition, align_group_partition, mask_group_partition)
+
+
+@pytest.fixture
+def blocks():
+    rng = np.random.RandomState(0)
+    sizes = [4, 8, 16, 32, 64, 128]
+    return pd.DataFrame({
+        'Width': rng.choice(sizes, 500),
+        'Height': rng.choice(sizes, 500),
+        'FrameLevel': rng.randint(0, 5, 500),
+        'feat': rng.randn(500),
+    })
+
+
+@pytest.mark.parametrize('name', sorted(GROUPING_STRATEGIES))
+def test_vectorized_labels_match_row_functions(blocks, name):
+    keys = blocks[['Width', 'Height', 'FrameLevel']]
+    expected = [GROUPING_STRATEGIES[name](row) for _, row in keys.iterrows()]
+    labels = GROUPING_VECTORIZED[name](blocks).astype(object)
+    for row, (want, got) in enumerate(zip(expected, labels)):
+        if want is None:
+            assert pd.isna(got), row
+        else:
+            assert str(got) == str(want), row
+
+
+def test_all_groups_drop_missing_sizes(blocks):
+    blocks = blocks.astype({'Width': float})
+    blocks.loc[[3, 7], 'Width'] = np.nan
+    labels = GROUPING_VECTORIZED['all'](blocks)
+    assert labels.isna().sum() == 2 and labels[[3, 7]].isna().all()
+
+    df_out, groups = apply_grouping_strategy(blocks, 'all')
+    assert len(df_out) == len(blocks) - 2
+    assert not any('nan' in g for g in groups)
+
+
+def test_apply_grouping_strategy_leaves_caller_frame_untouched(blocks):
+    columns = list(blocks.columns)
+    df_out, _ = apply_grouping_strategy(blocks, 'orientation')
+    assert list(blocks.columns) == columns
+    assert 'BlockGroup' in df_out
+
+
+def test_partition_serves_the_rows_of_each_group(blocks):
+    df_out, groups = apply_grouping_strategy(blocks, 'max')
+    partition = build_group_partition(df_out['BlockGroup'])
+    for group in groups:
+        np.testing.assert_array_equal(partition[group], np.flatnonzero(df_out['BlockGroup'] == group))
+
+    subset = df_out[df_out['feat'] > 0]
+    aligned = align_group_partition(partition, df_out.index, subset)
+    masked = mask_group_partition(partition, (df_out['feat'] > 0).to_numpy())
+    for group in groups:
+        np.testing.assert_array_equal(subset.index[aligned[group]], df_out.index[masked[group]])
+
+
+def test_partition_takes_match_boolean_filtering(blocks):
+    # Non-default index, as left by the data cleaning (dropped rows)
+    blocks = blocks.iloc[::2]
+    df_out, groups = apply_grouping_strategy(blocks, 'area')
+    partition = build_group_partition(df_out['BlockGroup'])
+    for group in groups:
+        pd.testing.assert_frame_equal(df_out.take(partition[group]), df_out[df_out['BlockGroup'] == group])
+
+    # A strategy that filters rows: the aligned partition serves the same rows as filtering its frame
+    filtered = df_out[df_out['FrameLevel'] > 1]
+    aligned = align_group_partition(partition, df_out.index, filtered)
+    for group in groups:
+        pd.testing.assert_frame_equal(filtered.take(aligned[group]), filtered[filtered['BlockGroup'] == group])
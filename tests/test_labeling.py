@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.labeling import apply_label_spec
+
+
+def _apply(df, spec):
+    mask, labels = apply_label_spec(df['target'], spec)
+    out = df if mask is None else df[mask]
+    if labels is not None:
+        out = out.assign(target=labels if mask is None else labels[mask])
+    return out
+
+
+# Baseline row-wise process functions and the label specs that replace them
+BASELINES = [
+    (lambda df: df.assign(target=df['target'].apply(lambda x: 10 if x in [0, 1] else 20)),
+     {'map': {0: 10, 1: 10}, 'default': 20}),
+    (lambda df: df[~df['target'].isin([0, 1])].assign(target=lambda d: d['target'].apply(lambda x: 10 if x == 2 else 20)),
+     {'drop': [0, 1], 'map': {2: 10}, 'default': 20}),
+    (lambda df: df[df['target'].isin([2, 3])], {'keep': [2, 3]}),
+    (lambda df: df.copy(), {}),
+]
+
+
+@pytest.mark.parametrize('baseline, spec', BASELINES)
+def test_label_spec_matches_process_function(baseline, spec):
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({'target': rng.randint(0, 5, 300), 'feat': rng.randn(300)})
+    pd.testing.assert_frame_equal(_apply(df, spec), baseline(df), check_dtype=False)
+
+
+def test_label_spec_rejects_unknown_keys():
+    with pytest.raises(ValueError):
+        apply_label_spec(pd.Series([0, 1]), {'kep': [0]})
@@ -0,0 +1,147 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+import src.LogisticRegToCpp as lr_to_cpp
+
+FEATURES = ["a", "b", "c", "d"]
+
+
+@pytest.fixture
+def fitted():
+    """Model fitted on standardized features, its preprocessing and raw rows (with NaNs)."""
+    rng = np.random.RandomState(0)
+    # 'd' lives on a huge scale: its folded weight is tiny, its standardized one is not
+    raw = pd.DataFrame(rng.randn(3000, 4) * [1.0, 20.0, 0.01, 1e12] + [3.0, -50.0, 0.5, 4e12], columns=FEATURES)
+    y = ((raw['a'] - 3) + (raw['b'] + 50) / 20 - (raw['d'] - 4e12) / 1e12 + rng.randn(len(raw)) > 0).astype(int)
+
+    preprocessing = {'impute_values': raw.median(), 'means': raw.mean(), 'scales': raw.std(ddof=0)}
+    model = LogisticRegression(max_iter=10000).fit((raw - preprocessing['means']) / preprocessing['scales'], y)
+
+    rows = raw.iloc[:100].to_numpy().copy()
+    rows[::7, 1] = np.nan
+    return model, preprocessing, rows
+
+
+def _reference(model, preprocessing, rows):
+    filled = np.where(np.isnan(rows), preprocessing['impute_values'][FEATURES].to_numpy(), rows)
+    scaled = (filled - preprocessing['means'][FEATURES].to_numpy()) / preprocessing['scales'][FEATURES].to_numpy()
+    return pd.DataFrame(scaled, columns=FEATURES)
+
+
+def _run(cxx, tmp_path, rows, call, fmt):
+    n, d = rows.shape
+    values = ", ".join("{ " + ", ".join("NAN" if np.isnan(v) else repr(float(v)) for v in row) + " }" for row in rows)
+    source = f'#include <cstdio>\n#include <cmath>\n#include <vector>\n#include "model.h"\n'
+    source += f"static const double rows[{n}][{d}] = {{ {values} }};\n"
+    source += f"int main() {{\n\tfor (int i = 0; i < {n}; i++) {{\n"
+    source += f"\t\tconst std::vector<double> x(rows[i], rows[i] + {d});\n"
+    source += f"\t\tprintf(\"{fmt}\\n\", {call});\n\t}}\n\treturn 0;\n}}\n"
+    return np.array(cxx(source, headers=[tmp_path / "export" / "model.h"]).split(), dtype=np.float64)
+
+
+def _save(tmp_path, model, preprocessing, **kwargs):
+    export_dir = tmp_path / "export"
+    export_dir.mkdir(exist_ok=True)
+    lr_to_cpp.save_code(model, FEATURES, ["0", "1"], "model", str(export_dir), preprocessing=preprocessing, **kwargs)
+    return (export_dir / "model.h").read_text()
+
+
+def test_probability_export_matches_sklearn(cxx, tmp_path, fitted):
+    model, preprocessing, rows = fitted
+    header = _save(tmp_path, model, preprocessing)
+    assert "// d" in header  # tiny folded weight, significant standardized one
+
+    probabilities = _run(cxx, tmp_path, rows, "model(x)", "%.17g")
+    np.testing.assert_allclose(probabilities, model.predict_proba(_reference(model, preprocessing, rows))[:, 1],
+                               rtol=1e-9, atol=1e-12)
+
+
+def test_threshold_export_matches_sklearn(cxx, tmp_path, fitted):
+    model, preprocessing, rows = fitted
+    _save(tmp_path, model, preprocessing, threshold=0.3)
+
+    decisions = _run(cxx, tmp_path, rows, "(int)model(x)", "%d")
+    expected = model.decision_function(_reference(model, preprocessing, rows)) > lr_to_cpp.logit(0.3)
+    np.testing.assert_array_equal(decisions.astype(bool), expected)
+
+
+def test_literals_round_trip():
+    for value in (0.0, 3.0, -1.0 / 3.0, 1e-300, 123456789.123456789, math.pi):
+        literal = lr_to_cpp._double_literal(value)
+        assert float(literal) == value and ("." in literal or "e" in literal)
+
+
+@pytest.fixture
+def fixed_point_case():
+    """Weights over 8 orders of magnitude, inputs on a 12-bit fixed-point grid."""
+    rng = np.random.RandomState(1)
+    raw = pd.DataFrame(rng.randn(2000, 4) * [1.0, 1000.0, 0.05, 50.0] + [0.0, 200.0, 0.0, 0.0], columns=FEATURES)
+    y = (raw['a'] + raw['b'] / 1000 + raw['c'] * 20 + rng.randn(len(raw)) > 0.2).astype(int)
+    preprocessing = {'means': raw.mean(), 'scales': raw.std(ddof=0)}
+    X = (raw - preprocessing['means']) / preprocessing['scales']
+    return LogisticRegression(max_iter=10000).fit(X, y), preprocessing, X, raw.to_numpy()
+
+
+def test_small_weights_keep_their_precision():
+    weights, shifts, _, frac_bits = lr_to_cpp.quantize_weights(np.array([5.0, -1e-6, 0.0, 3e-12]), 0.25, 16)
+    assert frac_bits == 16 and weights[2] == 0
+    assert np.all(np.abs(weights) < 2**31) and np.all(weights[[0, 1, 3]] != 0)
+    np.testing.assert_allclose(np.ldexp(weights.astype(np.float64), -(frac_bits + shifts))[[0, 1, 3]],
+                               [5.0, -1e-6, 3e-12], rtol=1e-8)
+
+
+@pytest.mark.parametrize('input_bits', [12, 24])
+def test_fixed_point_export_matches_replay(cxx, tmp_path, fixed_point_case, input_bits):
+    model, preprocessing, X, raw = fixed_point_case
+    _save(tmp_path, model, preprocessing, threshold=0.5, frac_bits=16, input_bits=input_bits)
+
+    # The C++ caller converts the raw features to saturated int32 (24 bits: b overflows)
+    n, d = raw.shape
+    scaled = ", ".join(repr(float(v)) for v in np.ldexp(raw, input_bits).ravel())
+    source = '#include <cstdio>\n#include <cmath>\n#include <vector>\n#include <cstdint>\n#include "model.h"\n'
+    source += f"static const double rows[{n * d}] = {{ {scaled} }};\n"
+    source += "static int32_t saturate(double v) { v = std::nearbyint(v); "
+    source += "return v >= 2147483647.0 ? INT32_MAX : v <= -2147483648.0 ? INT32_MIN : (int32_t)v; }\n"
+    source += f"int main() {{\n\tfor (int i = 0; i < {n}; i++) {{\n\t\tstd::vector<int32_t> x({d});\n"
+    source += f"\t\tfor (int j = 0; j < {d}; j++) x[j] = saturate(rows[i * {d} + j]);\n"
+    source += "\t\tprintf(\"%d\\n\", (int)model_fixed(x));\n\t}\n\treturn 0;\n}\n"
+    fixed = np.array(cxx(source, headers=[tmp_path / "export" / "model.h"]).split(), dtype=np.int64).astype(bool)
+
+    float_decision = model.decision_function(X) > 0
+    mismatch = lr_to_cpp.fixed_point_mismatch(model, X, FEATURES, preprocessing, 0.5, 16, input_bits)
+    assert np.mean(fixed != float_decision) == pytest.approx(mismatch, abs=0)
+    if input_bits == 12:
+        assert mismatch < 0.005
+
+
+@pytest.mark.parametrize('threshold', [None, 0.5])
+def test_batch_export_matches_sklearn(cxx, tmp_path, threshold):
+    rng = np.random.RandomState(2)
+    raw = pd.DataFrame(rng.randn(500, 4) * [1.0, 3.0, 0.5, 2.0], columns=FEATURES)
+    y = (raw['a'] - raw['b'] / 3 + rng.randn(len(raw)) > 0).astype(int)
+    # A whole-number intercept: '{:.9g}f' used to print it as the invalid literal '0f' / '8f'
+    model = LogisticRegression(fit_intercept=False, max_iter=10000).fit(raw, y)
+    header = _save(tmp_path, model, None, threshold=threshold, batch=True)
+    assert "score[i] = 0.0f;" in header
+
+    n, d = raw.shape
+    soa = ", ".join(repr(float(v)) for v in raw.to_numpy().T.ravel())
+    out_type, fmt = ("float", "%.9g") if threshold is None else ("uint8_t", "%d")
+    source = '#include <cstdio>\n#include <cmath>\n#include <vector>\n#include <cstdint>\n#include "model.h"\n'
+    source += f"static const float features[{n * d}] = {{ {soa} }};\n"
+    source += f"int main() {{\n\tstatic {out_type} out[{n}];\n\tmodel_batch(features, {n}, out);\n"
+    source += f"\tfor (int i = 0; i < {n}; i++) printf(\"{fmt}\\n\", (double)out[i]);\n\treturn 0;\n}}\n"
+    if threshold is not None:
+        source = source.replace("(double)out[i]", "(int)out[i]")
+    result = np.array(cxx(source, headers=[tmp_path / "export" / "model.h"]).split(), dtype=np.float64)
+
+    scores = model.decision_function(raw)
+    if threshold is None:
+        np.testing.assert_allclose(result, model.predict_proba(raw)[:, 1], atol=1e-5)
+    else:
+        clear = np.abs(scores) > 1e-4  # float32 accumulation can flip samples on the boundary
+        np.testing.assert_array_equal(result[clear].astype(bool), (scores > 0)[clear])
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+import main
+from config.settings import DataConfig, ExperimentConfig
+
+
+def test_strategies_sharing_an_input_are_grouped(monkeypatch):
+    def process(df):
+        return df
+
+    monkeypatch.setattr(main, 'MODEL_STRATEGIES', {
+        'lr': {'label_spec': {}, 'classifier_type': 'logistic_regression'},
+        'a': {'label_spec': {'map': {0: 10}, 'default': 20}, 'classifier_type': 'decision_tree'},
+        'tree': {'label_spec': {}, 'classifier_type': 'decision_tree'},
+        'custom': {'process_function': process, 'classifier_type': 'decision_tree'},
+        'b': {'label_spec': {'default': 20, 'map': {0: 10}}, 'classifier_type': 'logistic_regression'},
+        'custom_lr': {'process_function': process, 'classifier_type': 'logistic_regression'},
+    })
+    assert list(main.group_strategies_by_input().values()) == [['lr', 'tree'], ['a', 'b'], ['custom', 'custom_lr']]
+
+
+def test_block_group_job_preprocesses_once_per_input(monkeypatch):
+    monkeypatch.setattr(ExperimentConfig, 'STAGE_CACHE_ENABLED', False, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'SHARED_FOLD_PLAN', False, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'TREE_TRAINER', 'exact', raising=False)
+
+    prepared, branch_inputs = [], []
+    monkeypatch.setattr(main, 'prepare_block_data', lambda df: prepared.append(df) or tuple(range(7)))
+    monkeypatch.setattr(main, 'run_classifier_branch',
+                        lambda block_data, fold_plan, split_key, grouping, strategy, model_type, group, binned:
+                        branch_inputs.append((block_data, split_key, strategy, model_type)) or strategy)
+
+    rng = np.random.RandomState(0)
+    df_block = pd.DataFrame({'f0': rng.randn(50), DataConfig.TARGET_COLUMN: rng.randint(0, 2, 50)})
+    results = main.run_block_group_job(df_block, 'area', '8x8', [('lr', 'logistic_regression'), ('tree', 'decision_tree')])
+
+    # One upstream node, fanned out to both classifier branches
+    assert results == ['lr', 'tree'] and len(prepared) == 1
+    assert [(b[2], b[3]) for b in branch_inputs] == [('lr', 'logistic_regression'), ('tree', 'decision_tree')]
+    assert branch_inputs[0][0] is branch_inputs[1][0] and branch_inputs[0][1] == branch_inputs[1][1]
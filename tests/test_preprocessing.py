@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.utils import resample
+
+from config.settings import DataConfig, ExperimentConfig
+from src.preprocessing import (balance_group_data, balance_group_indices, impute_data, normalize_data,
+                               split_and_preprocess_matrix, split_and_sample)
+
+
+def _baseline_balance(df_group):
+    # Previous implementation: tuple key column, resample of every key sub-frame
+    df_group = df_group.copy()
+    df_group['balance_key'] = list(zip(*(df_group[c] for c in DataConfig.BALANCE_COLUMNS)))
+    min_samples = df_group['balance_key'].value_counts().min()
+    balanced_df = pd.concat([
+        resample(g, replace=False, n_samples=min_samples, random_state=ExperimentConfig.RANDOM_STATE)
+        for _, g in df_group.groupby('balance_key')
+    ])
+    return balanced_df.drop(columns=['balance_key'])
+
+
+@pytest.fixture
+def df_group():
+    rng = np.random.RandomState(0)
+    n = 5000
+    df = pd.DataFrame({c: rng.choice([3, 1, 2], n, p=[0.5, 0.3, 0.2]) for c in DataConfig.BALANCE_COLUMNS})
+    df[DataConfig.TARGET_COLUMN] = rng.randint(0, 2, n)
+    df['feature'] = rng.randn(n)
+    return df.set_index(rng.permutation(n) * 10)
+
+
+def test_balanced_rows_match_baseline(df_group):
+    original = df_group.copy()
+    balanced = balance_group_data(df_group)
+    pd.testing.assert_frame_equal(balanced, _baseline_balance(df_group))
+    # The caller's frame is left untouched
+    pd.testing.assert_frame_equal(df_group, original)
+
+
+def test_single_class_keeps_every_row(df_group):
+    df_group[DataConfig.TARGET_COLUMN] = 1
+    assert balance_group_indices(df_group) is None
+    assert balance_group_data(df_group) is df_group
+
+
+@pytest.mark.parametrize('impute', [True, False])
+def test_matrix_mode_matches_frames_mode(monkeypatch, impute):
+    monkeypatch.setattr(ExperimentConfig, 'IMPUTE_MISSING_VALUES', impute, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'NORMALIZE_DATA', True, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'MAX_SAMPLES_PER_CLASS', 300, raising=False)
+
+    rng = np.random.RandomState(0)
+    n = 2000
+    df = pd.DataFrame({'a': rng.randn(n) * 5 + 2, 'b': rng.randint(0, 4, n), 'c': rng.rand(n)})
+    df.loc[rng.rand(n) < 0.1, 'a'] = np.nan
+    df[DataConfig.TARGET_COLUMN] = rng.randint(0, 2, n)
+    df['BlockGroup'] = '8x8'
+
+    frames_params, matrix_params = {}, {}
+    X_train, X_test, y_train, y_test, X_samp, y_samp = split_and_sample(df)
+    X_train, X_test, X_samp = impute_data(X_train, X_test, X_samp, frames_params)
+    frames = normalize_data(X_train, X_test, X_samp, frames_params) + (y_train, y_test, y_samp)
+    matrix = split_and_preprocess_matrix(df, matrix_params)
+    matrix = (matrix[0], matrix[1], matrix[4], matrix[2], matrix[3], matrix[5])
+
+    # Same rows and values; only the train rows come in another order (sample first)
+    for expected, actual in zip(frames, matrix):
+        actual = actual.loc[expected.index]
+        if isinstance(expected, pd.DataFrame):
+            np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-5, atol=1e-5)
+        else:
+            np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy())
+    pd.testing.assert_index_equal(matrix[1].index, frames[1].index)
+    pd.testing.assert_index_equal(matrix[2].index, frames[2].index)
+
+    assert frames_params.keys() == matrix_params.keys()
+    for key in frames_params:
+        pd.testing.assert_series_equal(matrix_params[key], frames_params[key], check_dtype=False, rtol=1e-6)
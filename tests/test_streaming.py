@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+import src.training as training
+from config.settings import DataConfig, ExperimentConfig
+from src import cache
+from src.preprocessing import impute_data, normalize_data, split_and_sample
+from src.streaming import iter_batches, parquet_batches, train_streaming_logistic
+from src.training import train_final_model
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame(rng.randn(4000, 5) * [1, 10, 0.1, 3, 1] + [0, 5, 0, -2, 1], columns=list('abcde'))
+    logits = X['a'] - 0.2 * X['b'] + 8 * X['c'] + 0.5 * X['d']
+    y = np.where(logits + 0.5 * rng.randn(len(X)) > 0, 20, 10)
+    return X, y
+
+
+def test_batches_cover_every_row_in_order(data):
+    X, y = data
+    batches = list(iter_batches(X, y, 1500))
+    assert [len(b) for _, b in batches] == [1500, 1500, 1000]
+    np.testing.assert_array_equal(np.vstack([b for b, _ in batches]), X.to_numpy())
+    np.testing.assert_array_equal(np.concatenate([b for _, b in batches]), y)
+
+
+def test_streaming_matches_lbfgs_decisions(data):
+    X, y = data
+    model = train_streaming_logistic(lambda: iter_batches(X, y, 500), {'C': 1.0, 'random_state': 0})
+
+    # Integer labels keep their dtype (no float classes from an empty accumulator)
+    assert model.classes_.dtype == y.dtype
+    np.testing.assert_array_equal(model.classes_, [10, 20])
+
+    baseline = LogisticRegression(C=1.0, max_iter=10000).fit(X, y)
+    agreement = np.mean(model.predict(X.to_numpy()) == baseline.predict(X))
+    assert agreement > 0.97
+
+
+@pytest.fixture
+def cached_source(tmp_path, monkeypatch, data):
+    X, y = data
+    source = tmp_path / "data.csv"
+    source.write_text("cached\n")
+    monkeypatch.setattr(cache, '_DATA_CACHE_DIR', tmp_path / "cache")
+    monkeypatch.setattr(DataConfig, 'FILE_PATH', source)
+    monkeypatch.setattr(DataConfig, 'TARGET_COLUMN', 'target')
+    monkeypatch.setattr(DataConfig, 'CATEGORY_MAPPINGS_FILE', None, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'IMPUTE_MISSING_VALUES', True, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'MAX_SAMPLES_PER_CLASS', 1000, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'LR_TRAINER', 'streaming', raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'STREAMING_BATCH_SIZE', 700, raising=False)
+
+    df = X.assign(target=y)
+    df.loc[df.index[::37], 'b'] = np.nan
+    return source, df
+
+
+def _train_split(df):
+    # Block group rows (every other row), split and preprocessed like the pipeline
+    preprocessing = {}
+    X_train, X_test, y_train, y_test, X_samp, y_samp = split_and_sample(df.iloc[::2])
+    X_train, X_test, X_samp = impute_data(X_train, X_test, X_samp, preprocessing)
+    X_train, X_test, X_samp = normalize_data(X_train, X_test, X_samp, preprocessing)
+    return X_train, y_train, preprocessing
+
+
+@pytest.mark.parametrize('index', ['range', 'labels'])
+def test_disk_batches_match_the_in_memory_train_split(cached_source, index):
+    source, df = cached_source
+    if index == 'labels':
+        df.index = df.index * 3 + 7
+    cache.save_cached_frame(source, df)
+    X_train, y_train, preprocessing = _train_split(df)
+
+    batches = parquet_batches(cache.cached_frame_path(source), list(X_train.columns), y_train, 700, preprocessing)
+    X_disk, y_disk = (np.concatenate(parts) for parts in zip(*batches()))
+
+    # Train rows in file order, preprocessed per batch
+    in_file_order = df.index[df.index.isin(X_train.index)]
+    np.testing.assert_allclose(X_disk, X_train.loc[in_file_order].to_numpy(), rtol=1e-12, atol=1e-12)
+    np.testing.assert_array_equal(y_disk, y_train.loc[in_file_order].to_numpy())
+
+
+def test_streaming_trainer_reads_the_cache_like_the_in_memory_split(cached_source, monkeypatch):
+    source, df = cached_source
+    cache.save_cached_frame(source, df)
+    X_train, y_train, preprocessing = _train_split(df)
+
+    read = []
+    monkeypatch.setattr(training, 'parquet_batches', lambda *args: read.append(args) or parquet_batches(*args))
+    model = train_final_model(X_train, y_train, 'logistic_regression', {'C': 1.0}, preprocessing)
+    assert read
+
+    # Baseline: the in-memory train split, cut at the same record batches of the file
+    in_train = df.index.isin(X_train.index)
+    file_batch = (np.arange(len(df)) // 700)[in_train]
+    rows = df.index[in_train]
+
+    def in_memory_batches():
+        for b in np.unique(file_batch):
+            batch_rows = rows[file_batch == b]
+            yield X_train.loc[batch_rows].to_numpy(), y_train.loc[batch_rows].to_numpy()
+
+    in_memory = train_streaming_logistic(in_memory_batches, {'C': 1.0, 'random_state': ExperimentConfig.RANDOM_STATE})
+    np.testing.assert_allclose(model.coef_, in_memory.coef_, rtol=1e-9)
+    np.testing.assert_allclose(model.intercept_, in_memory.intercept_, rtol=1e-9, atol=1e-12)
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, StratifiedKFold
+from sklearn.tree import DecisionTreeClassifier
+
+from config.settings import ExperimentConfig
+from config.model_hyperparameters import BASE_MODELS, SEARCH_SPACES
+from src.training import _score_regularization_path, tune_hyperparameters
+from src.tree_utils import ccp_candidate_alphas, ccp_resolved_nodes
+
+
+@pytest.fixture
+def search_config(monkeypatch):
+    monkeypatch.setattr(ExperimentConfig, 'RANDOM_SEARCH_ITER', 12, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'CV_FOLDS', 3, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'N_JOBS', 1, raising=False)
+    monkeypatch.setattr(ExperimentConfig, 'SCORING', 'accuracy', raising=False)
+    return monkeypatch
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame(rng.randn(3000, 6), columns=[f"f{j}" for j in range(6)])
+    y = ((X['f0'] + 0.5 * X['f1'] - X['f2'] * X['f3'] + 0.5 * rng.randn(len(X))) > 0).astype(int)
+    return X, y.to_numpy()
+
+
+def test_halving_picks_a_random_search_candidate(search_config, data):
+    X, y = data
+    search_config.setattr(ExperimentConfig, 'SEARCH_ENGINE', 'halving', raising=False)
+    best = tune_hyperparameters(X, y, 'decision_tree')
+
+    # Baseline: the same candidates, every one of them fitted on the full data
+    model_conf = BASE_MODELS['decision_tree']
+    baseline = RandomizedSearchCV(model_conf['estimator'](**model_conf['params']), SEARCH_SPACES['decision_tree'],
+                                  n_iter=ExperimentConfig.RANDOM_SEARCH_ITER, cv=ExperimentConfig.CV_FOLDS,
+                                  scoring='accuracy', random_state=ExperimentConfig.RANDOM_STATE).fit(X, y)
+    candidates = baseline.cv_results_['params']
+    assert best in candidates
+
+    # The survivor is (close to) the best candidate on the full data
+    score = baseline.cv_results_['mean_test_score'][candidates.index(best)]
+    assert score >= baseline.best_score_ - 0.02
+
+
+def test_pruned_predictions_match_refits_with_ccp_alpha(data):
+    X, y = data
+    X = X.to_numpy(dtype=np.float32)
+    full = DecisionTreeClassifier(min_samples_leaf=5, random_state=0).fit(X, y)
+    alphas = ccp_candidate_alphas(full.tree_, max_candidates=15)
+
+    resolved = ccp_resolved_nodes(full.tree_, alphas)
+    node_class = full.classes_[full.tree_.value[:, 0, :].argmax(axis=1)]
+    preds = node_class[resolved[full.apply(X)]]
+
+    # Baseline: one refit per alpha
+    for i, alpha in enumerate(alphas):
+        refit = DecisionTreeClassifier(min_samples_leaf=5, random_state=0, ccp_alpha=alpha).fit(X, y)
+        np.testing.assert_array_equal(preds[:, i], refit.predict(X))
+
+
+def test_path_search_matches_grid_search_over_ccp_alpha(search_config, data):
+    X, y = data
+    search_config.setattr(ExperimentConfig, 'SEARCH_ENGINE', 'path', raising=False)
+    search_config.setattr(ExperimentConfig, 'CCP_ALPHA_CANDIDATES', 20, raising=False)
+    search_config.setitem(SEARCH_SPACES, 'decision_tree', {'criterion': ['gini'], 'min_samples_leaf': [10, 20]})
+    best = tune_hyperparameters(X, y, 'decision_tree')
+    assert best['criterion'] == 'gini' and best['min_samples_leaf'] == 10
+
+    # Baseline: the same alphas, every one refitted on every fold
+    X32 = X.to_numpy(dtype=np.float32)
+    grow = DecisionTreeClassifier(criterion='gini', min_samples_leaf=10, random_state=ExperimentConfig.RANDOM_STATE)
+    alphas = ccp_candidate_alphas(clone(grow).fit(X32, y).tree_, 20)
+    grid = GridSearchCV(grow, {'ccp_alpha': list(alphas)}, cv=StratifiedKFold(ExperimentConfig.CV_FOLDS),
+                        scoring='accuracy').fit(X32, y)
+    scores = grid.cv_results_['mean_test_score']
+    # Ties go to the larger alpha
+    expected = alphas[len(alphas) - 1 - np.argmax(scores[::-1])]
+    assert best['ccp_alpha'] == pytest.approx(expected)
+
+
+def test_warm_started_path_matches_cold_fits_per_c(data):
+    X, y = data
+    X = X.to_numpy()
+    train_idx, val_idx = next(StratifiedKFold(3).split(X, y))
+    Cs = [0.001, 0.01, 0.1, 1, 10]
+    scores = _score_regularization_path(LogisticRegression(max_iter=1000), Cs, X, y, train_idx, val_idx, accuracy_score)
+
+    # Baseline: one cold fit per C
+    for C, score in zip(Cs, scores):
+        cold = LogisticRegression(C=C, max_iter=1000).fit(X[train_idx], y[train_idx])
+        assert score == pytest.approx(accuracy_score(y[val_idx], cold.predict(X[val_idx])), abs=1e-3)
+
+
+def test_path_search_matches_grid_search_over_c(search_config, data):
+    X, y = data
+    search_config.setattr(ExperimentConfig, 'SEARCH_ENGINE', 'path', raising=False)
+    space = {'solver': ['lbfgs'], 'C': [0.001, 0.003, 0.01, 0.1, 1]}
+    search_config.setitem(SEARCH_SPACES, 'logistic_regression', space)
+    best = tune_hyperparameters(X, y, 'logistic_regression')
+
+    model_conf = BASE_MODELS['logistic_regression']
+    grid = GridSearchCV(model_conf['estimator'](**model_conf['params']), space,
+                        cv=ExperimentConfig.CV_FOLDS, scoring='accuracy').fit(X.to_numpy(), y)
+    assert best == grid.best_params_
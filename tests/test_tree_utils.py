@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from src.tree_utils import TREE_LEAF, ArrayTreeClassifier, TreeArrays, simplify_tree, tree_stats
+
+
+@pytest.fixture
+def tree():
+    rng = np.random.RandomState(0)
+    X = rng.randint(0, 20, size=(3000, 4)).astype(float)
+    y = (X[:, 0] > 8).astype(int) + 2 * ((X[:, 1] > 14) & (rng.rand(len(X)) > 0.3))
+    # Leaves of a deep tree often agree with their sibling
+    return DecisionTreeClassifier(min_samples_leaf=3, random_state=0).fit(X, y)
+
+
+def test_simplified_tree_predicts_the_same_with_fewer_nodes(tree):
+    simplified = ArrayTreeClassifier.simplified(tree)
+    assert simplified.tree_.node_count < tree.tree_.node_count
+    assert tree_stats(simplified.tree_)['max_depth'] <= tree.get_depth()
+
+    # Every input, inside and outside the training range
+    X = np.random.RandomState(1).uniform(-5, 25, size=(20000, 4))
+    np.testing.assert_array_equal(simplified.predict(X), tree.predict(X))
+
+    # Children keep larger ids than their parent
+    internal = simplified.tree_.children_left != TREE_LEAF
+    assert (simplified.tree_.children_left[internal] > np.flatnonzero(internal)).all()
+
+
+def test_unreachable_branch_is_bypassed():
+    # x0 <= 5 -> (x0 <= 7 -> A | unreachable B) | C
+    value = np.array([[[1, 1]], [[1, 0]], [[1, 0]], [[0, 1]], [[0, 1]]], dtype=float)
+    tree_ = TreeArrays([1, 2, -1, -1, -1], [4, 3, -1, -1, -1], [0, 0, -2, -2, -2], [5.0, 7.0, -2.0, -2.0, -2.0],
+                       value, np.zeros(5), np.ones(5, dtype=int), np.ones(5))
+    simplified = simplify_tree(tree_)
+
+    assert simplified.node_count == 3
+    X = np.array([[4.0], [5.0], [5.5], [8.0]])
+    np.testing.assert_array_equal(simplified.value[simplified.apply(X), 0].argmax(axis=1),
+                                  tree_.value[tree_.apply(X), 0].argmax(axis=1))
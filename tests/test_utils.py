@@ -0,0 +1,39 @@
+import os
+from logging.handlers import RotatingFileHandler
+
+import pytest
+
+from src import utils
+
+
+@pytest.fixture
+def logger_handlers():
+    handlers = list(utils._logger.handlers)
+    yield
+    for handler in utils._logger.handlers:
+        if handler not in handlers:
+            handler.close()
+    utils._logger.handlers[:] = handlers
+
+
+def _log_files():
+    return [h.baseFilename for h in utils._logger.handlers if isinstance(h, RotatingFileHandler)]
+
+
+def test_worker_logs_to_its_own_file(logger_handlers):
+    utils.use_worker_log_file()
+    utils.use_worker_log_file()
+    root, ext = os.path.splitext(utils.LOG_FILE)
+    assert _log_files() == [os.path.abspath(f"{root}.{os.getpid()}{ext}")]
+
+    utils.log_message("worker message")
+    with open(_log_files()[0], encoding='utf-8') as f:
+        assert "worker message" in f.read()
+
+
+def test_core_budget_is_never_oversubscribed(monkeypatch):
+    monkeypatch.setattr(utils.ExperimentConfig, 'CORE_BUDGET', 8, raising=False)
+    for group_jobs in (1, 2, 3, 8, 16):
+        monkeypatch.setattr(utils.ExperimentConfig, 'GROUP_JOBS', group_jobs, raising=False)
+        workers, estimator_jobs = utils.split_core_budget()
+        assert workers <= 8 and (workers == 1 or workers * estimator_jobs <= 8)